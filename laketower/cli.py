@@ -1,7 +1,10 @@
 import argparse
+import glob
 import os
+import sys
 from pathlib import Path
 
+import rich.console
 import rich.jupyter
 import rich.panel
 import rich.style
@@ -9,23 +12,35 @@ import rich.table
 import rich.text
 import rich.tree
 import uvicorn
-import pyarrow.csv as pacsv
 
 from laketower.__about__ import __version__
 import yaml
 
 from laketower.config import load_yaml_config, resolve_yaml_config
 from laketower.tables import (
+    IMPORT_BLOCK_SIZE,
+    DEFAULT_HISTORY_LIMIT,
+    DEFAULT_IMPORT_WORKERS,
     ImportFileFormatEnum,
     ImportModeEnum,
+    StatisticsCache,
+    StatisticsModeEnum,
+    TableMaintenanceResult,
+    compute_table_statistics,
     execute_query,
+    execute_query_stream,
     extract_query_parameter_names,
+    filter_table_dataset,
     generate_table_query,
-    generate_table_statistics_query,
     import_file_to_table,
-    load_datasets,
+    import_files_to_table,
+    load_query_datasets,
     load_table,
+    resolve_table_version,
     run_query,
+    statistics_sample,
+    write_csv,
+    write_query_to_table,
 )
 
 
@@ -125,26 +140,51 @@ def table_schema(config_path: Path, table_name: str) -> None:
     console.print(out, markup=False)  # disable markup to allow bracket characters
 
 
-def table_history(config_path: Path, table_name: str) -> None:
+def table_history(
+    config_path: Path,
+    table_name: str,
+    limit: int | None = DEFAULT_HISTORY_LIMIT,
+    before_version: int | None = None,
+    compact: bool = False,
+) -> None:
     out: rich.jupyter.JupyterMixin
     try:
         config = load_yaml_config(config_path)
         table_config = next(filter(lambda x: x.name == table_name, config.tables))
         table = load_table(table_config)
-        history = table.history()
+        history = table.history(limit=limit, before_version=before_version)
+        older_revisions = (
+            f"Older revisions: --before-version {history.next_before_version}"
+            if history.next_before_version is not None
+            else None
+        )
 
-        out = rich.tree.Tree(table_name)
-        for rev in history.revisions:
-            tree_version = out.add(f"version: {rev.version}")
-            tree_version.add(f"timestamp: {rev.timestamp}")
-            tree_version.add(f"client version: {rev.client_version}")
-            tree_version.add(f"operation: {rev.operation}")
-            tree_op_params = tree_version.add("operation parameters")
-            for param_key, param_val in rev.operation_parameters.items():
-                tree_op_params.add(f"{param_key}: {param_val}")
-            tree_op_metrics = tree_version.add("operation metrics")
-            for metric_key, metric_val in rev.operation_metrics.items():
-                tree_op_metrics.add(f"{metric_key}: {metric_val}")
+        if compact:
+            out = rich.table.Table(caption=older_revisions)
+            for column in ("version", "timestamp", "operation", "client version"):
+                out.add_column(column)
+            for rev in history.revisions:
+                out.add_row(
+                    str(rev.version),
+                    str(rev.timestamp),
+                    rev.operation,
+                    str(rev.client_version),
+                )
+        else:
+            out = rich.tree.Tree(table_name)
+            for rev in history.revisions:
+                tree_version = out.add(f"version: {rev.version}")
+                tree_version.add(f"timestamp: {rev.timestamp}")
+                tree_version.add(f"client version: {rev.client_version}")
+                tree_version.add(f"operation: {rev.operation}")
+                tree_op_params = tree_version.add("operation parameters")
+                for param_key, param_val in rev.operation_parameters.items():
+                    tree_op_params.add(f"{param_key}: {param_val}")
+                tree_op_metrics = tree_version.add("operation metrics")
+                for metric_key, metric_val in rev.operation_metrics.items():
+                    tree_op_metrics.add(f"{metric_key}: {metric_val}")
+            if older_revisions:
+                out.add(older_revisions)
     except Exception as e:
         out = rich.panel.Panel.fit(f"[red]{e}")
 
@@ -153,18 +193,40 @@ def table_history(config_path: Path, table_name: str) -> None:
 
 
 def table_statistics(
-    config_path: Path, table_name: str, version: int | None = None
+    config_path: Path,
+    table_name: str,
+    version: int | None = None,
+    mode: StatisticsModeEnum = StatisticsModeEnum.exact,
+    scan_missing: bool = False,
+    as_of: str | None = None,
 ) -> None:
     out: rich.jupyter.JupyterMixin
     try:
         config = load_yaml_config(config_path)
         table_config = next(filter(lambda x: x.name == table_name, config.tables))
         table = load_table(table_config)
-        table_dataset = table.dataset(version=version)
-        sql_query = generate_table_statistics_query(table_name)
-        results = execute_query({table_name: table_dataset}, sql_query)
+        version = resolve_table_version(table, version, as_of)
+        statistics_cache = StatisticsCache(
+            config.settings.cache.statistics_dir,
+            config.settings.cache.statistics_max_bytes,
+        )
+        results = compute_table_statistics(
+            table_name,
+            table,
+            version=version,
+            mode=mode,
+            scan_missing=scan_missing,
+            cache=statistics_cache,
+        )
 
-        out = rich.table.Table()
+        caption = None
+        if sample := statistics_sample(results):
+            caption = (
+                f"Estimated from a sample of {sample['sample_rows']} rows "
+                f"out of {sample['total_rows']}, "
+                f"in {sample['sampled_files']} of {sample['total_files']} files"
+            )
+        out = rich.table.Table(caption=caption)
         for column in results.column_names:
             out.add_column(column)
         for row_dict in results.to_pylist():
@@ -184,19 +246,38 @@ def view_table(
     sort_asc: str | None = None,
     sort_desc: str | None = None,
     version: int | None = None,
+    where: str | None = None,
+    partitions: list[str] | None = None,
+    as_of: str | None = None,
 ) -> None:
     out: rich.jupyter.JupyterMixin
     try:
         config = load_yaml_config(config_path)
         table_config = next(filter(lambda x: x.name == table_name, config.tables))
         table = load_table(table_config)
-        table_dataset = table.dataset(version=version)
+        version = resolve_table_version(table, version, as_of)
+        table_dataset, where_sql, pruning = filter_table_dataset(
+            table, table.dataset(version=version), where, partitions
+        )
         sql_query = generate_table_query(
-            table_name, limit=limit, cols=cols, sort_asc=sort_asc, sort_desc=sort_desc
+            table_name,
+            limit=limit,
+            cols=cols,
+            sort_asc=sort_asc,
+            sort_desc=sort_desc,
+            where=where_sql,
         )
         results = execute_query({table_name: table_dataset}, sql_query)
 
-        out = rich.table.Table()
+        out = rich.table.Table(
+            caption=(
+                f"{pruning.pruned_files} of {pruning.total_files} files pruned by filters"
+                if pruning is not None
+                else None
+            ),
+            caption_justify="left",
+            caption_style=rich.style.Style(dim=True),
+        )
         for column in results.column_names:
             out.add_column(column)
         for row_dict in results.to_pylist():
@@ -213,69 +294,191 @@ def query_table(
     sql_query: str,
     sql_params: list[list[str]] = [],
     output_path: Path | None = None,
+    into_table: str | None = None,
+    mode: ImportModeEnum = ImportModeEnum.append,
 ) -> None:
-    out: rich.jupyter.JupyterMixin
+    out: rich.console.RenderableType
     try:
         config = load_yaml_config(config_path)
-        tables_dataset = load_datasets(config.tables)
+        tables_dataset = load_query_datasets(config.tables, sql_query)
         sql_params_dict = {param[0]: param[1] for param in sql_params}
         query_param_names = extract_query_parameter_names(sql_query)
         query_params = {
             name: sql_params_dict.get(name) or "" for name in query_param_names
         }
-        result = run_query(
-            tables_dataset,
-            sql_query,
-            sql_params=query_params,
-            max_rows=config.settings.max_query_rows,
-        )
+        if into_table is not None:
+            table_config = next(
+                (table for table in config.tables if table.name == into_table), None
+            )
+            if table_config is None:
+                raise ValueError(f"Error: Unknown table '{into_table}'")
+            write_result = write_query_to_table(
+                table_config, tables_dataset, sql_query, query_params, mode
+            )
+            out = rich.text.Text(
+                f"Successfully wrote {write_result.rows} rows into table '{into_table}' in '{mode.value}' mode"
+            )
+            if write_result.compaction is not None:
+                out = rich.console.Group(
+                    out, maintenance_tree(into_table, write_result.compaction)
+                )
+        elif output_path is not None:
+            reader = execute_query_stream(
+                tables_dataset, sql_query, sql_params=query_params
+            )
+            num_rows = write_csv(reader, output_path)
+            out = rich.text.Text(
+                f"Query results written to: {output_path} ({num_rows} rows)"
+            )
+        else:
+            result = run_query(
+                tables_dataset,
+                sql_query,
+                sql_params=query_params,
+                max_rows=config.settings.max_query_rows,
+            )
 
-        out = rich.table.Table(
-            caption=(
-                f"{result.num_rows} rows returned{' (truncated)' if result.truncated else ''}"
-                f"\nExecution time: {result.execution_time_ms:.2f}ms"
-            ),
-            caption_justify="left",
-            caption_style=rich.style.Style(dim=True),
-        )
-        for column in result.column_names:
-            out.add_column(column)
-        for row_dict in result.rows:
-            out.add_row(*[str(row_dict[col]) for col in result.column_names])
-
-        if output_path is not None:
-            pacsv.write_csv(
-                result.data,
-                output_path,
-                pacsv.WriteOptions(include_header=True, delimiter=","),
+            out = rich.table.Table(
+                caption=(
+                    f"{result.num_rows} rows returned{' (truncated)' if result.truncated else ''}"
+                    f"\nExecution time: {result.execution_time_ms:.2f}ms"
+                ),
+                caption_justify="left",
+                caption_style=rich.style.Style(dim=True),
             )
-            out = rich.text.Text(f"Query results written to: {output_path}")
-    except ValueError as e:
+            for column in result.column_names:
+                out.add_column(column)
+            for row_dict in result.rows:
+                out.add_row(*[str(row_dict[col]) for col in result.column_names])
+    except Exception as e:
         out = rich.panel.Panel.fit(f"[red]{e}")
 
     console = rich.get_console()
     console.print(out)
 
 
+def expand_import_paths(file_paths: list[str]) -> list[Path]:
+    expanded = []
+    for file_path in file_paths:
+        if not glob.has_magic(file_path):
+            expanded.append(Path(file_path))
+            continue
+        matches = sorted(glob.glob(file_path, recursive=True))
+        if not matches:
+            raise ValueError(f"Error: No files matching '{file_path}'")
+        expanded += [Path(match) for match in matches]
+    return expanded
+
+
 def import_table(
     config_path: Path,
     table_name: str,
-    file_path: Path,
+    file_paths: list[str],
     mode: ImportModeEnum,
     file_format: ImportFileFormatEnum,
     delimiter: str,
     encoding: str,
+    block_size: int = IMPORT_BLOCK_SIZE,
+    workers: int = DEFAULT_IMPORT_WORKERS,
+    merge_keys: list[str] | None = None,
 ) -> None:
-    out: rich.jupyter.JupyterMixin
+    out: rich.console.RenderableType
     try:
         config = load_yaml_config(config_path)
         table_config = next(filter(lambda x: x.name == table_name, config.tables))
-        with open(file_path, "rb") as file_content:
-            rows_imported = import_file_to_table(
-                table_config, file_content, mode, file_format, delimiter, encoding
+        if file_paths == ["-"]:
+            result = import_file_to_table(
+                table_config,
+                sys.stdin.buffer,
+                mode,
+                file_format,
+                delimiter,
+                encoding,
+                block_size,
+                merge_keys,
+            )
+        else:
+            result = import_files_to_table(
+                table_config,
+                expand_import_paths(file_paths),
+                mode,
+                file_format,
+                delimiter,
+                encoding,
+                block_size,
+                workers,
+                merge_keys,
             )
-        out = rich.text.Text(
-            f"Successfully imported {rows_imported} rows into table '{table_name}' in '{mode.value}' mode"
+        renderables: list[rich.console.RenderableType] = []
+        if len(result.files_rows) > 1:
+            summary = rich.table.Table()
+            summary.add_column("file")
+            summary.add_column("rows", justify="right")
+            for file_name, file_rows in result.files_rows.items():
+                summary.add_row(file_name, str(file_rows))
+            renderables.append(summary)
+        renderables.append(
+            rich.text.Text(
+                f"Successfully imported {result.rows} rows into table '{table_name}' in '{mode.value}' mode"
+            )
+        )
+        if result.compaction is not None:
+            renderables.append(maintenance_tree(table_name, result.compaction))
+        out = rich.console.Group(*renderables)
+    except Exception as e:
+        out = rich.panel.Panel.fit(f"[red]{e}")
+
+    console = rich.get_console()
+    console.print(out)
+
+
+def maintenance_tree(table_name: str, result: TableMaintenanceResult) -> rich.tree.Tree:
+    out = rich.tree.Tree(table_name)
+    out.add(f"operation: {result.operation}{' (dry run)' if result.dry_run else ''}")
+    out.add(f"files removed: {result.files_removed}")
+    out.add(f"files added: {result.files_added}")
+    if result.bytes_removed is not None:
+        out.add(f"bytes removed: {result.bytes_removed}")
+    if result.bytes_added is not None:
+        out.add(f"bytes added: {result.bytes_added}")
+    out.add(f"duration: {result.duration_ms:.2f}ms")
+    return out
+
+
+def optimize_table(
+    config_path: Path,
+    table_name: str,
+    zorder_columns: list[str] | None = None,
+    target_size: int | None = None,
+) -> None:
+    out: rich.jupyter.JupyterMixin
+    try:
+        config = load_yaml_config(config_path)
+        table_config = next(filter(lambda x: x.name == table_name, config.tables))
+        table = load_table(table_config)
+        out = maintenance_tree(table_name, table.optimize(zorder_columns, target_size))
+    except Exception as e:
+        out = rich.panel.Panel.fit(f"[red]{e}")
+
+    console = rich.get_console()
+    console.print(out)
+
+
+def vacuum_table(
+    config_path: Path,
+    table_name: str,
+    retention_hours: int | None = None,
+    dry_run: bool = False,
+    force: bool = False,
+) -> None:
+    out: rich.jupyter.JupyterMixin
+    try:
+        config = load_yaml_config(config_path)
+        table_config = next(filter(lambda x: x.name == table_name, config.tables))
+        table = load_table(table_config)
+        out = maintenance_tree(
+            table_name,
+            table.vacuum(retention_hours, dry_run, enforce_retention=not force),
         )
     except Exception as e:
         out = rich.panel.Panel.fit(f"[red]{e}")
@@ -299,8 +502,8 @@ def view_query(
     out: rich.jupyter.JupyterMixin
     try:
         config = load_yaml_config(config_path)
-        tables_dataset = load_datasets(config.tables)
         query_config = next(filter(lambda x: x.name == query_name, config.queries))
+        tables_dataset = load_query_datasets(config.tables, query_config.sql)
         default_parameters = {k: v.default for k, v in query_config.parameters.items()}
         sql_query = query_config.sql
         query_params_dict = {param[0]: param[1] for param in query_params}
@@ -314,6 +517,7 @@ def view_query(
             sql_query,
             sql_params=sql_params,
             max_rows=config.settings.max_query_rows,
+            totals=query_config.totals_row,
         )
 
         out = rich.table.Table(
@@ -455,7 +659,27 @@ def cli() -> None:
         formatter_class=argparse.ArgumentDefaultsHelpFormatter,
     )
     parser_tables_history.add_argument("table", help="Name of the table")
-    parser_tables_history.set_defaults(func=lambda x: table_history(x.config, x.table))
+    parser_tables_history.add_argument(
+        "--limit",
+        type=int,
+        default=DEFAULT_HISTORY_LIMIT,
+        help="Maximum number of revisions to display",
+    )
+    parser_tables_history.add_argument(
+        "--before-version",
+        type=int,
+        help="Only display revisions committed before a given version",
+    )
+    parser_tables_history.add_argument(
+        "--compact",
+        action="store_true",
+        help="Display one line per revision, without operation details",
+    )
+    parser_tables_history.set_defaults(
+        func=lambda x: table_history(
+            x.config, x.table, x.limit, x.before_version, x.compact
+        )
+    )
 
     parser_tables_statistics = subsparsers_tables.add_parser(
         "statistics",
@@ -463,11 +687,39 @@ def cli() -> None:
         formatter_class=argparse.ArgumentDefaultsHelpFormatter,
     )
     parser_tables_statistics.add_argument("table", help="Name of the table")
-    parser_tables_statistics.add_argument(
+    parser_tables_statistics_version_group = (
+        parser_tables_statistics.add_mutually_exclusive_group()
+    )
+    parser_tables_statistics_version_group.add_argument(
         "--version", type=int, help="Time-travel to table revision number"
     )
+    parser_tables_statistics_version_group.add_argument(
+        "--as-of",
+        help="Time-travel to the table revision as of a timestamp (ISO 8601, UTC by default)",
+    )
+    parser_tables_statistics.add_argument(
+        "--mode",
+        choices=[mode.value for mode in StatisticsModeEnum],
+        default=StatisticsModeEnum.exact.value,
+        type=StatisticsModeEnum,
+        help=f"Statistics mode (default: {StatisticsModeEnum.exact.value})",
+    )
+    parser_tables_statistics.add_argument(
+        "--scan-missing",
+        action="store_true",
+        help="Scan columns lacking metadata statistics (with `--mode metadata`)",
+    )
+    parser_tables_statistics.add_argument(
+        "--approx",
+        action="store_const",
+        const=StatisticsModeEnum.approx,
+        dest="mode",
+        help="Estimate statistics from a sample of the table (same as `--mode approx`)",
+    )
     parser_tables_statistics.set_defaults(
-        func=lambda x: table_statistics(x.config, x.table, x.version)
+        func=lambda x: table_statistics(
+            x.config, x.table, x.version, x.mode, x.scan_missing, x.as_of
+        )
     )
 
     parser_tables_view = subsparsers_tables.add_parser(
@@ -487,12 +739,34 @@ def cli() -> None:
     parser_tables_view_sort_group.add_argument(
         "--sort-desc", help="Sort by given column in descending order"
     )
-    parser_tables_view.add_argument(
+    parser_tables_view_version_group = parser_tables_view.add_mutually_exclusive_group()
+    parser_tables_view_version_group.add_argument(
         "--version", type=int, help="Time-travel to table revision number"
     )
+    parser_tables_view_version_group.add_argument(
+        "--as-of",
+        help="Time-travel to the table revision as of a timestamp (ISO 8601, UTC by default)",
+    )
+    parser_tables_view.add_argument(
+        "--where", help='SQL condition filtering rows (e.g. "temperature > 10")'
+    )
+    parser_tables_view.add_argument(
+        "--partition",
+        action="append",
+        help="Filter rows of a given partition (key=value), can be repeated",
+    )
     parser_tables_view.set_defaults(
         func=lambda x: view_table(
-            x.config, x.table, x.limit, x.cols, x.sort_asc, x.sort_desc, x.version
+            x.config,
+            x.table,
+            x.limit,
+            x.cols,
+            x.sort_asc,
+            x.sort_desc,
+            x.version,
+            x.where,
+            x.partition,
+            x.as_of,
         )
     )
 
@@ -501,9 +775,22 @@ def cli() -> None:
         help="Query registered tables",
         formatter_class=argparse.ArgumentDefaultsHelpFormatter,
     )
-    parser_tables_query.add_argument(
+    parser_tables_query_output_group = (
+        parser_tables_query.add_mutually_exclusive_group()
+    )
+    parser_tables_query_output_group.add_argument(
         "--output", help="Output query results to a file (default format: CSV)"
     )
+    parser_tables_query_output_group.add_argument(
+        "--into", help="Write query results into a table"
+    )
+    parser_tables_query.add_argument(
+        "--mode",
+        choices=[ImportModeEnum.append.value, ImportModeEnum.overwrite.value],
+        default=ImportModeEnum.append.value,
+        type=ImportModeEnum,
+        help="Mode used to write query results into a table (with `--into`)",
+    )
     parser_tables_query.add_argument(
         "--param",
         "-p",
@@ -514,7 +801,7 @@ def cli() -> None:
     )
     parser_tables_query.add_argument("sql", help="SQL query to execute")
     parser_tables_query.set_defaults(
-        func=lambda x: query_table(x.config, x.sql, x.param, x.output)
+        func=lambda x: query_table(x.config, x.sql, x.param, x.output, x.into, x.mode)
     )
 
     parser_tables_import = subsparsers_tables.add_parser(
@@ -524,7 +811,11 @@ def cli() -> None:
     )
     parser_tables_import.add_argument("table", help="Name of the table")
     parser_tables_import.add_argument(
-        "--file", type=Path, required=True, help="Path to file to import"
+        "--file",
+        nargs="+",
+        required=True,
+        help="Paths or glob patterns of files to import within a single commit, "
+        "or `-` to read from standard input",
     )
     parser_tables_import.add_argument(
         "--mode",
@@ -546,12 +837,84 @@ def cli() -> None:
     parser_tables_import.add_argument(
         "--encoding", default="utf-8", help="File encoding to use (default: 'utf-8')"
     )
+    parser_tables_import.add_argument(
+        "--block-size",
+        type=int,
+        default=IMPORT_BLOCK_SIZE,
+        help="Size in bytes of the blocks of CSV and NDJSON files parsed at once, "
+        "also used to infer column types",
+    )
+    parser_tables_import.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_IMPORT_WORKERS,
+        help="Number of files parsed in parallel",
+    )
+    parser_tables_import.add_argument(
+        "--merge-keys",
+        nargs="+",
+        help="Key columns matching existing rows to update (with `--mode merge`)",
+    )
     parser_tables_import.set_defaults(
         func=lambda x: import_table(
-            x.config, x.table, x.file, x.mode, x.format, x.delimiter, x.encoding
+            x.config,
+            x.table,
+            x.file,
+            x.mode,
+            x.format,
+            x.delimiter,
+            x.encoding,
+            x.block_size,
+            x.workers,
+            x.merge_keys,
         )
     )
 
+    parser_tables_optimize = subsparsers_tables.add_parser(
+        "optimize",
+        help="Compact small data files of a given table",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser_tables_optimize.add_argument("table", help="Name of the table")
+    parser_tables_optimize.add_argument(
+        "--zorder",
+        nargs="+",
+        help="Columns used to cluster rows with a Z-order curve",
+    )
+    parser_tables_optimize.add_argument(
+        "--target-size",
+        type=int,
+        help="Target size in bytes of compacted files (default: table configuration)",
+    )
+    parser_tables_optimize.set_defaults(
+        func=lambda x: optimize_table(x.config, x.table, x.zorder, x.target_size)
+    )
+
+    parser_tables_vacuum = subsparsers_tables.add_parser(
+        "vacuum",
+        help="Delete data files no longer referenced by a given table",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser_tables_vacuum.add_argument("table", help="Name of the table")
+    parser_tables_vacuum.add_argument(
+        "--retention",
+        type=int,
+        help="Retention period in hours (default: table configuration)",
+    )
+    parser_tables_vacuum.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="List files to delete without deleting them",
+    )
+    parser_tables_vacuum.add_argument(
+        "--force",
+        action="store_true",
+        help="Allow a retention period shorter than the table configured one",
+    )
+    parser_tables_vacuum.set_defaults(
+        func=lambda x: vacuum_table(x.config, x.table, x.retention, x.dry_run, x.force)
+    )
+
     parser_queries = subparsers.add_parser(
         "queries",
         help="Work with queries",
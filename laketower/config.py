@@ -112,9 +112,29 @@ class ConfigSettingsWeb(pydantic.BaseModel):
     hide_tables: bool = False
 
 
+def default_statistics_dir() -> Path:
+    cache_home = os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "laketower" / "statistics"
+
+
+class ConfigSettingsCache(pydantic.BaseModel):
+    query_results_max_bytes: int = 64 * 1024 * 1024
+    paginated_results_max_bytes: int = 256 * 1024 * 1024
+    paginated_results_ttl: float = 3600
+    statistics_dir: Path = pydantic.Field(default_factory=default_statistics_dir)
+    statistics_max_bytes: int = 256 * 1024 * 1024
+
+
 class ConfigSettings(pydantic.BaseModel):
     max_query_rows: int = 1_000
     web: ConfigSettingsWeb = ConfigSettingsWeb()
+    cache: ConfigSettingsCache = ConfigSettingsCache()
+
+
+class ConfigTableAutoCompaction(pydantic.BaseModel):
+    min_small_files: int = 100
+    small_file_max_bytes: int = 16 * 1024 * 1024
+    target_size: int | None = None
 
 
 class ConfigTable(pydantic.BaseModel):
@@ -122,6 +142,7 @@ class ConfigTable(pydantic.BaseModel):
     uri: str
     table_format: TableFormats = pydantic.Field(alias="format")
     storage_credential: ConfigStorageCredential | None = None
+    auto_compaction: ConfigTableAutoCompaction | None = None
 
 
 class ConfigQueryParameter(pydantic.BaseModel):
@@ -133,6 +154,7 @@ class ConfigQuery(pydantic.BaseModel):
     title: str
     description: str | None = None
     totals_row: bool = False
+    cache_ttl: float | None = None
     parameters: dict[str, ConfigQueryParameter] = {}
     sql: str
 
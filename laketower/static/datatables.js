@@ -31,10 +31,22 @@ export function createDataTable(tableId, options = {}) {
     const colOffset = options.columnIndexOffset || 0
     const columnNames = options.columnNames || []
     const columnUniques = options.columnUniques || {}
+    const serverSide = !!options.ajaxUrl
+    let serverTotals = null
     return new DataTable(
         tableId,
         {
-            data: options.data,
+            data: serverSide ? undefined : options.data,
+            serverSide: serverSide,
+            ajax: serverSide ? {
+                url: options.ajaxUrl,
+                type: 'POST',
+                submitAs: 'json',
+                dataSrc: json => {
+                    serverTotals = json.totals || null
+                    return json.data
+                },
+            } : undefined,
             columns: options.columns,
             searching: true,
             footerCallback: function(row, data, start, end, display) {
@@ -47,6 +59,23 @@ export function createDataTable(tableId, options = {}) {
                         cell.textContent = '-'
                         return
                     }
+                    if (serverSide) {
+                        const total = serverTotals ? serverTotals[i] : null
+                        cell.textContent = total != null ? total : '-'
+                        return
+                    }
+                    // totals cover all the results: the SQL totals when unfiltered, and
+                    // none when filtered, if the rows held for filtering are truncated
+                    const filtered = display.length < data.length
+                    if (!filtered && options.totals) {
+                        const total = options.totals[i]
+                        cell.textContent = total != null ? total : '-'
+                        return
+                    }
+                    if (filtered && options.truncated) {
+                        cell.textContent = '-'
+                        return
+                    }
                     let total = 0
                     display.forEach(rowIdx => {
                         const val = data[rowIdx][i]
@@ -61,7 +90,11 @@ export function createDataTable(tableId, options = {}) {
                 bottomStart: ['pageLength', 'info'],
                 bottomEnd: 'paging',
             },
-            buttons: options.exportFilename ? [{
+            buttons: options.exportFilename ? [serverSide ? {
+                text: '<i class="bi-download" aria-hidden="true"></i> Export CSV',
+                className: 'btn btn-sm btn-outline-secondary',
+                action: () => window.location.assign(options.exportUrl),
+            } : {
                 extend: 'csv',
                 filename: options.exportFilename,
                 extension: '.csv',
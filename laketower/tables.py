@@ -1,16 +1,40 @@
+import base64
+import bisect
 import enum
+import heapq
+import io
+import logging
+import math
+import operator
+import queue
+import random
+import secrets
+import threading
 import time
-from dataclasses import dataclass
+import zlib
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from functools import cached_property
-from typing import Any, BinaryIO, Protocol, TextIO
+from functools import cached_property, partial, reduce
+from pathlib import Path
+from typing import Any, BinaryIO, Literal, Protocol, TextIO
 
 import deltalake
+import deltalake.fs
 import duckdb
+import numpy as np
+import numpy.typing as npt
+import orjson
 import pyarrow as pa
 import pyarrow.compute as pc
 import pyarrow.csv as csv
 import pyarrow.dataset as padataset
+import pyarrow.fs as pafs
+import pyarrow.json as pajson
+import pyarrow.parquet as pq
 import pydantic
 import sqlglot
 import sqlglot.dialects.duckdb
@@ -19,18 +43,58 @@ import sqlglot.expressions
 
 from laketower.config import ConfigTable, TableFormats
 
+logger = logging.getLogger(__name__)
 
 DEFAULT_LIMIT = 10
+DEFAULT_CONNECTION_POOL_SIZE = 8
+DEFAULT_BATCH_SIZE = 65_536
+SEARCHLIST_MAX_CARDINALITY = 100
+UNIQUES_SCAN_BATCH_SIZE = 8_192
+PROFILE_HLL_PRECISION = 12
+PROFILE_TOP_K = 5
+PROFILE_TOP_K_CAPACITY = 1_000
+IMPORT_BLOCK_SIZE = 16 * 1024 * 1024
+ARROW_FILE_MAGIC = b"ARROW1"
+DEFAULT_IMPORT_WORKERS = 4
+APPROX_SAMPLE_FRACTION = 0.05
+APPROX_MIN_SAMPLE_ROWS = 10_000
+APPROX_MIN_SAMPLE_FILES = 20
+APPROX_QUANTILES = (0.25, 0.5, 0.75)
+DEFAULT_SNAPSHOTS_CACHE_SIZE = 8
+DEFAULT_HISTORY_LIMIT = 50
+HISTORY_READ_WORKERS = 8
 
 
 class ImportModeEnum(str, enum.Enum):
     append = "append"
     overwrite = "overwrite"
+    merge = "merge"
 
 
 class ImportFileFormatEnum(str, enum.Enum):
     csv = "csv"
     xlsx = "xlsx"
+    parquet = "parquet"
+    arrow = "arrow"
+    ndjson = "ndjson"
+
+
+class ExportFormatEnum(str, enum.Enum):
+    csv = "csv"
+    parquet = "parquet"
+    arrow = "arrow"
+    ndjson = "ndjson"
+
+
+class ExportCompressionEnum(str, enum.Enum):
+    gzip = "gzip"
+
+
+class StatisticsModeEnum(str, enum.Enum):
+    exact = "exact"
+    metadata = "metadata"
+    profile = "profile"
+    approx = "approx"
 
 
 class TableMetadata(pydantic.BaseModel):
@@ -56,33 +120,107 @@ class TableRevision(pydantic.BaseModel):
 
 class TableHistory(pydantic.BaseModel):
     revisions: list[TableRevision]
+    # version to load the next page of older revisions before, if any
+    next_before_version: int | None = None
+
+
+class TableMaintenanceResult(pydantic.BaseModel):
+    operation: str
+    files_added: int = 0
+    files_removed: int = 0
+    bytes_added: int | None = None
+    bytes_removed: int | None = None
+    duration_ms: float
+    dry_run: bool = False
+
+
+class ImportResult(pydantic.BaseModel):
+    rows: int
+    # imported rows per file, when importing multiple files
+    files_rows: dict[str, int] = pydantic.Field(default_factory=dict)
+    # automatic compaction following the import, if it was triggered
+    compaction: TableMaintenanceResult | None = None
 
 
 class TableProtocol(Protocol):  # pragma: no cover
+    table_config: ConfigTable
+
     @classmethod
     def is_valid(cls, table_config: ConfigTable) -> bool: ...
     def __init__(self, table_config: ConfigTable) -> None: ...
+    def refresh(self) -> None: ...
+    def version(self) -> int: ...
     def metadata(self) -> TableMetadata: ...
     def schema(self) -> pa.Schema: ...
-    def history(self) -> TableHistory: ...
+    def history(
+        self, limit: int | None = None, before_version: int | None = None
+    ) -> TableHistory: ...
+    def version_at(self, timestamp: datetime) -> int: ...
     def dataset(self, version: int | str | None = None) -> padataset.Dataset: ...
+    def file_statistics(self, version: int | str | None = None) -> pa.Table: ...
+    def optimize(
+        self,
+        zorder_columns: list[str] | None = None,
+        target_size: int | None = None,
+    ) -> TableMaintenanceResult: ...
+    def vacuum(
+        self,
+        retention_hours: int | None = None,
+        dry_run: bool = True,
+        enforce_retention: bool = True,
+    ) -> TableMaintenanceResult: ...
     @classmethod
     def import_data(
         cls,
         table_config: ConfigTable,
-        data: pa.Table,
+        data: pa.Table | pa.RecordBatchReader,
         mode: ImportModeEnum = ImportModeEnum.overwrite,
-    ) -> None: ...
+        merge_keys: list[str] | None = None,
+    ) -> TableMaintenanceResult | None: ...
+
+
+class TableSnapshot:
+    """
+    Immutable state of a table pinned to a given version.
+
+    The table log is replayed once, when the snapshot is created, and the
+    Arrow dataset is built on first use, so that every later read of the same
+    version reuses them.
+    """
+
+    def __init__(self, impl: deltalake.DeltaTable) -> None:
+        self._impl = impl
+        self.version = impl.version()
+        self._lock = threading.Lock()
+        self._dataset: padataset.Dataset | None = None
+
+    def dataset(self) -> padataset.Dataset:
+        with self._lock:
+            if self._dataset is None:
+                self._dataset = self._impl.to_pyarrow_dataset()
+            return self._dataset
+
+    def file_statistics(self) -> pa.Table:
+        with self._lock:
+            return pa.table(self._impl.get_add_actions(flatten=False))
 
 
 class DeltaTable:
     def __init__(self, table_config: ConfigTable):
         super().__init__()
         self.table_config = table_config
-        storage_options = self._generate_storage_options(table_config)
+        self._storage_options = self._generate_storage_options(table_config)
         self._impl = deltalake.DeltaTable(
-            table_config.uri, storage_options=storage_options
+            table_config.uri, storage_options=self._storage_options
         )
+        # the underlying handle is shared between threads, serialize its access
+        self._lock = threading.RLock()
+        self._dataset: tuple[int, padataset.Dataset] | None = None
+        # recently used historical versions
+        self._snapshots: OrderedDict[int, TableSnapshot] = OrderedDict()
+        self._snapshots_lock = threading.Lock()
+        # commit timestamps (ms, non-decreasing) and versions, in commit order
+        self._version_index: tuple[list[int], list[int]] = ([], [])
 
     @classmethod
     def _generate_storage_options(
@@ -169,15 +307,25 @@ class DeltaTable:
         except OSError:
             return False
 
+    def refresh(self) -> None:
+        with self._lock:
+            self._impl.update_incremental()
+
+    def version(self) -> int:
+        with self._lock:
+            return self._impl.version()
+
     def metadata(self) -> TableMetadata:
-        metadata = self._impl.metadata()
+        with self._lock:
+            metadata = self._impl.metadata()
+            version = self._impl.version()
         return TableMetadata(
             table_format=self.table_config.table_format,
             name=metadata.name,
             description=metadata.description,
             uri=self._impl.table_uri,
             id=str(metadata.id),
-            version=self._impl.version(),
+            version=version,
             created_at=datetime.fromtimestamp(
                 metadata.created_time / 1000, tz=timezone.utc
             ),
@@ -186,10 +334,40 @@ class DeltaTable:
         )
 
     def schema(self) -> pa.Schema:
-        return pa.schema(self._impl.schema().to_arrow())  # type: ignore[arg-type]
+        with self._lock:
+            return pa.schema(self._impl.schema().to_arrow())  # type: ignore[arg-type]
+
+    def history(
+        self, limit: int | None = None, before_version: int | None = None
+    ) -> TableHistory:
+        """
+        Table revisions, most recent first, optionally paginated with at most
+        `limit` revisions committed before `before_version`.
+
+        Only the commits of the requested page are read from the table log:
+        the latest ones through the Delta history, older ones straight from
+        their commit files.
+        """
+        if limit is not None and limit < 1:
+            raise ValueError("Error: History limit must be a positive number")
+
+        with self._lock:
+            current_version = self._impl.version()
+            if before_version is None or before_version > current_version:
+                delta_history = self._impl.history(limit)
+        if before_version is not None and before_version <= current_version:
+            first_version = max(before_version - limit, 0) if limit else 0
+            delta_history = []
+            with ThreadPoolExecutor(max_workers=HISTORY_READ_WORKERS) as executor:
+                versions = range(before_version - 1, first_version - 1, -1)
+                for version, commit in zip(
+                    versions, executor.map(self._read_commit_info, versions)
+                ):
+                    if commit is None:
+                        # older commits have been cleaned up from the log
+                        break
+                    delta_history.append(commit | {"version": version})
 
-    def history(self) -> TableHistory:
-        delta_history = self._impl.history()
         revisions = [
             TableRevision(
                 version=event["version"],
@@ -203,39 +381,383 @@ class DeltaTable:
             )
             for event in delta_history
         ]
-        return TableHistory(revisions=revisions)
+        next_before_version = None
+        if limit and len(revisions) == limit and revisions[-1].version > 0:
+            next_before_version = revisions[-1].version
+        return TableHistory(
+            revisions=revisions, next_before_version=next_before_version
+        )
+
+    @cached_property
+    def _log_filesystem(self) -> pafs.FileSystem:
+        return pafs.PyFileSystem(
+            deltalake.fs.DeltaStorageHandler(
+                self._impl.table_uri, self._storage_options
+            )
+        )
+
+    def _read_commit_info(self, version: int) -> dict[str, Any] | None:
+        path = f"_delta_log/{version:020d}.json"
+        try:
+            with self._log_filesystem.open_input_stream(path) as stream:
+                for line in io.BufferedReader(stream):  # type: ignore[type-var]
+                    action = orjson.loads(line) if line.strip() else {}
+                    if "commitInfo" in action:
+                        return dict(action["commitInfo"])
+        except FileNotFoundError:
+            return None
+        # commit information is optional in the Delta protocol
+        modified_at = self._log_filesystem.get_file_info(path).mtime
+        return {
+            "timestamp": int(modified_at.timestamp() * 1000) if modified_at else 0,
+            "operation": "UNKNOWN",
+            "operationParameters": {},
+        }
+
+    def version_at(self, timestamp: datetime) -> int:
+        """
+        Latest table version committed at or before a given timestamp (UTC if
+        naive).
+
+        Commit timestamps are indexed incrementally, only reading the commits
+        added to the log since the previous lookup, and looked up with a binary
+        search.
+        """
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        timestamp_ms = int(timestamp.timestamp() * 1000)
+        with self._lock:
+            current_version = self._impl.version()
+            timestamps, versions = self._version_index
+            if versions and versions[-1] > current_version:
+                # the table has been recreated, index it again
+                timestamps, versions = [], []
+            last_version = versions[-1] if versions else -1
+            if current_version > last_version:
+                commits = self._impl.history(limit=current_version - last_version)
+                for commit in reversed(commits):
+                    if commit["version"] <= last_version:
+                        continue
+                    commit_ms = commit["timestamp"]
+                    if timestamps:
+                        # clock skew between writers must not break the ordering
+                        commit_ms = max(commit_ms, timestamps[-1])
+                    timestamps.append(commit_ms)
+                    versions.append(commit["version"])
+                self._version_index = (timestamps, versions)
+            position = bisect.bisect_right(timestamps, timestamp_ms)
+            if position == 0:
+                raise ValueError(
+                    f"Error: No table version as of {timestamp.isoformat()}"
+                )
+            return versions[position - 1]
 
     def dataset(self, version: int | str | None = None) -> padataset.Dataset:
-        if version is not None:
-            self._impl.load_as_version(version)
-        return self._impl.to_pyarrow_dataset()
+        with self._lock:
+            current_version = self._impl.version()
+            if version is None or version == current_version:
+                if self._dataset is None or self._dataset[0] != current_version:
+                    self._dataset = (current_version, self._impl.to_pyarrow_dataset())
+                return self._dataset[1]
+        return self.snapshot(version).dataset()
+
+    def file_statistics(self, version: int | str | None = None) -> pa.Table:
+        """
+        Per-file statistics recorded in the Delta log add actions: number of
+        records, partition values, and null counts, min and max values per
+        column.
+        """
+        with self._lock:
+            if version is None or version == self._impl.version():
+                return pa.table(self._impl.get_add_actions(flatten=False))
+        return self.snapshot(version).file_statistics()
+
+    def optimize(
+        self,
+        zorder_columns: list[str] | None = None,
+        target_size: int | None = None,
+    ) -> TableMaintenanceResult:
+        """
+        Compact small data files into larger ones, optionally clustering rows
+        with a Z-order curve over the given columns to improve data skipping.
+        """
+        start = time.perf_counter()
+        with self._lock:
+            if zorder_columns:
+                metrics = self._impl.optimize.z_order(
+                    zorder_columns, target_size=target_size
+                )
+            else:
+                metrics = self._impl.optimize.compact(target_size=target_size)
+        return _optimize_result(
+            "z-order" if zorder_columns else "compact",
+            metrics,
+            (time.perf_counter() - start) * 1000,
+        )
+
+    def vacuum(
+        self,
+        retention_hours: int | None = None,
+        dry_run: bool = True,
+        enforce_retention: bool = True,
+    ) -> TableMaintenanceResult:
+        """
+        Delete data files no longer referenced by the table versions within
+        the retention period (table configured one by default).
+        """
+        start = time.perf_counter()
+        with self._lock:
+            removed_files = self._impl.vacuum(
+                retention_hours=retention_hours,
+                dry_run=dry_run,
+                enforce_retention_duration=enforce_retention,
+            )
+        return TableMaintenanceResult(
+            operation="vacuum",
+            files_removed=len(removed_files),
+            duration_ms=(time.perf_counter() - start) * 1000,
+            dry_run=dry_run,
+        )
+
+    def snapshot(self, version: int | str) -> TableSnapshot:
+        """
+        Snapshot of the table at a given version (number or timestamp).
+
+        Historical versions are loaded on dedicated handles, leaving the shared
+        one untouched, and the most recently used ones are kept so that
+        concurrent and repeated time-travels never replay the log again.
+        """
+        if isinstance(version, str):
+            # timestamps are resolved on every call, as versions may have been
+            # committed after them since a previous time-travel
+            version = self.version_at(parse_as_of(version))
+        with self._snapshots_lock:
+            snapshot = self._snapshots.get(version)
+            if snapshot is not None:
+                self._snapshots.move_to_end(version)
+                return snapshot
+
+        # the log is replayed without holding the lock, so that time-travels to
+        # other versions are not blocked meanwhile
+        snapshot = TableSnapshot(
+            deltalake.DeltaTable(
+                self.table_config.uri,
+                version=version,
+                storage_options=self._storage_options,
+            )
+        )
+        with self._snapshots_lock:
+            # the same version may have been loaded concurrently, keep only one
+            snapshot = self._snapshots.setdefault(version, snapshot)
+            self._snapshots.move_to_end(version)
+            while len(self._snapshots) > DEFAULT_SNAPSHOTS_CACHE_SIZE:
+                self._snapshots.popitem(last=False)
+            return snapshot
 
     @classmethod
     def import_data(
         cls,
         table_config: ConfigTable,
-        data: pa.Table,
+        data: pa.Table | pa.RecordBatchReader,
         mode: ImportModeEnum = ImportModeEnum.overwrite,
-    ) -> None:
+        merge_keys: list[str] | None = None,
+    ) -> TableMaintenanceResult | None:
+        """
+        Write data into the table, returning the result of the automatic
+        compaction following the import, if any.
+        """
         storage_options = cls._generate_storage_options(table_config)
-        deltalake.write_deltalake(
-            table_config.uri,
-            data,
-            mode=mode.value,
-            schema_mode="merge",
-            storage_options=storage_options,
+        if mode == ImportModeEnum.merge:
+            if not merge_keys:
+                raise ValueError("Error: Merge mode requires key columns")
+            if missing_keys := set(merge_keys) - set(data.schema.names):
+                raise ValueError(
+                    f"Error: Merge key columns not found: {', '.join(sorted(missing_keys))}"
+                )
+
+        if mode == ImportModeEnum.merge and cls.is_valid(table_config):
+            cls._merge_data(table_config, data, merge_keys or [], storage_options)
+        else:
+            # merging into a table yet to be created is a plain write
+            write_mode: Literal["append", "overwrite"] = (
+                "overwrite" if mode == ImportModeEnum.overwrite else "append"
+            )
+            deltalake.write_deltalake(
+                table_config.uri,
+                data,
+                mode=write_mode,
+                schema_mode="merge",
+                storage_options=storage_options,
+            )
+
+        if table_config.auto_compaction is None:
+            return None
+        try:
+            return cls._auto_compact(table_config, storage_options)
+        except Exception:
+            # the imported data is already committed, a failed compaction must
+            # not report the import as failed and get it retried
+            logger.exception("Auto-compaction of table '%s' failed", table_config.name)
+            return None
+
+    @classmethod
+    def _auto_compact(
+        cls, table_config: ConfigTable, storage_options: dict[str, str] | None
+    ) -> TableMaintenanceResult | None:
+        """
+        Compact the table once the number of its small data files reaches the
+        configured auto-compaction threshold.
+
+        Files are only compacted within their partition, so that small files
+        alone in their partition are not counted.
+        """
+        policy = table_config.auto_compaction
+        if policy is None:
+            return None
+        impl = deltalake.DeltaTable(table_config.uri, storage_options=storage_options)
+        add_actions = pa.table(impl.get_add_actions(flatten=True))
+        small_files = add_actions.filter(
+            pc.field("size_bytes") <= policy.small_file_max_bytes
+        )
+        partition_columns = [
+            name for name in small_files.column_names if name.startswith("partition.")
+        ]
+        partitions_files = (
+            small_files.group_by(partition_columns)
+            .aggregate([("path", "count")])
+            .column("path_count")
+        )
+        mergeable_files = pc.sum(
+            pc.filter(
+                partitions_files,
+                pc.call_function("greater", [partitions_files, 1]),
+            )
+        ).as_py()
+        if (mergeable_files or 0) < policy.min_small_files:
+            return None
+        start = time.perf_counter()
+        metrics = impl.optimize.compact(target_size=policy.target_size)
+        return _optimize_result(
+            "compact", metrics, (time.perf_counter() - start) * 1000
+        )
+
+    @classmethod
+    def _merge_data(
+        cls,
+        table_config: ConfigTable,
+        data: pa.Table | pa.RecordBatchReader,
+        merge_keys: list[str],
+        storage_options: dict[str, str] | None,
+    ) -> None:
+        impl = deltalake.DeltaTable(table_config.uri, storage_options=storage_options)
+        # unlike writes, merges with schema evolution do not coerce source columns
+        # to the table fields, mismatching types or nullability yield null values
+        target_schema = pa.schema(impl.schema().to_arrow())  # type: ignore[arg-type]
+        source_schema = pa.schema(
+            target_schema.field(field.name)
+            if field.name in target_schema.names
+            else field
+            for field in data.schema
+        )
+        if source_schema != data.schema:
+            data = data.cast(source_schema)
+        # rows only match on merge keys: matching on partition columns as well
+        # would insert rows whose partition value changed, or is null, again
+        predicate = " AND ".join(
+            f'target."{column}" = source."{column}"' for column in merge_keys
+        )
+        (
+            impl.merge(
+                data,
+                predicate=predicate,
+                source_alias="source",
+                target_alias="target",
+                merge_schema=True,
+                # source statistics are required to prune target files, which
+                # streamed execution does not collect
+                streamed_exec=False,
+            )
+            .when_matched_update_all()
+            .when_not_matched_insert_all()
+            .execute()
         )
 
 
+def _optimize_result(
+    operation: str, metrics: dict[str, Any], duration_ms: float
+) -> TableMaintenanceResult:
+    # added and removed files statistics are JSON encoded by some deltalake versions
+    files_added, files_removed = (
+        orjson.loads(files) if isinstance(files, str) else files
+        for files in (metrics["filesAdded"], metrics["filesRemoved"])
+    )
+    return TableMaintenanceResult(
+        operation=operation,
+        files_added=metrics["numFilesAdded"],
+        files_removed=metrics["numFilesRemoved"],
+        bytes_added=files_added["totalSize"],
+        bytes_removed=files_removed["totalSize"],
+        duration_ms=duration_ms,
+    )
+
+
 def resolve_table(table_config: ConfigTable) -> type[TableProtocol]:
     return {TableFormats.delta: DeltaTable}[table_config.table_format]
 
 
+class TableHandleCache:
+    """
+    Process-wide cache of table handles, keyed by table name.
+
+    Cached handles are refreshed with new commits when retrieved, instead of
+    being loaded again from scratch.
+    """
+
+    def __init__(self) -> None:
+        self._handles: dict[str, TableProtocol] = {}
+        self._lock = threading.Lock()
+
+    def get(self, table_config: ConfigTable) -> TableProtocol:
+        with self._lock:
+            handle = self._handles.get(table_config.name)
+        if handle is not None and handle.table_config == table_config:
+            try:
+                handle.refresh()
+                return handle
+            except (deltalake.exceptions.DeltaError, OSError):
+                # the table may have been deleted or be unreachable, load it
+                # again to report it as any other invalid table
+                with self._lock:
+                    self._handles.pop(table_config.name, None)
+
+        handler_class = resolve_table(table_config)
+        if not handler_class.is_valid(table_config):
+            raise ValueError(f"Invalid table: {table_config.uri}")
+        handle = handler_class(table_config)
+        with self._lock:
+            self._handles[table_config.name] = handle
+        return handle
+
+    def clear(self) -> None:
+        with self._lock:
+            self._handles.clear()
+
+
+table_handles = TableHandleCache()
+
+
 def load_table(table_config: ConfigTable) -> TableProtocol:
-    handler_class = resolve_table(table_config)
-    if not handler_class.is_valid(table_config):
-        raise ValueError(f"Invalid table: {table_config.uri}")
-    return handler_class(table_config)
+    return table_handles.get(table_config)
+
+
+def load_tables(table_configs: list[ConfigTable]) -> dict[str, TableProtocol]:
+    tables = {}
+    for table_config in table_configs:
+        try:
+            tables[table_config.name] = load_table(table_config)
+        except ValueError:
+            pass
+    return tables
 
 
 def load_datasets(table_configs: list[ConfigTable]) -> dict[str, padataset.Dataset]:
@@ -248,6 +770,198 @@ def load_datasets(table_configs: list[ConfigTable]) -> dict[str, padataset.Datas
     return tables_dataset
 
 
+def extract_table_names(sql: str) -> set[str]:
+    try:
+        parsed_sql = sqlglot.parse(sql, dialect=sqlglot.dialects.duckdb.DuckDB)
+    except sqlglot.errors.SqlglotError as e:
+        raise ValueError(f"Error: {e}") from e
+
+    # DuckDB identifiers are case insensitive, even when quoted
+    return {
+        node.name.lower()
+        for statement in parsed_sql
+        if statement is not None
+        for node in statement.find_all(sqlglot.expressions.Table)
+        if node.name
+    }
+
+
+def filter_query_tables(
+    table_configs: list[ConfigTable], sql: str
+) -> list[ConfigTable]:
+    try:
+        table_names = extract_table_names(sql)
+    except ValueError:
+        # keep all tables and let the query engine report the syntax error
+        return table_configs
+
+    return [
+        table_config
+        for table_config in table_configs
+        if table_config.name.lower() in table_names
+    ]
+
+
+def load_query_tables(
+    table_configs: list[ConfigTable], sql: str
+) -> dict[str, TableProtocol]:
+    return load_tables(filter_query_tables(table_configs, sql))
+
+
+def load_query_datasets(
+    table_configs: list[ConfigTable], sql: str
+) -> dict[str, padataset.Dataset]:
+    """
+    Datasets of the tables referenced by a SQL query, along with the versions
+    time-travelled to, registered under their query aliases.
+    """
+    return load_query_versioned_datasets(table_configs, sql)[0]
+
+
+def load_query_versioned_datasets(
+    table_configs: list[ConfigTable], sql: str
+) -> tuple[dict[str, padataset.Dataset], dict[str, int]]:
+    """
+    Datasets of the tables referenced by a SQL query, as `load_query_datasets`,
+    along with their versions by table name or alias.
+
+    Versions are read before datasets, so that a concurrent commit can only make
+    a dataset fresher than its version.
+    """
+    tables_dataset = {}
+    tables_version = {}
+    for query_table_config in filter_query_tables(table_configs, sql):
+        try:
+            query_table = load_table(query_table_config)
+        except ValueError:
+            continue
+        tables_version[query_table_config.name] = query_table.version()
+        tables_dataset[query_table_config.name] = query_table.dataset()
+    table_configs_by_name = {
+        table_config.name.lower(): table_config for table_config in table_configs
+    }
+    for alias, (table_name, at) in extract_time_travels(sql).items():
+        if (table_config := table_configs_by_name.get(table_name)) is None:
+            continue
+        table = load_table(table_config)
+        version = at if isinstance(at, int) else table.version_at(at)
+        try:
+            tables_dataset[alias] = table.dataset(version=version)
+        except deltalake.exceptions.DeltaError as e:
+            raise ValueError(f"Error: {e}") from e
+        tables_version[alias] = version
+    return tables_dataset, tables_version
+
+
+def parse_as_of(as_of: str) -> datetime:
+    try:
+        return datetime.fromisoformat(as_of)
+    except ValueError as e:
+        raise ValueError(
+            f"Error: Invalid timestamp '{as_of}', expected ISO 8601 format"
+        ) from e
+
+
+def resolve_table_version(
+    table: TableProtocol, version: int | None = None, as_of: str | None = None
+) -> int | None:
+    """
+    Table version to time-travel to, given either a version number or a
+    timestamp (latest version committed at or before it).
+    """
+    if not as_of:
+        return version
+    if version is not None:
+        raise ValueError("Error: Cannot time-travel to both a version and a timestamp")
+    return table.version_at(parse_as_of(as_of))
+
+
+def _time_travel(node: sqlglot.expressions.Table) -> int | datetime | None:
+    when = node.args.get("when")
+    if not isinstance(when, sqlglot.expressions.HistoricalData):
+        return None
+
+    value = when.expression
+    if isinstance(value, sqlglot.expressions.Cast):
+        value = value.this
+    if when.text("this").upper() == "AT" and isinstance(
+        value, sqlglot.expressions.Literal
+    ):
+        kind = when.text("kind").upper()
+        if kind == "VERSION" and value.is_int:
+            return int(value.this)
+        if kind == "TIMESTAMP" and value.is_string:
+            return parse_as_of(value.this)
+    raise ValueError(
+        f"Error: Invalid time travel on table '{node.name}', expected "
+        "AT (VERSION => <number>) or AT (TIMESTAMP => '<timestamp>')"
+    )
+
+
+def _time_travel_alias(table_name: str, at: int | datetime) -> str:
+    return f"{table_name}@v{at}" if isinstance(at, int) else f"{table_name}@{at}"
+
+
+def extract_time_travels(sql: str) -> dict[str, tuple[str, int | datetime]]:
+    """
+    Table references of a SQL query time-travelling with `AT (VERSION => ...)`
+    or `AT (TIMESTAMP => ...)`, as table name and version or timestamp by
+    query alias. Syntax errors are left for the query engine to report.
+    """
+    try:
+        parsed_sql = sqlglot.parse(sql, dialect=sqlglot.dialects.duckdb.DuckDB)
+    except sqlglot.errors.SqlglotError:
+        return {}
+
+    time_travels = {}
+    for statement in parsed_sql:
+        if statement is None:
+            continue
+        for node in statement.find_all(sqlglot.expressions.Table):
+            if (at := _time_travel(node)) is not None:
+                table_name = node.name.lower()
+                time_travels[_time_travel_alias(table_name, at)] = (table_name, at)
+    return time_travels
+
+
+def rewrite_time_travels(sql: str) -> str:
+    """
+    Replace the time-travelling table references of a SQL query with their
+    query aliases, keeping the table name as correlation name.
+    """
+    try:
+        parsed_sql = sqlglot.parse(sql, dialect=sqlglot.dialects.duckdb.DuckDB)
+    except sqlglot.errors.SqlglotError as e:
+        raise ValueError(f"Error: {e}") from e
+
+    for statement in parsed_sql:
+        if statement is None:
+            continue
+        for node in list(statement.find_all(sqlglot.expressions.Table)):
+            if (at := _time_travel(node)) is None:
+                continue
+            table_name = node.name.lower()
+            if not node.alias:
+                node.set(
+                    "alias",
+                    sqlglot.expressions.TableAlias(
+                        this=sqlglot.expressions.to_identifier(node.name)
+                    ),
+                )
+            node.set(
+                "this",
+                sqlglot.expressions.to_identifier(
+                    _time_travel_alias(table_name, at), quoted=True
+                ),
+            )
+            node.set("when", None)
+    return ";\n".join(
+        statement.sql(dialect=sqlglot.dialects.duckdb.DuckDB)
+        for statement in parsed_sql
+        if statement is not None
+    )
+
+
 def extract_query_parameter_names(sql: str) -> set[str]:
     try:
         parsed_sql = sqlglot.parse(sql, dialect=sqlglot.dialects.duckdb.DuckDB)
@@ -269,12 +983,15 @@ def generate_table_query(
     cols: list[str] | None = None,
     sort_asc: str | None = None,
     sort_desc: str | None = None,
+    where: str | None = None,
 ) -> str:
     query_expr = (
         sqlglot.select(*([f'"{col}"' for col in cols] if cols else ["*"]))
         .from_(f'"{table_name}"')
         .limit(limit or DEFAULT_LIMIT)
     )
+    if where:
+        query_expr = query_expr.where(where, dialect=sqlglot.dialects.duckdb.DuckDB)
     if sort_asc:
         query_expr = query_expr.order_by(f"{sort_asc} asc")
     elif sort_desc:
@@ -282,6 +999,296 @@ def generate_table_query(
     return query_expr.sql(dialect=sqlglot.dialects.duckdb.DuckDB, identify=True)
 
 
+FILTER_COMPARISONS: dict[type[sqlglot.expressions.Expr], Any] = {
+    sqlglot.expressions.EQ: operator.eq,
+    sqlglot.expressions.NEQ: operator.ne,
+    sqlglot.expressions.GT: operator.gt,
+    sqlglot.expressions.GTE: operator.ge,
+    sqlglot.expressions.LT: operator.lt,
+    sqlglot.expressions.LTE: operator.le,
+}
+# comparison operators with swapped operands, for literals on the left side
+FILTER_SWAPPED_COMPARISONS: dict[type[sqlglot.expressions.Expr], Any] = {
+    sqlglot.expressions.EQ: operator.eq,
+    sqlglot.expressions.NEQ: operator.ne,
+    sqlglot.expressions.GT: operator.lt,
+    sqlglot.expressions.GTE: operator.le,
+    sqlglot.expressions.LT: operator.gt,
+    sqlglot.expressions.LTE: operator.ge,
+}
+
+
+@dataclass(frozen=True)
+class DatasetPruning:
+    total_files: int
+    pruned_files: int
+    pruned_row_groups: int
+
+
+def parse_table_filter(
+    schema: pa.Schema,
+    where: str | None = None,
+    partitions: list[str] | None = None,
+    partition_columns: list[str] | None = None,
+) -> sqlglot.expressions.Expr | None:
+    """
+    Parse and validate a SQL filter condition along with `key=value` filters
+    on partition columns, combined into a single condition.
+    """
+    conditions = []
+    if where:
+        try:
+            where_condition = sqlglot.condition(
+                where, dialect=sqlglot.dialects.duckdb.DuckDB
+            )
+        except sqlglot.errors.ParseError as e:
+            raise ValueError(f"Error: Invalid filter: {where}") from e
+        if where_condition.find(sqlglot.expressions.Query):
+            raise ValueError("Error: Filters cannot contain subqueries")
+        conditions.append(where_condition)
+
+    for partition in partitions or []:
+        key, sep, value = partition.partition("=")
+        if not sep:
+            raise ValueError(
+                f"Error: Invalid partition filter '{partition}', expected key=value"
+            )
+        if key not in (partition_columns or []):
+            raise ValueError(f"Error: '{key}' is not a partition column")
+        conditions.append(
+            sqlglot.expressions.column(key, quoted=True).eq(
+                sqlglot.expressions.Literal.string(value)
+            )
+        )
+
+    if not conditions:
+        return None
+    condition: sqlglot.expressions.Expr = sqlglot.expressions.and_(*conditions)
+    if unknown_columns := {
+        column.name for column in condition.find_all(sqlglot.expressions.Column)
+    } - set(schema.names):
+        raise ValueError(
+            f"Error: Unknown filter columns: {', '.join(sorted(unknown_columns))}"
+        )
+    return condition
+
+
+def _is_string_type(data_type: pa.DataType) -> bool:
+    return pa.types.is_string(data_type) or pa.types.is_large_string(data_type)
+
+
+def _is_numeric_type(data_type: pa.DataType) -> bool:
+    return (
+        pa.types.is_integer(data_type)
+        or pa.types.is_floating(data_type)
+        or pa.types.is_decimal(data_type)
+    )
+
+
+def _is_temporal_type(data_type: pa.DataType) -> bool:
+    return pa.types.is_date(data_type) or pa.types.is_timestamp(data_type)
+
+
+def _is_sql_type_of(
+    sql_type: sqlglot.expressions.DataType, data_type: pa.DataType
+) -> bool:
+    types = sqlglot.expressions.DataType.Type
+    if sql_type.is_type(*sqlglot.expressions.DataType.TEXT_TYPES):
+        return _is_string_type(data_type)
+    if sql_type.is_type(*sqlglot.expressions.DataType.NUMERIC_TYPES):
+        return _is_numeric_type(data_type)
+    if sql_type.is_type(types.DATE, types.DATE32):
+        return pa.types.is_date(data_type)
+    if sql_type.is_type(*sqlglot.expressions.DataType.TEMPORAL_TYPES):
+        return pa.types.is_timestamp(data_type) and not sql_type.is_type(
+            types.TIME, types.TIMETZ
+        )
+    if sql_type.is_type(types.BOOLEAN):
+        return pa.types.is_boolean(data_type)
+    return False
+
+
+def _is_naive_timestamp(value: str, field_type: pa.TimestampType) -> bool:
+    try:
+        pa.scalar(value).cast(pa.timestamp(field_type.unit))
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+        return False
+    return True
+
+
+def _filter_scalar(
+    node: sqlglot.expressions.Expr, field_type: pa.DataType
+) -> "pa.Scalar[Any] | None":
+    cast_type = None
+    if isinstance(node, sqlglot.expressions.Cast):
+        cast_type = node.to
+        node = node.this
+    negate = isinstance(node, sqlglot.expressions.Neg)
+    if negate:
+        node = node.this
+    value: Any
+    if isinstance(node, sqlglot.expressions.Boolean):
+        value = node.this
+        comparable = pa.types.is_boolean(field_type)
+    elif isinstance(node, sqlglot.expressions.Literal) and node.is_string:
+        value = node.this
+        # untyped string literals are cast by DuckDB to the temporal column type
+        comparable = _is_string_type(field_type) or _is_temporal_type(field_type)
+    elif isinstance(node, sqlglot.expressions.Literal):
+        value = float(node.this) if {".", "e", "E"} & set(node.this) else int(node.this)
+        value = -value if negate else value
+        comparable = _is_numeric_type(field_type)
+    else:
+        return None
+    if cast_type is not None:
+        comparable = _is_sql_type_of(cast_type, field_type)
+    if not comparable:
+        # DuckDB casts the column to the literal type otherwise (e.g. '010' = 10
+        # for a string column), which Arrow comparisons cannot reproduce
+        return None
+    if (
+        isinstance(value, str)
+        and pa.types.is_timestamp(field_type)
+        and field_type.tz is not None
+        and _is_naive_timestamp(value, field_type)
+    ):
+        # DuckDB reads timestamps without offset in the session time zone,
+        # which Arrow knows nothing of, so they cannot be compared with stats
+        return None
+    try:
+        scalar: "pa.Scalar[Any]" = pa.scalar(value).cast(field_type)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+        return None
+    return scalar
+
+
+def filter_expression(
+    condition: sqlglot.expressions.Expr, schema: pa.Schema, strict: bool = False
+) -> pc.Expression | None:
+    """
+    Translate a SQL filter condition into an Arrow dataset expression, used to
+    skip partitions, files and row groups with their statistics.
+
+    Unsupported conjuncts are left out of the translation, which then selects
+    a superset of the filtered rows (the condition still being applied by the
+    query itself). `strict` forbids doing so, for negated conditions.
+    """
+    node = condition
+    while isinstance(node, sqlglot.expressions.Paren):
+        node = node.this
+
+    def field(column: sqlglot.expressions.Expr) -> str | None:
+        if isinstance(column, sqlglot.expressions.Column) and column.name in (
+            schema.names
+        ):
+            return column.name
+        return None
+
+    if isinstance(node, sqlglot.expressions.And):
+        left = filter_expression(node.this, schema, strict)
+        right = filter_expression(node.expression, schema, strict)
+        if left is None or right is None:
+            return None if strict else left if right is None else right
+        return left & right
+    if isinstance(node, sqlglot.expressions.Or):
+        left = filter_expression(node.this, schema, strict)
+        right = filter_expression(node.expression, schema, strict)
+        return left | right if left is not None and right is not None else None
+    if isinstance(node, sqlglot.expressions.Not):
+        negated = filter_expression(node.this, schema, strict=True)
+        return ~negated if negated is not None else None
+    if isinstance(node, sqlglot.expressions.Is) and isinstance(
+        node.expression, sqlglot.expressions.Null
+    ):
+        name = field(node.this)
+        return pc.field(name).is_null() if name is not None else None
+    if isinstance(node, sqlglot.expressions.In) and (name := field(node.this)):
+        values = [
+            _filter_scalar(value, schema.field(name).type) for value in node.expressions
+        ]
+        if not values or any(value is None for value in values):
+            return None
+        return pc.field(name).isin(pa.array([value.as_py() for value in values]))  # type: ignore[union-attr]
+    if isinstance(node, sqlglot.expressions.Between) and (name := field(node.this)):
+        low = _filter_scalar(node.args["low"], schema.field(name).type)
+        high = _filter_scalar(node.args["high"], schema.field(name).type)
+        if low is None or high is None:
+            return None
+        return (pc.field(name) >= low) & (pc.field(name) <= high)
+    if type(node) in FILTER_COMPARISONS:
+        for column, literal, comparisons in (
+            (node.this, node.expression, FILTER_COMPARISONS),
+            (node.expression, node.this, FILTER_SWAPPED_COMPARISONS),
+        ):
+            if (name := field(column)) and (
+                value := _filter_scalar(literal, schema.field(name).type)
+            ) is not None:
+                return comparisons[type(node)](pc.field(name), value)  # type: ignore[no-any-return]
+    return None
+
+
+def prune_dataset(
+    table_dataset: padataset.Dataset, expression: pc.Expression
+) -> tuple[padataset.Dataset, DatasetPruning]:
+    """
+    Only keep the data files and Parquet row groups of a dataset which may
+    contain rows matching a filter expression, according to their partition
+    values and column statistics.
+    """
+    if not isinstance(table_dataset, padataset.FileSystemDataset):
+        return table_dataset, DatasetPruning(0, 0, 0)
+
+    total_files = len(table_dataset.files)
+    kept: list[padataset.Fragment] = []
+    kept_files = 0
+    pruned_row_groups = 0
+    for fragment in table_dataset.get_fragments(filter=expression):
+        if isinstance(fragment, padataset.ParquetFileFragment):
+            row_groups = fragment.split_by_row_group(
+                expression, schema=table_dataset.schema
+            )
+            pruned_row_groups += len(fragment.row_groups) - len(row_groups)
+            kept += row_groups
+            kept_files += 1 if row_groups else 0
+        else:
+            kept.append(fragment)
+            kept_files += 1
+
+    pruned_dataset = padataset.FileSystemDataset(
+        kept, table_dataset.schema, table_dataset.format, table_dataset.filesystem
+    )
+    return pruned_dataset, DatasetPruning(
+        total_files, total_files - kept_files, pruned_row_groups
+    )
+
+
+def filter_table_dataset(
+    table: TableProtocol,
+    table_dataset: padataset.Dataset,
+    where: str | None = None,
+    partitions: list[str] | None = None,
+) -> tuple[padataset.Dataset, str | None, DatasetPruning | None]:
+    """
+    Validate table view filters and push them down to the table dataset,
+    returning the pruned dataset, the SQL condition of the filters and the
+    pruning summary.
+    """
+    condition = parse_table_filter(
+        table_dataset.schema,
+        where,
+        partitions,
+        table.metadata().partitions if partitions else None,
+    )
+    if condition is None:
+        return table_dataset, None, None
+    where_sql = condition.sql(dialect=sqlglot.dialects.duckdb.DuckDB, identify=True)
+    expression = filter_expression(condition, table_dataset.schema)
+    if expression is None:
+        return table_dataset, where_sql, None
+    pruned_dataset, pruning = prune_dataset(table_dataset, expression)
+    return pruned_dataset, where_sql, pruning
+
+
 def generate_table_statistics_query(table_name: str) -> str:
     summarize_expr = sqlglot.expressions.Summarize(
         this=sqlglot.expressions.Table(this=f'"{table_name}"')
@@ -293,6 +1300,944 @@ def generate_table_statistics_query(table_name: str) -> str:
     return query_expr.sql(dialect=sqlglot.dialects.duckdb.DuckDB, identify=True)
 
 
+STATISTICS_FIELDS: "list[pa.Field[Any]]" = [
+    pa.field("column_name", pa.string()),
+    pa.field("count", pa.int64()),
+    pa.field("null_count", pa.int64()),
+    pa.field("min", pa.string()),
+    pa.field("max", pa.string()),
+    pa.field("source", pa.string()),
+]
+STATISTICS_SCHEMA = pa.schema(STATISTICS_FIELDS)
+
+
+def generate_columns_statistics_query(table_name: str, columns: list[str]) -> str:
+    """
+    Single scan aggregate query of the row count, and the non-null count, min
+    and max values of each given column.
+    """
+    aggregates = [
+        sqlglot.expressions.Count(this=sqlglot.expressions.Star()).as_("count")
+    ]
+    for i, column in enumerate(columns):
+        column_expr = sqlglot.expressions.column(column, quoted=True)
+        aggregates += [
+            sqlglot.expressions.Count(this=column_expr.copy()).as_(f"count_{i}"),
+            sqlglot.expressions.cast(
+                sqlglot.expressions.Min(this=column_expr.copy()), "VARCHAR"
+            ).as_(f"min_{i}"),
+            sqlglot.expressions.cast(
+                sqlglot.expressions.Max(this=column_expr.copy()), "VARCHAR"
+            ).as_(f"max_{i}"),
+        ]
+    query_expr = sqlglot.select(*aggregates).from_(
+        sqlglot.expressions.Table(this=f'"{table_name}"')
+    )
+    return query_expr.sql(dialect=sqlglot.dialects.duckdb.DuckDB, identify=True)
+
+
+def _file_statistics_field(
+    file_stats: pa.Table, statistic: str, column: str
+) -> "pa.ChunkedArray[Any] | None":
+    if statistic not in file_stats.column_names:
+        return None
+    stats_type = file_stats.schema.field(statistic).type
+    if not pa.types.is_struct(stats_type) or stats_type.get_field_index(column) < 0:
+        return None
+    values: pa.ChunkedArray[Any] = pc.struct_field(file_stats.column(statistic), column)
+    return values
+
+
+def _statistics_value(
+    values: "pa.ChunkedArray[Any] | None", aggregate: str, data_type: pa.DataType
+) -> str | None:
+    # min and max values are not recorded for all types (nested, binary...)
+    if values is None or pa.types.is_nested(values.type):
+        return None
+    value: pa.Scalar[Any] = pc.call_function(aggregate, [values])
+    if not value.is_valid:
+        return None
+    if pa.types.is_floating(data_type):
+        # statistics may be recorded with a wider type than the column one
+        return str(value.cast(data_type).cast(pa.string()).as_py())
+    return str(value.as_py())
+
+
+def aggregate_file_statistics(schema: pa.Schema, file_stats: pa.Table) -> pa.Table:
+    """
+    Aggregate per-file statistics from table metadata into table-level row
+    count, null counts, min and max values, without reading any data file.
+
+    Partition columns statistics are exact, derived from the partition values
+    of each file. Other columns without statistics for every file are reported
+    with a `missing` source and empty values.
+    """
+    num_records = file_stats.column("num_records")
+    complete_counts = num_records.null_count == 0
+    count = pc.sum(num_records).as_py() or 0
+
+    rows: list[dict[str, Any]] = []
+    for column_field in schema:
+        partition_values = _file_statistics_field(
+            file_stats, "partition", column_field.name
+        )
+        if complete_counts and partition_values is not None:
+            # all the rows of a file share the same partition value
+            null_records = pc.filter(num_records, pc.is_null(partition_values))
+            rows.append(
+                {
+                    "column_name": column_field.name,
+                    "count": count,
+                    "null_count": pc.sum(null_records).as_py() or 0,
+                    "min": _statistics_value(
+                        partition_values, "min", column_field.type
+                    ),
+                    "max": _statistics_value(
+                        partition_values, "max", column_field.type
+                    ),
+                    "source": "metadata",
+                }
+            )
+            continue
+
+        null_counts = _file_statistics_field(
+            file_stats, "null_count", column_field.name
+        )
+        has_stats = complete_counts and (
+            file_stats.num_rows == 0
+            or (
+                null_counts is not None
+                and pa.types.is_integer(null_counts.type)
+                and null_counts.null_count == 0
+            )
+        )
+        if not has_stats:
+            rows.append({"column_name": column_field.name, "source": "missing"})
+            continue
+
+        mins = _file_statistics_field(file_stats, "min", column_field.name)
+        maxs = _file_statistics_field(file_stats, "max", column_field.name)
+        rows.append(
+            {
+                "column_name": column_field.name,
+                "count": count,
+                "null_count": pc.sum(null_counts).as_py() or 0
+                if null_counts is not None
+                else 0,
+                "min": _statistics_value(mins, "min", column_field.type),
+                "max": _statistics_value(maxs, "max", column_field.type),
+                "source": "metadata",
+            }
+        )
+    return pa.Table.from_pylist(rows, schema=STATISTICS_SCHEMA)
+
+
+def scan_columns_statistics(
+    table_name: str, table_dataset: padataset.Dataset, columns: list[str]
+) -> pa.Table:
+    """
+    Compute the statistics of the given columns with a full table scan.
+    """
+    sql_query = generate_columns_statistics_query(table_name, columns)
+    results = execute_query({table_name: table_dataset}, sql_query).to_pylist()[0]
+    return pa.Table.from_pylist(
+        [
+            {
+                "column_name": column,
+                "count": results["count"],
+                "null_count": results["count"] - results[f"count_{i}"],
+                "min": results[f"min_{i}"],
+                "max": results[f"max_{i}"],
+                "source": "scan",
+            }
+            for i, column in enumerate(columns)
+        ],
+        schema=STATISTICS_SCHEMA,
+    )
+
+
+APPROX_STATISTICS_FIELDS: "list[pa.Field[Any]]" = [
+    pa.field("column_name", pa.string()),
+    pa.field("count", pa.int64()),
+    pa.field("null_count", pa.int64()),
+    pa.field("distinct_count", pa.int64()),
+    pa.field("avg", pa.float64()),
+    pa.field("avg_ci95", pa.float64()),
+    pa.field("std", pa.float64()),
+    pa.field("min", pa.string()),
+    *[pa.field(f"p{round(q * 100)}", pa.string()) for q in APPROX_QUANTILES],
+    pa.field("max", pa.string()),
+]
+APPROX_STATISTICS_SCHEMA = pa.schema(APPROX_STATISTICS_FIELDS)
+
+
+def _is_quantifiable(data_type: pa.DataType) -> bool:
+    return (
+        _is_summable(data_type)
+        or pa.types.is_decimal(data_type)
+        or pa.types.is_date(data_type)
+        or pa.types.is_time(data_type)
+        or pa.types.is_timestamp(data_type)
+    )
+
+
+def _fragment_rows(fragment: padataset.Fragment) -> int:
+    if isinstance(fragment, padataset.ParquetFileFragment):
+        # row group fragments only count their own row groups
+        return sum(row_group.num_rows for row_group in fragment.row_groups)
+    return fragment.count_rows()
+
+
+def sample_dataset(
+    table_dataset: padataset.Dataset,
+    total_rows: int,
+    fraction: float = APPROX_SAMPLE_FRACTION,
+    min_rows: int = APPROX_MIN_SAMPLE_ROWS,
+    seed: int = 0,
+) -> tuple[padataset.Dataset, int]:
+    """
+    Sample random data files of a dataset until reaching the given fraction of
+    the table rows (or the minimum number of rows).
+
+    Tables with too few data files for a representative file sample are
+    sampled by Parquet row groups across all their files instead. Sampling is
+    deterministic for a given seed, and returns the sampled dataset along with
+    its number of rows.
+    """
+    target_rows = max(math.ceil(total_rows * fraction), min_rows)
+    if target_rows >= total_rows or not isinstance(
+        table_dataset, padataset.FileSystemDataset
+    ):
+        return table_dataset, total_rows
+
+    rng = random.Random(seed)
+    units: list[padataset.Fragment] = list(table_dataset.get_fragments())
+    if len(units) * fraction < APPROX_MIN_SAMPLE_FILES:
+        units = [
+            row_group
+            for fragment in units
+            for row_group in (
+                fragment.split_by_row_group()
+                if isinstance(fragment, padataset.ParquetFileFragment)
+                else [fragment]
+            )
+        ]
+    rng.shuffle(units)
+
+    sampled = []
+    sample_rows = 0
+    for unit in units:
+        if sample_rows >= target_rows:
+            break
+        sampled.append(unit)
+        sample_rows += _fragment_rows(unit)
+
+    sampled_dataset = padataset.FileSystemDataset(
+        sampled,
+        table_dataset.schema,
+        table_dataset.format,
+        table_dataset.filesystem,
+    )
+    return sampled_dataset, sample_rows
+
+
+def generate_approx_statistics_query(table_name: str, schema: pa.Schema) -> str:
+    """
+    Single scan aggregate query of the row count, and the non-null count,
+    approximate distinct count, min and max values, average, standard deviation
+    and approximate quantiles of each column, depending on its type.
+    """
+    aggregates = [
+        sqlglot.expressions.Count(this=sqlglot.expressions.Star()).as_("count")
+    ]
+    for i, column_field in enumerate(schema):
+        column_expr = sqlglot.expressions.column(column_field.name, quoted=True)
+        aggregates.append(
+            sqlglot.expressions.Count(this=column_expr.copy()).as_(f"count_{i}")
+        )
+        if pa.types.is_nested(column_field.type):
+            continue
+        aggregates += [
+            sqlglot.expressions.ApproxDistinct(this=column_expr.copy()).as_(
+                f"distinct_{i}"
+            ),
+            sqlglot.expressions.cast(
+                sqlglot.expressions.Min(this=column_expr.copy()), "VARCHAR"
+            ).as_(f"min_{i}"),
+            sqlglot.expressions.cast(
+                sqlglot.expressions.Max(this=column_expr.copy()), "VARCHAR"
+            ).as_(f"max_{i}"),
+        ]
+        if _is_summable(column_field.type):
+            aggregates += [
+                sqlglot.expressions.Avg(this=column_expr.copy()).as_(f"avg_{i}"),
+                sqlglot.expressions.StddevSamp(this=column_expr.copy()).as_(f"std_{i}"),
+            ]
+        if _is_quantifiable(column_field.type):
+            aggregates += [
+                sqlglot.expressions.cast(
+                    sqlglot.expressions.ApproxQuantile(
+                        this=column_expr.copy(),
+                        quantile=sqlglot.expressions.Literal.number(quantile),
+                    ),
+                    "VARCHAR",
+                ).as_(f"p{round(quantile * 100)}_{i}")
+                for quantile in APPROX_QUANTILES
+            ]
+    query_expr = sqlglot.select(*aggregates).from_(
+        sqlglot.expressions.Table(this=f'"{table_name}"')
+    )
+    return query_expr.sql(dialect=sqlglot.dialects.duckdb.DuckDB, identify=True)
+
+
+def approx_columns_statistics(
+    table_name: str,
+    table_dataset: padataset.Dataset,
+    total_rows: int,
+    fraction: float = APPROX_SAMPLE_FRACTION,
+    seed: int = 0,
+) -> pa.Table:
+    """
+    Estimate the statistics of all columns from a sample of the table.
+
+    Counts are extrapolated to the whole table, averages are reported with the
+    half-width of their 95% confidence interval, while distinct counts and
+    min, max and quantile values are those of the sample. The sample size is
+    attached to the schema metadata (see `statistics_sample`).
+    """
+    sampled_dataset, sample_rows = sample_dataset(
+        table_dataset, total_rows, fraction=fraction, seed=seed
+    )
+    sql_query = generate_approx_statistics_query(table_name, table_dataset.schema)
+    results = execute_query({table_name: sampled_dataset}, sql_query).to_pylist()[0]
+    scale = total_rows / sample_rows if sample_rows else 0.0
+
+    rows = []
+    for i, column in enumerate(table_dataset.schema.names):
+        sample_count = results[f"count_{i}"]
+        count = round(sample_count * scale)
+        std = results.get(f"std_{i}")
+        avg_ci95 = None
+        if std is not None and count > 1:
+            # normal approximation, with finite population correction
+            correction = math.sqrt(max(count - sample_count, 0) / (count - 1))
+            avg_ci95 = 1.96 * std / math.sqrt(sample_count) * correction
+        rows.append(
+            {
+                "column_name": column,
+                "count": total_rows,
+                "null_count": total_rows - count,
+                "distinct_count": min(results.get(f"distinct_{i}") or 0, sample_count),
+                "avg": results.get(f"avg_{i}"),
+                "avg_ci95": avg_ci95,
+                "std": std,
+                "min": results.get(f"min_{i}"),
+                **{
+                    f"p{round(q * 100)}": results.get(f"p{round(q * 100)}_{i}")
+                    for q in APPROX_QUANTILES
+                },
+                "max": results.get(f"max_{i}"),
+            }
+        )
+
+    sampled_files = (
+        {fragment.path for fragment in sampled_dataset.get_fragments()}
+        if isinstance(sampled_dataset, padataset.FileSystemDataset)
+        else set()
+    )
+    total_files = (
+        len(table_dataset.files)
+        if isinstance(table_dataset, padataset.FileSystemDataset)
+        else 0
+    )
+    metadata = {
+        "sample_rows": str(sample_rows),
+        "total_rows": str(total_rows),
+        "sampled_files": str(len(sampled_files)),
+        "total_files": str(total_files),
+    }
+    return pa.Table.from_pylist(
+        rows, schema=APPROX_STATISTICS_SCHEMA.with_metadata(metadata)
+    )
+
+
+def statistics_sample(statistics: pa.Table) -> dict[str, int] | None:
+    """
+    Sample size of approximate statistics, or None for other statistics.
+    """
+    metadata = statistics.schema.metadata or {}
+    if b"sample_rows" not in metadata:
+        return None
+    return {
+        key: int(metadata[key.encode()])
+        for key in ("sample_rows", "total_rows", "sampled_files", "total_files")
+    }
+
+
+# offset of exponential histogram bucket keys, above the binary exponent of
+# the smallest subnormal float64 value
+HISTOGRAM_EXPONENT_OFFSET = 1_100
+
+
+def _histogram_bucket_label(key: int) -> str:
+    if key == 0:
+        return "0"
+    exponent = abs(key) - HISTOGRAM_EXPONENT_OFFSET
+    low, high = 2.0 ** (exponent - 1), 2.0**exponent
+    if key < 0:
+        return f"(-{high:g}, -{low:g}]"
+    return f"[{low:g}, {high:g})"
+
+
+def _profile_scalar_dump(value: Any, data_type: pa.DataType) -> str | None:
+    if value is None:
+        return None
+    try:
+        dumped: str = pa.scalar(value, data_type).cast(pa.string()).as_py()
+    except (pa.ArrowException, TypeError):
+        return None
+    return dumped
+
+
+def _profile_strings(values: "pa.Array[Any]") -> list[str]:
+    # same representation as other statistics modes, floating values being
+    # cast by Arrow to avoid displaying widened float32 values
+    if pa.types.is_floating(values.type):
+        floats: Any = pc.cast(values, pa.string()).to_pylist()
+        return list(floats)
+    return [str(value) for value in values.to_pylist()]
+
+
+def _profile_scalar_load(value: str | None, data_type: pa.DataType) -> Any:
+    if value is None:
+        return None
+    try:
+        return pa.scalar(value, pa.string()).cast(data_type).as_py()
+    except pa.ArrowException:
+        return None
+
+
+@dataclass
+class ColumnProfile:
+    """
+    Mergeable summary of the values of a column: counts, mean and sum of
+    squared deviations from it (`m2`) for the standard deviation, min and max
+    values, HyperLogLog registers for distinct counts, most frequent values and
+    an exponential histogram.
+
+    Means and `m2` are merged with Chan's parallel algorithm, which unlike raw
+    sums of squares does not cancel out for values far from zero.
+
+    Most frequent values only keep the `PROFILE_TOP_K_CAPACITY` largest counts
+    between updates, so they are approximate for high cardinality columns.
+    """
+
+    count: int = 0
+    null_count: int = 0
+    avg: float = 0.0
+    m2: float = 0.0
+    min: Any = None
+    max: Any = None
+    registers: npt.NDArray[np.uint8] = field(
+        default_factory=lambda: np.zeros(2**PROFILE_HLL_PRECISION, dtype=np.uint8)
+    )
+    top_values: dict[str, int] = field(default_factory=dict)
+    histogram: dict[int, int] = field(default_factory=dict)
+
+    def update(self, values: "pa.Array[Any]", hashes: "pa.Array[Any]") -> None:
+        """
+        Merge a batch of values, along with their 64-bit hashes.
+        """
+        valid_count = len(values) - values.null_count
+        if _is_summable(values.type):
+            floats = pc.cast(values, pa.float64())
+            if valid_count:
+                variance = pc.variance(floats, ddof=0).as_py()
+                self._merge_moments(
+                    valid_count, pc.mean(floats).as_py(), variance * valid_count
+                )
+            self._update_histogram(floats)
+        self.null_count += values.null_count
+        self.count += valid_count
+        valid = pc.is_valid(values)
+        self._update_registers(pc.filter(hashes, valid))
+
+        if pa.types.is_nested(values.type):
+            return
+        try:
+            min_max: Any = pc.min_max(values).as_py()
+            value_counts = pc.value_counts(values.drop_null())
+        except pa.ArrowException:
+            return
+        keys = _profile_strings(value_counts.field("values"))
+        counts: Any = value_counts.field("counts").to_pylist()
+        self.merge_min_max(min_max["min"], min_max["max"])
+        self.merge_top_values(dict(zip(keys, counts)))
+
+    def merge(self, other: "ColumnProfile") -> None:
+        self._merge_moments(other.count, other.avg, other.m2)
+        self.count += other.count
+        self.null_count += other.null_count
+        self.merge_min_max(other.min, other.max)
+        np.maximum(self.registers, other.registers, out=self.registers)
+        self.merge_top_values(other.top_values)
+        for key, count in other.histogram.items():
+            self.histogram[key] = self.histogram.get(key, 0) + count
+
+    def _merge_moments(self, count: int, avg: float, m2: float) -> None:
+        # to be called before adding count to the profile one
+        if count == 0:
+            return
+        total = self.count + count
+        delta = avg - self.avg
+        self.avg += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+
+    def merge_min_max(self, min_value: Any, max_value: Any) -> None:
+        if min_value is not None:
+            self.min = min_value if self.min is None else min(self.min, min_value)
+        if max_value is not None:
+            self.max = max_value if self.max is None else max(self.max, max_value)
+
+    def merge_top_values(self, top_values: dict[str, int]) -> None:
+        for key, count in top_values.items():
+            self.top_values[key] = self.top_values.get(key, 0) + count
+        if len(self.top_values) > PROFILE_TOP_K_CAPACITY:
+            self.top_values = dict(
+                heapq.nlargest(
+                    PROFILE_TOP_K_CAPACITY,
+                    self.top_values.items(),
+                    key=operator.itemgetter(1),
+                )
+            )
+
+    def _update_registers(self, hashes: "pa.Array[Any]") -> None:
+        values = hashes.to_numpy(zero_copy_only=False).astype(np.uint64)
+        suffix_bits = 64 - PROFILE_HLL_PRECISION
+        indices = (values >> np.uint64(suffix_bits)).astype(np.intp)
+        suffixes = values & np.uint64((1 << suffix_bits) - 1)
+        # rank of the leftmost set bit, exact as suffixes fit in a float64
+        _, bit_lengths = np.frexp(suffixes.astype(np.float64))
+        ranks = (suffix_bits - bit_lengths + 1).astype(np.uint8)
+        np.maximum.at(self.registers, indices, ranks)
+
+    def _update_histogram(self, floats: "pa.Array[Any]") -> None:
+        values = floats.drop_null().to_numpy(zero_copy_only=False)
+        values = values[np.isfinite(values)]
+        _, exponents = np.frexp(values)
+        keys = np.where(
+            values == 0,
+            0,
+            np.sign(values).astype(np.int64)
+            * (exponents.astype(np.int64) + HISTOGRAM_EXPONENT_OFFSET),
+        )
+        for key, count in zip(*np.unique(keys, return_counts=True)):
+            self.histogram[int(key)] = self.histogram.get(int(key), 0) + int(count)
+
+    def distinct_count(self) -> int:
+        if self.count == 0:
+            return 0
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / float(np.sum(np.exp2(-self.registers.astype(float))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # linear counting is more accurate for small cardinalities
+            estimate = m * math.log(m / zeros)
+        return min(round(estimate), self.count)
+
+    def mean(self) -> float | None:
+        return self.avg if self.count else None
+
+    def std(self) -> float | None:
+        if self.count < 2:
+            return None
+        return math.sqrt(max(self.m2 / (self.count - 1), 0.0))
+
+    def to_dict(self, data_type: pa.DataType) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "null_count": self.null_count,
+            "avg": self.avg,
+            "m2": self.m2,
+            "min": _profile_scalar_dump(self.min, data_type),
+            "max": _profile_scalar_dump(self.max, data_type),
+            "registers": base64.b64encode(self.registers.tobytes()).decode(),
+            "top_values": self.top_values,
+            "histogram": {str(key): count for key, count in self.histogram.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any], data_type: pa.DataType) -> "ColumnProfile":
+        return cls(
+            count=data["count"],
+            null_count=data["null_count"],
+            avg=data["avg"],
+            m2=data["m2"],
+            min=_profile_scalar_load(data["min"], data_type),
+            max=_profile_scalar_load(data["max"], data_type),
+            registers=np.frombuffer(
+                base64.b64decode(data["registers"]), dtype=np.uint8
+            ).copy(),
+            top_values=data["top_values"],
+            histogram={int(key): count for key, count in data["histogram"].items()},
+        )
+
+
+@dataclass
+class TableProfile:
+    """
+    Column profiles of a table version, along with the data files they were
+    computed from.
+    """
+
+    table_id: str
+    version: int
+    schema: pa.Schema
+    files: set[str] = field(default_factory=set)
+    columns: dict[str, ColumnProfile] = field(default_factory=dict)
+
+    def to_json(self) -> bytes:
+        return orjson.dumps(
+            {
+                "table_id": self.table_id,
+                "version": self.version,
+                "schema": base64.b64encode(
+                    self.schema.serialize().to_pybytes()
+                ).decode(),
+                "files": sorted(self.files),
+                "columns": {
+                    name: self.columns[name].to_dict(self.schema.field(name).type)
+                    for name in self.columns
+                },
+            }
+        )
+
+    @classmethod
+    def from_json(cls, data: bytes) -> "TableProfile":
+        payload = orjson.loads(data)
+        schema = pa.ipc.read_schema(pa.py_buffer(base64.b64decode(payload["schema"])))
+        return cls(
+            table_id=payload["table_id"],
+            version=payload["version"],
+            schema=schema,
+            files=set(payload["files"]),
+            columns={
+                name: ColumnProfile.from_dict(column, schema.field(name).type)
+                for name, column in payload["columns"].items()
+            },
+        )
+
+
+PROFILE_STATISTICS_FIELDS: "list[pa.Field[Any]]" = [
+    pa.field("column_name", pa.string()),
+    pa.field("count", pa.int64()),
+    pa.field("null_count", pa.int64()),
+    pa.field("distinct_count", pa.int64()),
+    pa.field("mean", pa.float64()),
+    pa.field("std", pa.float64()),
+    pa.field("min", pa.string()),
+    pa.field("max", pa.string()),
+    pa.field("top_values", pa.string()),
+    pa.field("histogram", pa.string()),
+]
+PROFILE_STATISTICS_SCHEMA = pa.schema(PROFILE_STATISTICS_FIELDS)
+
+
+def _profile_display(value: Any, data_type: pa.DataType) -> str | None:
+    if value is None:
+        return None
+    return _profile_strings(pa.array([value], data_type))[0]
+
+
+def profile_statistics(profile: TableProfile) -> pa.Table:
+    rows = []
+    for column_field in profile.schema:
+        column = profile.columns[column_field.name]
+        top_values = heapq.nlargest(
+            PROFILE_TOP_K, column.top_values.items(), key=operator.itemgetter(1)
+        )
+        rows.append(
+            {
+                "column_name": column_field.name,
+                "count": column.count + column.null_count,
+                "null_count": column.null_count,
+                "distinct_count": column.distinct_count(),
+                "mean": column.mean() if _is_summable(column_field.type) else None,
+                "std": column.std() if _is_summable(column_field.type) else None,
+                "min": _profile_display(column.min, column_field.type),
+                "max": _profile_display(column.max, column_field.type),
+                "top_values": ", ".join(
+                    f"{value} ({count})" for value, count in top_values
+                )
+                or None,
+                "histogram": ", ".join(
+                    f"{_histogram_bucket_label(key)}: {count}"
+                    for key, count in sorted(column.histogram.items())
+                )
+                or None,
+            }
+        )
+    return pa.Table.from_pylist(rows, schema=PROFILE_STATISTICS_SCHEMA)
+
+
+def _profile_dataset(
+    profile: TableProfile, table_name: str, table_dataset: padataset.Dataset
+) -> None:
+    selections = []
+    for i, name in enumerate(profile.columns):
+        column_expr = sqlglot.expressions.column(name, quoted=True)
+        selections += [
+            sqlglot.expressions.Anonymous(
+                this="hash", expressions=[column_expr.copy()]
+            ).as_(f"h{i}"),
+            column_expr.copy().as_(f"v{i}"),
+        ]
+    sql_query = (
+        sqlglot.select(*selections)
+        .from_(sqlglot.expressions.Table(this=f'"{table_name}"'))
+        .sql(dialect=sqlglot.dialects.duckdb.DuckDB, identify=True)
+    )
+    for batch in execute_query_stream({table_name: table_dataset}, sql_query):
+        for i, column in enumerate(profile.columns.values()):
+            column.update(batch.column(f"v{i}"), batch.column(f"h{i}"))
+
+
+def profile_table(
+    table_name: str,
+    table: TableProtocol,
+    version: int | None = None,
+    cache: "StatisticsCache | None" = None,
+) -> TableProfile:
+    """
+    Profile the columns of a table version incrementally: only the data files
+    added since the last profiled version are scanned, and profiles are only
+    rebuilt from scratch when files were removed or the schema changed.
+    """
+    if version is None:
+        version = table.version()
+    table_id = table.metadata().id
+    table_dataset = table.dataset(version=version)
+    fragments = {fragment.path: fragment for fragment in table_dataset.get_fragments()}
+
+    stored = cache.get_profile(table_id) if cache is not None else None
+    profile = stored
+    if (
+        profile is None
+        or profile.version > version
+        or profile.schema != table_dataset.schema
+        or not profile.files <= fragments.keys()
+        or not isinstance(table_dataset, padataset.FileSystemDataset)
+    ):
+        profile = TableProfile(
+            table_id=table_id,
+            version=version,
+            schema=table_dataset.schema,
+            columns={name: ColumnProfile() for name in table_dataset.schema.names},
+        )
+
+    new_files = sorted(fragments.keys() - profile.files)
+    if new_files and isinstance(table_dataset, padataset.FileSystemDataset):
+        table_dataset = padataset.FileSystemDataset(
+            [fragments[path] for path in new_files],
+            table_dataset.schema,
+            table_dataset.format,
+            table_dataset.filesystem,
+        )
+    if new_files:
+        _profile_dataset(profile, table_name, table_dataset)
+    profile.version = version
+    profile.files = set(fragments)
+
+    # profiles of older versions never replace the most recent one
+    if cache is not None and (stored is None or stored.version <= version):
+        cache.put_profile(profile)
+    return profile
+
+
+class StatisticsCache:
+    """
+    On-disk cache of table statistics, stored as Arrow IPC files along with
+    JSON table profiles, bounded by their total size in bytes, least recently
+    used files being evicted first.
+
+    Entries are keyed by table id and version, whose statistics never change,
+    so that they are shared across processes and restarts.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(
+        table_id: str,
+        version: int,
+        mode: StatisticsModeEnum,
+        scan_missing: bool = False,
+    ) -> str:
+        options = f"{mode.value}-scan" if scan_missing else mode.value
+        return f"{table_id}-v{version}-{options}"
+
+    def get(self, key: str) -> pa.Table | None:
+        path = self._path(key)
+        try:
+            with pa.ipc.open_file(str(path)) as reader:
+                statistics = reader.read_all()
+            path.touch()
+        except (OSError, pa.ArrowInvalid):
+            return None
+        return statistics
+
+    def put(self, key: str, statistics: pa.Table) -> bool:
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_file(sink, statistics.schema) as writer:
+            writer.write_table(statistics)
+        if not self._write(self._path(key), sink.getvalue().to_pybytes()):
+            return False
+        self._evict()
+        return True
+
+    def get_profile(self, table_id: str) -> "TableProfile | None":
+        path = self.cache_dir / f"{table_id}.profile.json"
+        try:
+            profile = TableProfile.from_json(path.read_bytes())
+            path.touch()
+        except (OSError, ValueError, KeyError, pa.ArrowInvalid):
+            return None
+        return profile
+
+    def put_profile(self, profile: TableProfile) -> bool:
+        path = self.cache_dir / f"{profile.table_id}.profile.json"
+        if not self._write(path, profile.to_json()):
+            return False
+        self._evict()
+        return True
+
+    def _write(self, path: Path, data: bytes) -> bool:
+        if self.max_bytes <= 0 or len(data) > self.max_bytes:
+            return False
+
+        # write to a temporary file first, so concurrent readers never see
+        # partially written entries
+        tmp_path = path.with_name(f"{path.name}.{secrets.token_hex(8)}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(data)
+            tmp_path.replace(path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            return False
+        return True
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.arrow"
+
+    def _evict(self) -> None:
+        entries = []
+        paths = [
+            *self.cache_dir.glob("*.arrow"),
+            *self.cache_dir.glob("*.profile.json"),
+        ]
+        for path in paths:
+            try:
+                entries.append((path.stat(), path))
+            except FileNotFoundError:  # evicted by another process
+                continue
+        entries.sort(key=lambda entry: entry[0].st_mtime)
+
+        nbytes = sum(stat.st_size for stat, _ in entries)
+        for stat, path in entries:
+            if nbytes <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            nbytes -= stat.st_size
+
+
+def compute_table_statistics(
+    table_name: str,
+    table: TableProtocol,
+    version: int | None = None,
+    mode: StatisticsModeEnum = StatisticsModeEnum.exact,
+    scan_missing: bool = False,
+    cache: StatisticsCache | None = None,
+) -> pa.Table:
+    """
+    Compute summary statistics of a table.
+
+    The `exact` mode summarizes the whole table with a full scan, while the
+    `metadata` mode only aggregates the statistics recorded in the table log,
+    optionally scanning the columns lacking them. The `profile` mode extends
+    column profiles with the data files added since the last profiled version,
+    and the `approx` mode estimates statistics from a sample of the table.
+
+    With a cache, statistics are computed at most once per table version.
+    """
+    if cache is None:
+        return _compute_table_statistics(
+            table_name, table, version, mode, scan_missing, cache
+        )
+
+    if version is None:
+        version = table.version()
+    cache_key = cache.key(table.metadata().id, version, mode, scan_missing)
+    if (statistics := cache.get(cache_key)) is not None:
+        return statistics
+
+    statistics = _compute_table_statistics(
+        table_name, table, version, mode, scan_missing, cache
+    )
+    cache.put(cache_key, statistics)
+    return statistics
+
+
+def _compute_table_statistics(
+    table_name: str,
+    table: TableProtocol,
+    version: int | None,
+    mode: StatisticsModeEnum,
+    scan_missing: bool,
+    cache: StatisticsCache | None = None,
+) -> pa.Table:
+    if mode == StatisticsModeEnum.profile:
+        return profile_statistics(profile_table(table_name, table, version, cache))
+
+    table_dataset = table.dataset(version=version)
+    if mode == StatisticsModeEnum.approx:
+        num_records = table.file_statistics(version=version).column("num_records")
+        total_rows = (
+            pc.sum(num_records).as_py() or 0
+            if num_records.null_count == 0
+            else table_dataset.count_rows()
+        )
+        return approx_columns_statistics(table_name, table_dataset, total_rows)
+    if mode == StatisticsModeEnum.exact:
+        sql_query = generate_table_statistics_query(table_name)
+        return execute_query({table_name: table_dataset}, sql_query)
+
+    statistics = aggregate_file_statistics(
+        table_dataset.schema, table.file_statistics(version=version)
+    )
+    missing_columns = [
+        row["column_name"]
+        for row in statistics.to_pylist()
+        if row["source"] == "missing"
+    ]
+    if not scan_missing or not missing_columns:
+        return statistics
+
+    scanned = {
+        row["column_name"]: row
+        for row in scan_columns_statistics(
+            table_name, table_dataset, missing_columns
+        ).to_pylist()
+    }
+    return pa.Table.from_pylist(
+        [scanned.get(row["column_name"], row) for row in statistics.to_pylist()],
+        schema=STATISTICS_SCHEMA,
+    )
+
+
 def limit_query(sql_query: str, max_limit: int) -> str:
     try:
         query_ast = sqlglot.parse(sql_query, dialect=sqlglot.dialects.duckdb.DuckDB)
@@ -316,6 +2261,179 @@ def limit_query(sql_query: str, max_limit: int) -> str:
     )
 
 
+def _is_summable(data_type: pa.DataType) -> bool:
+    return pa.types.is_integer(data_type) or pa.types.is_floating(data_type)
+
+
+def totals_schema(schema: pa.Schema) -> pa.Schema:
+    """
+    Schema of the totals row of results: sums are widened to 64 bits, as with
+    Arrow sum kernels, so that they never overflow the columns types.
+    """
+
+    def totals_type(data_type: pa.DataType) -> pa.DataType:
+        if pa.types.is_floating(data_type):
+            return pa.float64()
+        if pa.types.is_unsigned_integer(data_type):
+            return pa.uint64()
+        if pa.types.is_integer(data_type):
+            return pa.int64()
+        return data_type
+
+    return pa.schema([field.with_type(totals_type(field.type)) for field in schema])
+
+
+def totals_query(sql_query: str, schema: pa.Schema) -> str | None:
+    """
+    Wrap the last statement of a query (SELECT or set operation) into an
+    aggregate summing its numeric columns, or return None if there is nothing
+    to sum.
+    """
+    try:
+        query_ast = sqlglot.parse(sql_query, dialect=sqlglot.dialects.duckdb.DuckDB)
+    except sqlglot.errors.SqlglotError as e:
+        raise ValueError(f"Error: {e}") from e
+
+    if not query_ast or not isinstance(query_ast[-1], sqlglot.expressions.Query):
+        return None
+
+    # result columns are renamed positionally, as their names may be duplicated
+    aliases = [f"c{i}" for i in range(len(schema))]
+    sums = [
+        sqlglot.expressions.Sum(
+            this=sqlglot.expressions.column(alias, quoted=True)
+        ).as_(alias, quoted=True)
+        for alias, field in zip(aliases, schema)
+        if _is_summable(field.type)
+    ]
+    if not sums:
+        return None
+
+    query_ast[-1] = sqlglot.select(*sums).from_(
+        sqlglot.expressions.Subquery(
+            this=query_ast[-1],
+            alias=sqlglot.expressions.TableAlias(
+                this=sqlglot.expressions.to_identifier("results"),
+                columns=[sqlglot.expressions.to_identifier(a) for a in aliases],
+            ),
+        )
+    )
+    return "; ".join(
+        [
+            stmt.sql(dialect=sqlglot.dialects.duckdb.DuckDB, identify=True)
+            for stmt in query_ast
+            if stmt is not None
+        ]
+    )
+
+
+@dataclass
+class PooledConnection:
+    conn: duckdb.DuckDBPyConnection
+    views: dict[str, padataset.Dataset] = field(default_factory=dict)
+    reusable: bool = True
+
+    def register_dataset(
+        self, table_name: str, table_dataset: padataset.Dataset
+    ) -> None:
+        if self.views.get(table_name) is table_dataset:
+            return
+
+        # ATTACH IF NOT EXISTS ':memory:' AS {catalog.name};
+        # CREATE SCHEMA IF NOT EXISTS {catalog.name}.{database.name};
+        # USE {catalog.name}.{database.name};
+        # CREATE VIEW IF NOT EXISTS {table.name} AS FROM {table.name}_dataset;
+
+        # re-registering the underlying dataset swaps the view target in place,
+        # so the view itself only needs to be created once per connection
+        view_name = f"{table_name}_view"
+        self.conn.register(view_name, table_dataset)
+        if table_name not in self.views:
+            self.conn.execute(
+                f'create or replace temp view "{table_name}" as select * from "{view_name}"'  # nosec B608
+            )
+        self.views[table_name] = table_dataset
+
+    def unregister_datasets(self, table_names: Iterable[str]) -> None:
+        for table_name in list(table_names):
+            if self.views.pop(table_name, None) is None:
+                continue
+            self.conn.execute(f'drop view if exists "{table_name}"')  # nosec B608
+            self.conn.unregister(f"{table_name}_view")
+
+
+class ConnectionPool:
+    """
+    Pool of long-lived DuckDB connections.
+
+    Each pooled connection keeps track of the datasets registered as views,
+    so tables are only registered again when a different dataset (e.g. a new
+    table version) is provided.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_CONNECTION_POOL_SIZE) -> None:
+        self.max_size = max_size
+        self._idle: queue.LifoQueue[PooledConnection] = queue.LifoQueue()
+
+    @contextmanager
+    def connection(self) -> Iterator[PooledConnection]:
+        try:
+            pooled = self._idle.get_nowait()
+        except queue.Empty:
+            pooled = PooledConnection(conn=duckdb.connect())
+
+        try:
+            yield pooled
+        finally:
+            reusable = pooled.reusable and self._idle.qsize() < self.max_size
+            if reusable:
+                # time-travel aliases are specific to a query, their views must
+                # not pin historical datasets on idle connections
+                try:
+                    pooled.unregister_datasets(
+                        [name for name in pooled.views if "@" in name]
+                    )
+                except duckdb.Error:
+                    reusable = False
+            if reusable:
+                self._idle.put(pooled)
+            else:
+                pooled.conn.close()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().conn.close()
+            except queue.Empty:
+                break
+
+
+connection_pool = ConnectionPool()
+
+
+def _execute_pooled(
+    pooled: PooledConnection,
+    tables_datasets: dict[str, padataset.Dataset],
+    sql_query: str,
+    sql_params: dict[str, str] | None = None,
+) -> duckdb.DuckDBPyConnection:
+    # views of tables not requested by this query are dropped, so that reused
+    # connections never keep datasets of removed or unrelated tables
+    pooled.unregister_datasets(set(pooled.views) - set(tables_datasets))
+    for table_name, table_dataset in tables_datasets.items():
+        pooled.register_dataset(table_name, table_dataset)
+    if any("@" in table_name for table_name in tables_datasets):
+        sql_query = rewrite_time_travels(sql_query)
+    # statements other than queries (DDL, settings, attachments, etc.)
+    # may alter the connection state, so it must not be reused afterwards
+    pooled.reusable = all(
+        statement.type == duckdb.StatementType.SELECT
+        for statement in pooled.conn.extract_statements(sql_query)
+    )
+    normalized_params = {k: v or None for k, v in (sql_params or {}).items()}
+    return pooled.conn.execute(sql_query, parameters=normalized_params)
+
+
 def execute_query(
     tables_datasets: dict[str, padataset.Dataset],
     sql_query: str,
@@ -325,39 +2443,362 @@ def execute_query(
         raise ValueError("Error: Cannot execute empty SQL query")
 
     try:
-        conn = duckdb.connect()
-        for table_name, table_dataset in tables_datasets.items():
-            # ATTACH IF NOT EXISTS ':memory:' AS {catalog.name};
-            # CREATE SCHEMA IF NOT EXISTS {catalog.name}.{database.name};
-            # USE {catalog.name}.{database.name};
-            # CREATE VIEW IF NOT EXISTS {table.name} AS FROM {table.name}_dataset;
-
-            view_name = f"{table_name}_view"
-            conn.register(view_name, table_dataset)
-            conn.execute(f'create view "{table_name}" as select * from "{view_name}"')  # nosec B608
-        normalized_params = {k: v or None for k, v in (sql_params or {}).items()}
-        return conn.execute(sql_query, parameters=normalized_params).to_arrow_table()
+        with connection_pool.connection() as pooled:
+            return _execute_pooled(
+                pooled, tables_datasets, sql_query, sql_params
+            ).to_arrow_table()
     except duckdb.Error as e:
         raise ValueError(f"Error: {e}") from e
 
 
+def execute_query_stream(
+    tables_datasets: dict[str, padataset.Dataset],
+    sql_query: str,
+    sql_params: dict[str, str] | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> pa.RecordBatchReader:
+    """
+    Execute a SQL query and stream its results as Arrow record batches.
+
+    The pooled connection is held until the returned reader is exhausted or
+    released, so results are never fully materialized in memory.
+    """
+    if not sql_query:
+        raise ValueError("Error: Cannot execute empty SQL query")
+
+    stack = ExitStack()
+    try:
+        pooled = stack.enter_context(connection_pool.connection())
+        reader = _execute_pooled(
+            pooled, tables_datasets, sql_query, sql_params
+        ).to_arrow_reader(batch_size)
+    except duckdb.Error as e:
+        stack.close()
+        raise ValueError(f"Error: {e}") from e
+
+    def batches() -> Iterator[pa.RecordBatch]:
+        with stack:
+            try:
+                yield from reader
+            except duckdb.Error as e:
+                raise ValueError(f"Error: {e}") from e
+            finally:
+                reader.close()
+
+    return pa.RecordBatchReader.from_batches(reader.schema, batches())
+
+
+def write_csv(reader: pa.RecordBatchReader, sink: str | Path | BinaryIO) -> int:
+    num_rows = 0
+    with csv.CSVWriter(sink, reader.schema) as writer:
+        for batch in reader:
+            writer.write_batch(batch)
+            num_rows += batch.num_rows
+    return num_rows
+
+
+class NdjsonWriter:
+    def __init__(self, sink: BinaryIO) -> None:
+        self.sink = sink
+
+    def __enter__(self) -> "NdjsonWriter":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def write_batch(self, batch: pa.RecordBatch) -> None:
+        for row in batch.to_pylist():
+            self.sink.write(orjson.dumps(row, default=str) + b"\n")
+
+    def close(self) -> None:
+        pass
+
+
+def open_export_writer(
+    export_format: ExportFormatEnum, sink: io.BytesIO, schema: pa.Schema
+) -> Any:
+    if export_format == ExportFormatEnum.csv:
+        return csv.CSVWriter(sink, schema)
+    if export_format == ExportFormatEnum.parquet:
+        return pq.ParquetWriter(sink, schema, compression="zstd")
+    if export_format == ExportFormatEnum.arrow:
+        return pa.ipc.new_stream(sink, schema)
+    return NdjsonWriter(sink)
+
+
+def iter_export(
+    reader: pa.RecordBatchReader,
+    export_format: ExportFormatEnum = ExportFormatEnum.csv,
+    compression: ExportCompressionEnum | None = None,
+) -> Iterator[bytes]:
+    """
+    Encode record batches into the requested export format, yielding the
+    encoded bytes after each batch so that only one batch is held in memory.
+    """
+    buffer = io.BytesIO()
+    compressor = (
+        zlib.compressobj(wbits=31)  # gzip container
+        if compression == ExportCompressionEnum.gzip
+        else None
+    )
+
+    def flush() -> bytes:
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return compressor.compress(chunk) if compressor is not None else chunk
+
+    with open_export_writer(export_format, buffer, reader.schema) as writer:
+        for batch in reader:
+            writer.write_batch(batch)
+            if chunk := flush():
+                yield chunk
+
+    chunk = flush()
+    if compressor is not None:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
+
+
 def compute_totals(results: pa.Table) -> pa.RecordBatch:
+    schema = totals_schema(results.schema)
     return pa.record_batch(
         [
-            pa.array([pc.sum(results.column(i))])
-            if pa.types.is_integer(field.type) or pa.types.is_floating(field.type)
+            pa.array([pc.sum(results.column(i))], type=field.type)
+            if _is_summable(field.type)
             else pa.array([None], type=field.type)
-            for i, field in enumerate(results.schema)
+            for i, field in enumerate(schema)
         ],
-        schema=results.schema,
+        schema=schema,
     )
 
 
+def execute_totals(
+    tables_datasets: dict[str, padataset.Dataset],
+    sql_query: str,
+    schema: pa.Schema,
+    sql_params: dict[str, str] | None = None,
+) -> pa.RecordBatch:
+    """
+    Compute the totals row of a query with DuckDB, over its full results
+    rather than a limited slice of them.
+    """
+    totals_sql = totals_query(sql_query, schema)
+    sums = (
+        execute_query(tables_datasets, totals_sql, sql_params) if totals_sql else None
+    )
+    schema = totals_schema(schema)
+    return pa.record_batch(
+        [
+            sums.column(f"c{i}").combine_chunks().cast(field.type)
+            if sums is not None and _is_summable(field.type)
+            else pa.array([None], type=field.type)
+            for i, field in enumerate(schema)
+        ],
+        schema=schema,
+    )
+
+
+JSON_STRING_ESCAPES = [
+    ("\\", "\\\\"),
+    ('"', '\\"'),
+    ("\n", "\\n"),
+    ("\r", "\\r"),
+    ("\t", "\\t"),
+]
+# characters that would be unsafe in a JSON document embedded in an HTML
+# <script> element, only found within JSON strings
+JSON_HTML_ESCAPES = [
+    ("<", "\\u003c"),
+    (">", "\\u003e"),
+    ("&", "\\u0026"),
+    ("'", "\\u0027"),
+]
+JSON_UNESCAPED_CONTROL_CHARS = "[\\x00-\\x08\\x0b\\x0c\\x0e-\\x1f]"
+TEMPORAL_ISO_REWRITES = [
+    (r"^(\d{4}-\d{2}-\d{2}) ", r"\1T"),
+    (r"\.0+(Z|[+-]\d{4})?$", r"\1"),
+    (r"Z$", "+00:00"),
+    (r"([+-]\d{2})(\d{2})$", r"\1:\2"),
+]
+
+
+def _json_escape(
+    strings: "pa.ChunkedArray[Any]", escapes: list[tuple[str, str]]
+) -> "pa.ChunkedArray[Any]":
+    for pattern, replacement in escapes:
+        if pc.any(pc.match_substring(strings, pattern)).as_py():
+            strings = pc.replace_substring(strings, pattern, replacement)
+    return strings
+
+
+def _json_quote(strings: "pa.ChunkedArray[Any]") -> "pa.ChunkedArray[Any]":
+    escaped = _json_escape(strings, JSON_STRING_ESCAPES + JSON_HTML_ESCAPES)
+    quoted: pa.ChunkedArray[Any] = pc.call_function(
+        "binary_join_element_wise", ['"', escaped, '"', ""]
+    )
+    return quoted
+
+
+def _json_fallback_cells(column: "pa.ChunkedArray[Any]") -> "pa.ChunkedArray[Any]":
+    cells = pa.chunked_array(
+        [
+            pa.array(
+                [
+                    orjson.dumps(value, default=str).decode()
+                    for value in column.to_pylist()
+                ],
+                pa.string(),
+            )
+        ]
+    )
+    return _json_escape(cells, JSON_HTML_ESCAPES)
+
+
+def _json_html_safe(json_text: str) -> str:
+    for pattern, replacement in JSON_HTML_ESCAPES:
+        json_text = json_text.replace(pattern, replacement)
+    return json_text
+
+
+def json_cells(column: "pa.ChunkedArray[Any]") -> "pa.ChunkedArray[Any]":
+    """
+    Encode each value of a column as a JSON string with vectorized compute
+    kernels, falling back to per-value encoding for unsupported types.
+    """
+    data_type = column.type
+    if pa.types.is_floating(data_type):
+        cells = pc.if_else(
+            pc.is_finite(column),
+            pc.cast(column, pa.string()),
+            pa.scalar(None, pa.string()),
+        )
+    elif pa.types.is_integer(data_type) or pa.types.is_boolean(data_type):
+        cells = pc.cast(column, pa.string())
+    elif pa.types.is_decimal(data_type):
+        # decimals are kept as strings to preserve their precision
+        cells = _json_quote(pc.cast(column, pa.string()))
+    elif pa.types.is_string(data_type) or pa.types.is_large_string(data_type):
+        if pc.any(
+            pc.match_substring_regex(column, JSON_UNESCAPED_CONTROL_CHARS)
+        ).as_py():
+            return _json_fallback_cells(column)
+        cells = _json_quote(column)
+    elif (
+        pa.types.is_timestamp(data_type)
+        or pa.types.is_date(data_type)
+        or pa.types.is_time(data_type)
+    ):
+        strings = pc.cast(column, pa.string())
+        rewrites = TEMPORAL_ISO_REWRITES if not pa.types.is_date(data_type) else []
+        for pattern, replacement in rewrites:
+            strings = pc.replace_substring_regex(strings, pattern, replacement)
+        cells = _json_quote(strings)
+    else:
+        return _json_fallback_cells(column)
+    filled: pa.ChunkedArray[Any] = pc.call_function("coalesce", [cells, "null"])
+    return filled
+
+
+def _json_array(cells: "pa.ChunkedArray[Any]") -> str:
+    values = pc.cast(cells, pa.large_string()).combine_chunks()
+    lists = pa.LargeListArray.from_arrays(pa.array([0, len(values)]), values)
+    joined: pa.LargeStringArray = pc.call_function(
+        "binary_join", [lists, pa.scalar(",", pa.large_string())]
+    )
+    return f"[{joined[0].as_py()}]"
+
+
+def column_to_json(column: "pa.ChunkedArray[Any]") -> str:
+    """
+    Encode a column as a JSON array, straight from Arrow buffers for numeric
+    and temporal columns.
+    """
+    data_type = column.type
+    if pa.types.is_floating(data_type) or (
+        column.null_count == 0
+        and (
+            pa.types.is_integer(data_type)
+            or pa.types.is_boolean(data_type)
+            or (pa.types.is_timestamp(data_type) and data_type.tz is None)
+        )
+    ):
+        # numpy views of fixed-width columns are serialized natively by orjson,
+        # with null, NaN and infinite floats serialized as null
+        return orjson.dumps(
+            column.to_numpy(), option=orjson.OPT_SERIALIZE_NUMPY
+        ).decode()
+    if (
+        pa.types.is_integer(data_type)
+        or pa.types.is_boolean(data_type)
+        or pa.types.is_decimal(data_type)
+        or pa.types.is_temporal(data_type)
+    ) and not pa.types.is_duration(data_type):
+        return _json_array(json_cells(column))
+    # orjson is faster than any vectorized escaping for strings and nested values
+    return _json_html_safe(orjson.dumps(column.to_pylist(), default=str).decode())
+
+
+def columns_to_json(data: pa.Table) -> str:
+    """
+    Encode a table as a JSON object of column arrays, safe for embedding in
+    HTML documents.
+    """
+    return (
+        "{"
+        + ",".join(
+            f"{_json_html_safe(orjson.dumps(name).decode())}:"
+            + column_to_json(data.column(name))
+            for name in data.column_names
+        )
+        + "}"
+    )
+
+
+def rows_to_json(data: pa.Table) -> str:
+    """
+    Encode a table as a JSON array of row arrays, safe for embedding in HTML
+    documents.
+    """
+    if data.num_columns == 0:
+        return "[" + ",".join("[]" for _ in range(data.num_rows)) + "]"
+    cells = [*map(json_cells, data.columns), ","]
+    rows: pa.ChunkedArray[Any] = pc.call_function(
+        "binary_join_element_wise",
+        ["[", pc.call_function("binary_join_element_wise", cells), "]", ""],
+    )
+    return _json_array(rows)
+
+
+def bounded_uniques(
+    column: "pa.ChunkedArray[Any]",
+    max_cardinality: int = SEARCHLIST_MAX_CARDINALITY,
+) -> "pa.Array[Any] | None":
+    """
+    Distinct non-null values of a column, scanned batch by batch and abandoned
+    (returning None) as soon as their count reaches `max_cardinality`, or when
+    the column type does not support hashing.
+    """
+    uniques: pa.Array[Any] = pa.array([], column.type)
+    for offset in range(0, len(column), UNIQUES_SCAN_BATCH_SIZE):
+        batch = column.slice(offset, UNIQUES_SCAN_BATCH_SIZE)
+        try:
+            uniques = pc.unique(pa.concat_arrays([uniques, *batch.chunks])).drop_null()
+        except pa.ArrowNotImplementedError:
+            return None
+        if len(uniques) >= max_cardinality:
+            return None
+    return uniques
+
+
 @dataclass(frozen=True)
 class QueryResult:
     data: pa.Table
     execution_time_ms: float
     truncated: bool
+    sql_totals: pa.RecordBatch | None = None
 
     @property
     def num_rows(self) -> int:
@@ -380,47 +2821,361 @@ class QueryResult:
         return self.data.to_pydict()
 
     @cached_property
-    def column_cardinalities(self) -> dict[str, int]:
+    def columns_json(self) -> str:
+        return columns_to_json(self.data)
+
+    @cached_property
+    def totals_json(self) -> str:
+        return rows_to_json(pa.Table.from_batches([self.totals]))
+
+    @cached_property
+    def _column_distincts(self) -> dict[str, "pa.Array[Any] | None"]:
         return {
-            name: pc.count_distinct(self.data.column(name)).as_py()
+            name: bounded_uniques(self.data.column(name))
             for name in self.data.column_names
         }
 
+    @cached_property
+    def column_cardinalities(self) -> dict[str, int]:
+        """
+        Number of distinct non-null values per column, capped at
+        `SEARCHLIST_MAX_CARDINALITY`.
+        """
+        return {
+            name: len(uniques) if uniques is not None else SEARCHLIST_MAX_CARDINALITY
+            for name, uniques in self._column_distincts.items()
+        }
+
     @cached_property
     def column_uniques(self) -> dict[str, list[Any]]:
+        """
+        Sorted distinct non-null values of columns whose cardinality is below
+        `SEARCHLIST_MAX_CARDINALITY`.
+        """
         return {
-            name: sorted(
-                v
-                for v in pc.unique(self.data.column(name)).to_pylist()
-                if v is not None
-            )
-            for name in self.data.column_names
+            name: sorted(uniques.to_pylist())
+            for name, uniques in self._column_distincts.items()
+            if uniques is not None
         }
 
     @cached_property
     def totals(self) -> pa.RecordBatch:
+        if self.sql_totals is not None:
+            return self.sql_totals
         return compute_totals(self.data)
 
 
+@dataclass(frozen=True)
+class ColumnSearch:
+    column: str
+    value: str = ""
+    logic: str = "contains"
+    values: list[str] | None = None
+
+
+@dataclass(frozen=True)
+class QueryResultPage:
+    records_total: int
+    records_filtered: int
+    data: pa.Table
+    totals: pa.RecordBatch | None
+
+
+def _is_searchable(data_type: pa.DataType) -> bool:
+    try:
+        pc.cast(pa.array([], type=data_type), pa.string())
+    except pa.ArrowException:
+        return False
+    return True
+
+
+def _search_string(column_name: str) -> pc.Expression:
+    strings = pc.field(column_name).cast(pa.string())
+    search_string: pc.Expression = pc.if_else(strings.is_null(), "", strings)
+    return search_string
+
+
+def _column_search_expression(
+    data_type: pa.DataType, column_search: ColumnSearch
+) -> pc.Expression | None:
+    if not _is_searchable(data_type):
+        return None
+
+    column = pc.field(column_search.column)
+    strings = _search_string(column_search.column)
+
+    if column_search.values is not None:
+        if not column_search.values:
+            return None
+        return strings.isin(column_search.values)
+
+    logic, value = column_search.logic, column_search.value
+    if logic == "empty":
+        return strings == pa.scalar("")
+    if logic == "notEmpty":
+        return strings != pa.scalar("")
+    if not value:
+        return None
+
+    if pa.types.is_integer(data_type) or pa.types.is_floating(data_type):
+        try:
+            number = pa.scalar(float(value))
+        except ValueError:
+            return None
+        numeric_comparisons = {
+            "equal": column == number,
+            "notEqual": column != number,
+            "greater": column > number,
+            "greaterOrEqual": column >= number,
+            "less": column < number,
+            "lessOrEqual": column <= number,
+        }
+        if logic in numeric_comparisons:
+            return numeric_comparisons[logic]
+
+    if pa.types.is_temporal(data_type):
+        # compare ISO formatted dates, ignoring the time part
+        dates = pc.utf8_slice_codeunits(strings, 0, 10)
+        date = pa.scalar(value[:10])
+        date_comparisons = {
+            "equal": dates == date,
+            "notEqual": dates != date,
+            "greater": dates > date,
+            "less": dates < date,
+        }
+        if logic in date_comparisons:
+            return date_comparisons[logic]
+
+    lowered = pc.utf8_lower(strings)
+    text_comparisons = {
+        "equal": lowered == pa.scalar(value.lower()),
+        "notEqual": lowered != pa.scalar(value.lower()),
+        "starts": pc.starts_with(strings, value, ignore_case=True),
+        "ends": pc.ends_with(strings, value, ignore_case=True),
+        "notContains": ~pc.match_substring(strings, value, ignore_case=True),
+    }
+    return text_comparisons.get(
+        logic, pc.match_substring(strings, value, ignore_case=True)
+    )
+
+
+def search_query_result(
+    result: QueryResult,
+    search: str = "",
+    column_searches: list[ColumnSearch] | None = None,
+) -> pa.Table:
+    schema = result.schema
+    expressions = [
+        expression
+        for column_search in column_searches or []
+        if column_search.column in schema.names
+        and (
+            expression := _column_search_expression(
+                schema.field(column_search.column).type, column_search
+            )
+        )
+        is not None
+    ]
+    if search:
+        matches = [
+            pc.match_substring(_search_string(field.name), search, ignore_case=True)
+            for field in schema
+            if _is_searchable(field.type)
+        ]
+        if matches:
+            expressions.append(reduce(operator.or_, matches))
+
+    if not expressions:
+        return result.data
+    return result.data.filter(reduce(operator.and_, expressions))
+
+
+def page_query_result(
+    result: QueryResult,
+    start: int = 0,
+    length: int = DEFAULT_LIMIT,
+    search: str = "",
+    column_searches: list[ColumnSearch] | None = None,
+    order: list[tuple[str, str]] | None = None,
+) -> QueryResultPage:
+    """
+    Filter, sort and slice a query result, so that only a single page of rows
+    has to be sent to the client.
+    """
+    data = search_query_result(result, search, column_searches)
+    # totals always cover all the matching results: filtered totals of
+    # truncated results would only cover the held rows, so they are omitted
+    totals: pa.RecordBatch | None
+    if data is result.data:
+        totals = result.totals
+    elif result.truncated:
+        totals = None
+    else:
+        totals = compute_totals(data)
+
+    sort_keys: list[tuple[str, Literal["ascending", "descending"]]] = [
+        (column, "descending" if direction == "desc" else "ascending")
+        for column, direction in order or []
+        if column in data.column_names
+    ]
+    if sort_keys:
+        try:
+            data = data.sort_by(sort_keys)
+        except pa.ArrowException:
+            pass
+
+    return QueryResultPage(
+        records_total=result.num_rows,
+        records_filtered=data.num_rows,
+        data=data.slice(start, length) if length >= 0 else data.slice(start),
+        totals=totals,
+    )
+
+
+def normalize_query(sql_query: str) -> str:
+    try:
+        query_ast = sqlglot.parse(sql_query, dialect=sqlglot.dialects.duckdb.DuckDB)
+    except sqlglot.errors.SqlglotError:
+        return sql_query.strip()
+
+    return "; ".join(
+        stmt.sql(dialect=sqlglot.dialects.duckdb.DuckDB, identify=True)
+        for stmt in query_ast
+        if stmt is not None
+    )
+
+
+QueryCacheKey = tuple[
+    str, tuple[tuple[str, str], ...], tuple[tuple[str, int], ...], int, bool
+]
+
+
+@dataclass(frozen=True)
+class QueryCacheEntry:
+    result: QueryResult
+    nbytes: int
+    expires_at: float | None
+
+
+class QueryResultCache:
+    """
+    In-memory LRU cache of query results, bounded by their total size in bytes.
+
+    Entries are keyed by the normalized SQL query, its parameters and the
+    version of each table it references, so new commits invalidate them.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries: OrderedDict[Hashable, QueryCacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(
+        sql_query: str,
+        sql_params: dict[str, str],
+        table_versions: dict[str, int],
+        max_rows: int,
+        totals: bool = False,
+    ) -> QueryCacheKey:
+        return (
+            normalize_query(sql_query),
+            tuple(sorted(sql_params.items())),
+            tuple(sorted(table_versions.items())),
+            max_rows,
+            totals,
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> QueryResult | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry.result
+
+    def put(self, key: Hashable, result: QueryResult, ttl: float | None = None) -> bool:
+        nbytes = result.data.nbytes
+        if nbytes > self.max_bytes or (ttl is not None and ttl <= 0):
+            return False
+
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = QueryCacheEntry(result, nbytes, expires_at)
+            self.nbytes += nbytes
+            while self.nbytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self.nbytes -= entry.nbytes
+
+
+def hold_query_result(
+    store: QueryResultCache, result: QueryResult, ttl: float | None = None
+) -> str | None:
+    token = secrets.token_urlsafe(16)
+    return token if store.put(token, result, ttl=ttl) else None
+
+
 def run_query(
     tables_datasets: dict[str, padataset.Dataset],
     sql_query: str,
     sql_params: dict[str, str] | None = None,
     max_rows: int = DEFAULT_LIMIT,
+    cache: QueryResultCache | None = None,
+    table_versions: dict[str, int] | None = None,
+    cache_ttl: float | None = None,
+    totals: bool = False,
 ) -> QueryResult:
+    cache_key = None
+    if cache is not None and table_versions is not None:
+        cache_key = cache.key(
+            sql_query, sql_params or {}, table_versions, max_rows, totals
+        )
+        if (cached_result := cache.get(cache_key)) is not None:
+            return cached_result
+
     limited_sql = limit_query(sql_query, max_rows + 1)
     start = time.perf_counter()
     results = execute_query(tables_datasets, limited_sql, sql_params)
-    elapsed = (time.perf_counter() - start) * 1000
 
     truncated = results.num_rows > max_rows
     data = results.slice(0, max_rows) if truncated else results
 
-    return QueryResult(
+    # totals of truncated results are aggregated over the unlimited query,
+    # otherwise they are cheaply computed from the results themselves
+    sql_totals = (
+        execute_totals(tables_datasets, sql_query, data.schema, sql_params)
+        if totals and truncated
+        else None
+    )
+    elapsed = (time.perf_counter() - start) * 1000
+
+    query_result = QueryResult(
         data=data,
         execution_time_ms=elapsed,
         truncated=truncated,
+        sql_totals=sql_totals,
     )
+    if cache is not None and cache_key is not None:
+        cache.put(cache_key, query_result, ttl=cache_ttl)
+    return query_result
 
 
 def _read_xlsx(data: bytes) -> pa.Table:
@@ -433,26 +3188,325 @@ def _read_xlsx(data: bytes) -> pa.Table:
     return pa.Table.from_batches([fastexcel.read_excel(data).load_sheet(0).to_arrow()])
 
 
+def _read_csv(
+    data: BinaryIO | TextIO,
+    delimiter: str,
+    encoding: str,
+    block_size: int,
+    schema: pa.Schema | None = None,
+) -> pa.RecordBatchReader:
+    # CSV files are parsed incrementally by blocks, column types being
+    # inferred from the first block unless given
+    return csv.open_csv(
+        data,
+        read_options=csv.ReadOptions(
+            encoding=encoding, block_size=block_size, use_threads=True
+        ),
+        parse_options=csv.ParseOptions(delimiter=delimiter),
+        convert_options=csv.ConvertOptions(
+            column_types=schema, null_values=[], strings_can_be_null=False
+        ),
+    )
+
+
+def _read_ndjson(
+    data: BinaryIO | TextIO, block_size: int, schema: pa.Schema | None = None
+) -> pa.RecordBatchReader:
+    # like CSV files, NDJSON files are parsed incrementally by blocks
+    return pajson.open_json(
+        data,
+        read_options=pajson.ReadOptions(block_size=block_size, use_threads=True),
+        parse_options=pajson.ParseOptions(explicit_schema=schema),
+    )
+
+
+def _read_parquet(data: BinaryIO | pa.NativeFile) -> pa.RecordBatchReader:
+    parquet_file = pq.ParquetFile(data)
+    return pa.RecordBatchReader.from_batches(
+        parquet_file.schema_arrow,
+        parquet_file.iter_batches(batch_size=DEFAULT_BATCH_SIZE),
+    )
+
+
+def _read_arrow(data: io.IOBase | pa.NativeFile) -> pa.RecordBatchReader:
+    # IPC files start with a magic number, unlike IPC streams which can be
+    # read from non-seekable inputs
+    if data.seekable():
+        magic = data.read(len(ARROW_FILE_MAGIC))
+        data.seek(0)
+        if magic == ARROW_FILE_MAGIC:
+            ipc_file = pa.ipc.open_file(data)
+            return pa.RecordBatchReader.from_batches(
+                ipc_file.schema,
+                (ipc_file.get_batch(i) for i in range(ipc_file.num_record_batches)),
+            )
+    return pa.ipc.open_stream(data)
+
+
+def open_import_reader(
+    data: BinaryIO | TextIO | pa.NativeFile,
+    file_format: ImportFileFormatEnum,
+    delimiter: str = ",",
+    encoding: str = "utf-8",
+    block_size: int = IMPORT_BLOCK_SIZE,
+    schema: pa.Schema | None = None,
+) -> pa.RecordBatchReader:
+    """
+    Open a file to import as a reader of record batches.
+
+    CSV and NDJSON files are parsed by blocks of `block_size` bytes, their
+    column types being inferred from the first block unless a schema is
+    given. Parquet and Arrow IPC files are read lazily, batch by batch.
+    """
+    file_format_handler: dict[
+        ImportFileFormatEnum, Callable[[Any], pa.RecordBatchReader]
+    ] = {
+        ImportFileFormatEnum.csv: lambda f: _read_csv(
+            f, delimiter, encoding, block_size, schema
+        ),
+        ImportFileFormatEnum.xlsx: lambda f: _read_xlsx(f.read()).to_reader(),
+        ImportFileFormatEnum.parquet: _read_parquet,
+        ImportFileFormatEnum.arrow: _read_arrow,
+        ImportFileFormatEnum.ndjson: lambda f: _read_ndjson(f, block_size, schema),
+    }
+    return file_format_handler[file_format](data)
+
+
+class _RowCounter:
+    """
+    Count the rows of record batches streamed through a reader.
+    """
+
+    def __init__(self) -> None:
+        self.num_rows = 0
+
+    def wrap(self, reader: pa.RecordBatchReader) -> pa.RecordBatchReader:
+        def batches() -> Iterator[pa.RecordBatch]:
+            for batch in reader:
+                self.num_rows += batch.num_rows
+                yield batch
+
+        return pa.RecordBatchReader.from_batches(reader.schema, batches())
+
+
 def import_file_to_table(
     table_config: ConfigTable,
-    file_path: BinaryIO | TextIO,
+    file_path: BinaryIO | TextIO | pa.NativeFile,
     mode: ImportModeEnum = ImportModeEnum.overwrite,
     file_format: ImportFileFormatEnum = ImportFileFormatEnum.csv,
     delimiter: str = ",",
     encoding: str = "utf-8",
-) -> int:
-    file_format_handler = {
-        ImportFileFormatEnum.csv: lambda f, d, e: csv.read_csv(
-            f,
-            read_options=csv.ReadOptions(encoding=e),
-            parse_options=csv.ParseOptions(delimiter=d),
-            convert_options=csv.ConvertOptions(
-                null_values=[], strings_can_be_null=False
-            ),
-        ),
-        ImportFileFormatEnum.xlsx: lambda f, *_: _read_xlsx(f.read()),
+    block_size: int = IMPORT_BLOCK_SIZE,
+    merge_keys: list[str] | None = None,
+) -> ImportResult:
+    """
+    Import a file into a table, returning the number of imported rows and the
+    result of the automatic compaction following the import, if any.
+
+    In `merge` mode, rows matching existing ones on the `merge_keys` columns
+    are updated, while the other ones are inserted.
+
+    Files are streamed to the table writer as record batches (see
+    `open_import_reader`), keeping memory bounded regardless of the file size,
+    except for Excel files which are loaded at once.
+    """
+    counter = _RowCounter()
+    reader = open_import_reader(file_path, file_format, delimiter, encoding, block_size)
+    compaction = resolve_table(table_config).import_data(
+        table_config, counter.wrap(reader), mode, merge_keys
+    )
+    return ImportResult(rows=counter.num_rows, compaction=compaction)
+
+
+def _open_import_file(
+    file_path: Path, file_format: ImportFileFormatEnum
+) -> BinaryIO | pa.NativeFile:
+    # memory map binary columnar files, so their batches are read zero-copy
+    if file_format in (ImportFileFormatEnum.parquet, ImportFileFormatEnum.arrow):
+        return pa.memory_map(str(file_path))
+    return open(file_path, "rb")
+
+
+def _read_import_file(
+    file_path: Path,
+    file_format: ImportFileFormatEnum,
+    delimiter: str,
+    encoding: str,
+    block_size: int,
+    schema: pa.Schema | None = None,
+) -> Iterator[pa.RecordBatch]:
+    with _open_import_file(file_path, file_format) as f:
+        yield from open_import_reader(
+            f, file_format, delimiter, encoding, block_size, schema
+        )
+
+
+def _import_file_schema(
+    file_path: Path,
+    file_format: ImportFileFormatEnum,
+    delimiter: str,
+    encoding: str,
+    block_size: int,
+) -> pa.Schema:
+    with _open_import_file(file_path, file_format) as f:
+        return open_import_reader(
+            f, file_format, delimiter, encoding, block_size
+        ).schema
+
+
+def _parallel_batches(
+    producers: dict[str, Callable[[], Iterator[pa.RecordBatch]]],
+    schema: pa.Schema,
+    counts: dict[str, int],
+    errors: list[BaseException],
+    max_workers: int,
+) -> Iterator[pa.RecordBatch]:
+    """
+    Consume record batch producers in a thread pool, yielding their batches
+    in completion order through a bounded queue, so memory stays bounded by
+    the number of workers.
+
+    Producer errors are also collected in `errors`, as consumers of the
+    batches may wrap them.
+    """
+    batches: queue.Queue[pa.RecordBatch | BaseException | None] = queue.Queue(
+        maxsize=2 * max_workers
+    )
+    stopped = threading.Event()
+
+    def put(item: pa.RecordBatch | BaseException | None) -> None:
+        # give up when the consumer stopped, instead of blocking forever
+        while not stopped.is_set():
+            try:
+                batches.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def produce(name: str, producer: Callable[[], Iterator[pa.RecordBatch]]) -> None:
+        try:
+            for batch in producer():
+                if stopped.is_set():
+                    return
+                if batch.schema != schema:
+                    raise ValueError(
+                        f"Error: schema of file '{name}' does not match the first file"
+                    )
+                counts[name] += batch.num_rows
+                put(batch)
+            put(None)
+        except BaseException as e:
+            put(e)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        for name, producer in producers.items():
+            executor.submit(produce, name, producer)
+        for _ in range(len(producers)):
+            while (item := batches.get()) is not None:
+                if isinstance(item, BaseException):
+                    errors.append(item)
+                    raise item
+                yield item
+    finally:
+        stopped.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def import_files_to_table(
+    table_config: ConfigTable,
+    file_paths: list[Path],
+    mode: ImportModeEnum = ImportModeEnum.overwrite,
+    file_format: ImportFileFormatEnum = ImportFileFormatEnum.csv,
+    delimiter: str = ",",
+    encoding: str = "utf-8",
+    block_size: int = IMPORT_BLOCK_SIZE,
+    max_workers: int = DEFAULT_IMPORT_WORKERS,
+    merge_keys: list[str] | None = None,
+) -> ImportResult:
+    """
+    Import multiple files into a table within a single commit, returning the
+    number of imported rows per file and the result of the automatic
+    compaction following the import, if any.
+
+    Files are parsed in parallel by a pool of threads, column types of CSV
+    files being those inferred from the first file.
+    """
+    if not file_paths:
+        raise ValueError("Error: No files to import")
+
+    schema = _import_file_schema(
+        file_paths[0], file_format, delimiter, encoding, block_size
+    )
+    producers: dict[str, Callable[[], Iterator[pa.RecordBatch]]] = {
+        str(file_path): partial(
+            _read_import_file,
+            file_path,
+            file_format,
+            delimiter,
+            encoding,
+            block_size,
+            schema
+            if file_format in (ImportFileFormatEnum.csv, ImportFileFormatEnum.ndjson)
+            else None,
+        )
+        for file_path in file_paths
     }
-    df = file_format_handler[file_format](file_path, delimiter, encoding)
-    handler_class = resolve_table(table_config)
-    handler_class.import_data(table_config, df, mode)
-    return len(df)
+    counts = dict.fromkeys(producers, 0)
+    errors: list[BaseException] = []
+    reader = pa.RecordBatchReader.from_batches(
+        schema, _parallel_batches(producers, schema, counts, errors, max_workers)
+    )
+    try:
+        compaction = resolve_table(table_config).import_data(
+            table_config, reader, mode, merge_keys
+        )
+    except Exception as e:
+        # table writers wrap errors raised while reading batches
+        if errors:
+            raise errors[0] from e
+        raise
+    return ImportResult(
+        rows=sum(counts.values()), files_rows=counts, compaction=compaction
+    )
+
+
+def write_query_to_table(
+    table_config: ConfigTable,
+    tables_datasets: dict[str, padataset.Dataset],
+    sql_query: str,
+    sql_params: dict[str, str] | None = None,
+    mode: ImportModeEnum = ImportModeEnum.append,
+) -> ImportResult:
+    """
+    Write the results of a SQL query into a table, returning the number of
+    written rows and the result of the automatic compaction following the
+    write, if any.
+
+    Results are streamed from DuckDB to the table writer as Arrow record
+    batches, without being materialized nor serialized to an intermediate
+    file format.
+    """
+    counter = _RowCounter()
+    errors: list[BaseException] = []
+    reader = execute_query_stream(tables_datasets, sql_query, sql_params)
+
+    def batches() -> Iterator[pa.RecordBatch]:
+        try:
+            yield from counter.wrap(reader)
+        except BaseException as e:
+            errors.append(e)
+            raise
+
+    try:
+        compaction = resolve_table(table_config).import_data(
+            table_config,
+            pa.RecordBatchReader.from_batches(reader.schema, batches()),
+            mode,
+        )
+    except Exception as e:
+        # table writers wrap errors raised while reading batches
+        if errors:
+            raise errors[0] from e
+        raise
+    return ImportResult(rows=counter.num_rows, compaction=compaction)
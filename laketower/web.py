@@ -1,37 +1,60 @@
 import asyncio
-import io
 import re
 import urllib.parse
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Annotated
+from typing import Annotated, Literal
 
 import bleach
 import markdown
 import orjson
-import pyarrow.csv as pacsv
+import pydantic
 import pydantic_settings
 from fastapi import APIRouter, FastAPI, File, Form, Query, Request, UploadFile
-from fastapi.responses import HTMLResponse, RedirectResponse, Response
+from fastapi.responses import (
+    HTMLResponse,
+    RedirectResponse,
+    Response,
+    StreamingResponse,
+)
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
 from laketower import __about__
 from laketower.config import Config, load_yaml_config
 from laketower.tables import (
+    DEFAULT_HISTORY_LIMIT,
     DEFAULT_LIMIT,
+    ColumnSearch,
+    ExportCompressionEnum,
+    ExportFormatEnum,
     ImportFileFormatEnum,
     ImportModeEnum,
+    ImportResult,
     QueryResult,
+    QueryResultCache,
+    StatisticsCache,
+    StatisticsModeEnum,
+    compute_table_statistics,
     execute_query,
+    execute_query_stream,
     extract_query_parameter_names,
-    generate_table_statistics_query,
+    filter_table_dataset,
     generate_table_query,
+    hold_query_result,
     import_file_to_table,
+    iter_export,
     load_datasets,
+    load_query_datasets,
+    load_query_versioned_datasets,
     load_table,
+    page_query_result,
     resolve_table,
+    resolve_table_version,
+    rows_to_json,
     run_query,
+    statistics_sample,
+    write_query_to_table,
 )
 
 
@@ -75,6 +98,110 @@ def wants_partial(request: Request) -> bool:
     return request.headers.get("HX-Request") == "true"
 
 
+def compaction_summary(result: ImportResult) -> str:
+    if result.compaction is None:
+        return ""
+    return (
+        f", then compacted {result.compaction.files_removed} small files"
+        f" into {result.compaction.files_added}"
+    )
+
+
+MAX_RESULTS_PAGE_LENGTH = 1_000
+
+
+class DataTablesSearch(pydantic.BaseModel):
+    value: str = ""
+
+
+class DataTablesColumnControlSearch(pydantic.BaseModel):
+    value: str = ""
+    logic: str = "contains"
+
+
+class DataTablesColumnControl(pydantic.BaseModel):
+    search: DataTablesColumnControlSearch | None = None
+    values: dict[str, str] | None = pydantic.Field(default=None, alias="list")
+
+
+class DataTablesColumn(pydantic.BaseModel):
+    name: str = ""
+    searchable: bool = True
+    search: DataTablesSearch = DataTablesSearch()
+    column_control: DataTablesColumnControl | None = pydantic.Field(
+        default=None, alias="columnControl"
+    )
+
+
+class DataTablesOrder(pydantic.BaseModel):
+    column: int
+    dir: Literal["asc", "desc"] = "asc"
+
+
+class DataTablesRequest(pydantic.BaseModel):
+    """
+    DataTables server-side processing request parameters.
+    """
+
+    draw: int = 0
+    start: int = pydantic.Field(default=0, ge=0)
+    length: int = DEFAULT_LIMIT
+    search: DataTablesSearch = DataTablesSearch()
+    order: list[DataTablesOrder] = []
+    columns: list[DataTablesColumn] = []
+
+    def column_searches(self) -> list[ColumnSearch]:
+        column_searches = []
+        for column in self.columns:
+            if not column.name or not column.searchable:
+                continue
+            if column.search.value:
+                column_searches.append(ColumnSearch(column.name, column.search.value))
+            if (column_control := column.column_control) is not None:
+                if column_control.search is not None:
+                    column_searches.append(
+                        ColumnSearch(
+                            column.name,
+                            column_control.search.value,
+                            column_control.search.logic,
+                        )
+                    )
+                if column_control.values is not None:
+                    column_searches.append(
+                        ColumnSearch(
+                            column.name, values=list(column_control.values.values())
+                        )
+                    )
+        return column_searches
+
+    def column_order(self) -> list[tuple[str, str]]:
+        return [
+            (self.columns[order.column].name, order.dir)
+            for order in self.order
+            if 0 <= order.column < len(self.columns) and self.columns[order.column].name
+        ]
+
+
+def paginated_results_context(
+    request: Request, query_result: QueryResult, export_params: dict[str, str]
+) -> dict[str, object]:
+    config: Config = request.app.state.config
+    paginated_results: QueryResultCache = request.app.state.paginated_results
+    token = hold_query_result(
+        paginated_results,
+        query_result,
+        ttl=config.settings.cache.paginated_results_ttl,
+    )
+    if token is None:
+        return {}
+
+    export_path = request.app.url_path_for("export_tables_query_csv")
+    return {
+        "results_url": request.app.url_path_for("post_results_page", token=token),
+        "results_export_url": f"{export_path}?{urllib.parse.urlencode(export_params)}",
+    }
+
+
 TEMPLATES_DIR = Path(__file__).parent / "templates"
 
 router = APIRouter()
@@ -152,7 +279,7 @@ async def get_tables_query_run(request: Request, sql: str) -> HTMLResponse:
 
         def _execute() -> QueryResult:
             return run_query(
-                load_datasets(config.tables),
+                load_query_datasets(config.tables, sql),
                 sql,
                 sql_params=sql_params,
                 max_rows=config.settings.max_query_rows,
@@ -173,6 +300,12 @@ async def get_tables_query_run(request: Request, sql: str) -> HTMLResponse:
 
     if wants_partial(request):
         template_name = "tables/_results.html"
+        if query_result is not None:
+            context.update(
+                paginated_results_context(
+                    request, query_result, {"sql": sql, **sql_params}
+                )
+            )
         headers["HX-Push-Url"] = str(
             request.url_for("get_tables_query").include_query_params(
                 sql=sql, **sql_params
@@ -202,32 +335,139 @@ async def get_tables_query_run(request: Request, sql: str) -> HTMLResponse:
     )
 
 
-@router.get("/tables/query/csv")
-def export_tables_query_csv(
-    request: Request, sql: str, filename: str = "query_results"
+@router.post("/tables/query/into", response_class=HTMLResponse)
+async def post_tables_query_into(
+    request: Request,
+    sql: Annotated[str, Form()],
+    into_table: Annotated[str, Form()],
+    into_mode: Annotated[ImportModeEnum, Form()] = ImportModeEnum.append,
+) -> HTMLResponse:
+    app_metadata: AppMetadata = request.app.state.app_metadata
+    config: Config = request.app.state.config
+    templates: Jinja2Templates = request.app.state.templates
+
+    form = await request.form()
+    try:
+        sql_param_names = extract_query_parameter_names(sql)
+        sql_params = {name: str(form.get(name) or "") for name in sql_param_names}
+    except ValueError:
+        sql_params = {}
+
+    try:
+        table_config = next(
+            (table for table in config.tables if table.name == into_table), None
+        )
+        if table_config is None:
+            raise ValueError(f"Error: Unknown table '{into_table}'")
+
+        def _write() -> ImportResult:
+            return write_query_to_table(
+                table_config,
+                load_query_datasets(config.tables, sql),
+                sql,
+                sql_params=sql_params,
+                mode=into_mode,
+            )
+
+        write_result = await asyncio.to_thread(_write)
+        message = {
+            "type": "success",
+            "body": f"Successfully wrote {write_result.rows} rows into table '{into_table}' in '{into_mode.value}' mode"
+            + compaction_summary(write_result),
+        }
+    except Exception as e:
+        message = {"type": "error", "body": str(e)}
+
+    context: dict[str, object] = {
+        "table_results": None,
+        "sql_query": sql,
+        "sql_params": sql_params,
+        "into_table": into_table,
+        "into_mode": into_mode.value,
+        "error": None,
+        "message": message,
+    }
+
+    headers = {}
+
+    if wants_partial(request):
+        template_name = "tables/_results.html"
+        headers["HX-Push-Url"] = str(
+            request.url_for("get_tables_query").include_query_params(
+                sql=sql, **sql_params
+            )
+        )
+    else:
+        template_name = "tables/query.html"
+        tables_dataset = load_datasets(config.tables)
+        sql_schema = {
+            table_name: dataset.schema.names
+            for table_name, dataset in tables_dataset.items()
+        }
+        context.update(
+            {
+                "app_metadata": app_metadata,
+                "tables": config.tables,
+                "queries": config.queries,
+                "sql_schema": sql_schema,
+            }
+        )
+
+    return templates.TemplateResponse(
+        request=request,
+        name=template_name,
+        context=context,
+        headers=headers,
+    )
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormatEnum.csv: "text/csv",
+    ExportFormatEnum.parquet: "application/vnd.apache.parquet",
+    ExportFormatEnum.arrow: "application/vnd.apache.arrow.stream",
+    ExportFormatEnum.ndjson: "application/x-ndjson",
+}
+
+
+@router.get("/tables/query/export")
+def export_tables_query(
+    request: Request,
+    sql: str,
+    format: ExportFormatEnum = ExportFormatEnum.csv,
+    compression: ExportCompressionEnum | None = None,
+    filename: str = "query_results",
 ) -> Response:
     config: Config = request.app.state.config
-    tables_dataset = load_datasets(config.tables)
+    tables_dataset = load_query_datasets(config.tables, sql)
 
     sql_param_names = extract_query_parameter_names(sql)
     sql_params = {
         name: request.query_params.get(name) or "" for name in sql_param_names
     }
-    results = execute_query(tables_dataset, sql, sql_params=sql_params)
-    csv_content = io.BytesIO()
-    pacsv.write_csv(
-        results, csv_content, pacsv.WriteOptions(include_header=True, delimiter=",")
-    )
+    reader = execute_query_stream(tables_dataset, sql, sql_params=sql_params)
 
     # keep only word chars, hyphens, dots. replace the rest with underscores
     safe_filename = re.sub(r"[^\w\-.]", "_", filename.lower()).strip("_")
-    return Response(
-        content=csv_content.getvalue(),
-        media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename={safe_filename}.csv"},
+    safe_filename = f"{safe_filename}.{format.value}"
+    media_type = EXPORT_MEDIA_TYPES[format]
+    if compression == ExportCompressionEnum.gzip:
+        safe_filename = f"{safe_filename}.gz"
+        media_type = "application/gzip"
+
+    return StreamingResponse(
+        content=iter_export(reader, format, compression),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={safe_filename}"},
     )
 
 
+@router.get("/tables/query/csv")
+def export_tables_query_csv(
+    request: Request, sql: str, filename: str = "query_results"
+) -> Response:
+    return export_tables_query(request, sql, filename=filename)
+
+
 @router.get("/tables/{table_id}", response_class=HTMLResponse, response_model=None)
 def get_table_index(request: Request, table_id: str) -> HTMLResponse | RedirectResponse:
     app_metadata: AppMetadata = request.app.state.app_metadata
@@ -266,7 +506,12 @@ def get_table_index(request: Request, table_id: str) -> HTMLResponse | RedirectR
 
 
 @router.get("/tables/{table_id}/history", response_class=HTMLResponse)
-def get_table_history(request: Request, table_id: str) -> HTMLResponse:
+def get_table_history(
+    request: Request,
+    table_id: str,
+    limit: int = DEFAULT_HISTORY_LIMIT,
+    before_version: int | None = None,
+) -> HTMLResponse:
     app_metadata: AppMetadata = request.app.state.app_metadata
     config: Config = request.app.state.config
     templates: Jinja2Templates = request.app.state.templates
@@ -275,7 +520,7 @@ def get_table_history(request: Request, table_id: str) -> HTMLResponse:
     )
     try:
         table = load_table(table_config)
-        table_history = table.history()
+        table_history = table.history(limit=limit, before_version=before_version)
         error = None
     except ValueError as e:
         error = {"message": str(e)}
@@ -283,7 +528,10 @@ def get_table_history(request: Request, table_id: str) -> HTMLResponse:
 
     return templates.TemplateResponse(
         request=request,
-        name="tables/history.html",
+        # further pages are appended to the revisions already displayed
+        name="tables/_history.html"
+        if wants_partial(request)
+        else "tables/history.html",
         context={
             "app_metadata": app_metadata,
             "tables": config.tables,
@@ -300,10 +548,14 @@ def get_table_statistics(
     request: Request,
     table_id: str,
     version: int | None = None,
+    mode: StatisticsModeEnum = StatisticsModeEnum.exact,
+    scan_missing: bool = False,
+    as_of: str | None = None,
 ) -> HTMLResponse:
     app_metadata: AppMetadata = request.app.state.app_metadata
     config: Config = request.app.state.config
     templates: Jinja2Templates = request.app.state.templates
+    statistics_cache: StatisticsCache = request.app.state.statistics_cache
     table_config = next(
         filter(lambda table_config: table_config.name == table_id, config.tables)
     )
@@ -311,14 +563,22 @@ def get_table_statistics(
         table = load_table(table_config)
         table_name = table_config.name
         table_metadata = table.metadata()
-        table_dataset = table.dataset(version=version)
-        sql_query = generate_table_statistics_query(table_name)
-        query_results = execute_query({table_name: table_dataset}, sql_query)
+        version = resolve_table_version(table, version, as_of)
+        query_results = compute_table_statistics(
+            table_name,
+            table,
+            version=version,
+            mode=mode,
+            scan_missing=scan_missing,
+            cache=statistics_cache,
+        )
+        sample = statistics_sample(query_results)
         error = None
     except ValueError as e:
         error = {"message": str(e)}
         table_metadata = None
         query_results = None
+        sample = None
 
     return templates.TemplateResponse(
         request=request,
@@ -330,6 +590,10 @@ def get_table_statistics(
             "table_id": table_id,
             "table_metadata": table_metadata,
             "table_results": query_results,
+            "statistics_modes": list(StatisticsModeEnum),
+            "statistics_mode": mode,
+            "statistics_sample": sample,
+            "table_version": version,
             "error": error,
         },
     )
@@ -344,6 +608,9 @@ def get_table_view(
     sort_asc: str | None = None,
     sort_desc: str | None = None,
     version: int | None = None,
+    where: str | None = None,
+    partition: Annotated[list[str] | None, Query()] = None,
+    as_of: str | None = None,
 ) -> HTMLResponse:
     app_metadata: AppMetadata = request.app.state.app_metadata
     config: Config = request.app.state.config
@@ -351,13 +618,22 @@ def get_table_view(
     table_config = next(
         filter(lambda table_config: table_config.name == table_id, config.tables)
     )
+    pruning = None
     try:
         table = load_table(table_config)
         table_name = table_config.name
         table_metadata = table.metadata()
-        table_dataset = table.dataset(version=version)
+        version = resolve_table_version(table, version, as_of)
+        table_dataset, where_sql, pruning = filter_table_dataset(
+            table, table.dataset(version=version), where, partition
+        )
         sql_query = generate_table_query(
-            table_name, limit=limit, cols=cols, sort_asc=sort_asc, sort_desc=sort_desc
+            table_name,
+            limit=limit,
+            cols=cols,
+            sort_asc=sort_asc,
+            sort_desc=sort_desc,
+            where=where_sql,
         )
         results = execute_query({table_name: table_dataset}, sql_query)
         error = None
@@ -379,6 +655,8 @@ def get_table_view(
             "table_results": results,
             "sql_query": sql_query,
             "default_limit": DEFAULT_LIMIT,
+            "pruning": pruning,
+            "table_version": version,
             "error": error,
         },
     )
@@ -419,8 +697,9 @@ def post_table_import(
     input_file: Annotated[UploadFile, File()],
     mode: Annotated[ImportModeEnum, Form()],
     file_format: Annotated[ImportFileFormatEnum, Form()],
-    delimiter: Annotated[str, Form()],
-    encoding: Annotated[str, Form()],
+    delimiter: Annotated[str, Form()] = ",",
+    encoding: Annotated[str, Form()] = "utf-8",
+    merge_keys: Annotated[str, Form()] = "",
 ) -> HTMLResponse:
     app_metadata: AppMetadata = request.app.state.app_metadata
     config: Config = request.app.state.config
@@ -433,12 +712,19 @@ def post_table_import(
     table_exists = False
 
     try:
-        rows_imported = import_file_to_table(
-            table_config, input_file.file, mode, file_format, delimiter, encoding
+        result = import_file_to_table(
+            table_config,
+            input_file.file,
+            mode,
+            file_format,
+            delimiter,
+            encoding,
+            merge_keys=[key.strip() for key in merge_keys.split(",") if key.strip()],
         )
         message = {
             "type": "success",
-            "body": f"Successfully imported {rows_imported} rows",
+            "body": f"Successfully imported {result.rows} rows"
+            + compaction_summary(result),
         }
     except Exception as e:
         message = {"type": "error", "body": str(e)}
@@ -522,6 +808,7 @@ async def get_query_run(request: Request, query_id: str) -> Response:
     app_metadata: AppMetadata = request.app.state.app_metadata
     config: Config = request.app.state.config
     templates: Jinja2Templates = request.app.state.templates
+    query_results_cache: QueryResultCache = request.app.state.query_results_cache
     query_config = next(
         filter(lambda query_config: query_config.name == query_id, config.queries)
     )
@@ -549,11 +836,18 @@ async def get_query_run(request: Request, query_id: str) -> Response:
     try:
 
         def _execute() -> QueryResult:
+            tables_dataset, table_versions = load_query_versioned_datasets(
+                config.tables, query_config.sql
+            )
             return run_query(
-                load_datasets(config.tables),
+                tables_dataset,
                 query_config.sql,
                 sql_params=sql_params,
                 max_rows=config.settings.max_query_rows,
+                cache=query_results_cache,
+                table_versions=table_versions,
+                cache_ttl=query_config.cache_ttl,
+                totals=query_config.totals_row,
             )
 
         query_result = await asyncio.to_thread(_execute)
@@ -574,6 +868,14 @@ async def get_query_run(request: Request, query_id: str) -> Response:
 
     if wants_partial(request):
         template_name = "queries/_results.html"
+        if query_result is not None:
+            context.update(
+                paginated_results_context(
+                    request,
+                    query_result,
+                    {"sql": query_config.sql, "filename": query_id, **sql_params},
+                )
+            )
         headers["HX-Push-Url"] = str(
             request.url_for("get_query_view", query_id=query_id).include_query_params(
                 **sql_params
@@ -597,6 +899,60 @@ async def get_query_run(request: Request, query_id: str) -> Response:
     )
 
 
+@router.post("/results/{token}")
+async def post_results_page(
+    request: Request, token: str, params: DataTablesRequest
+) -> Response:
+    paginated_results: QueryResultCache = request.app.state.paginated_results
+
+    query_result = paginated_results.get(token)
+    if query_result is None:
+        content = {
+            "draw": params.draw,
+            "recordsTotal": 0,
+            "recordsFiltered": 0,
+            "data": [],
+            "error": "Query results expired, please run the query again",
+        }
+        return Response(content=orjson.dumps(content), media_type="application/json")
+
+    length = (
+        params.length
+        if 0 <= params.length <= MAX_RESULTS_PAGE_LENGTH
+        else MAX_RESULTS_PAGE_LENGTH
+    )
+    page = await asyncio.to_thread(
+        page_query_result,
+        query_result,
+        start=params.start,
+        length=length,
+        search=params.search.value,
+        column_searches=params.column_searches(),
+        order=params.column_order(),
+    )
+    totals = (
+        [column[0].as_py() for column in page.totals.columns]
+        if page.totals is not None
+        else None
+    )
+
+    metadata = orjson.dumps(
+        {
+            "draw": params.draw,
+            "recordsTotal": page.records_total,
+            "recordsFiltered": page.records_filtered,
+            "totals": totals,
+        },
+        default=str,
+    )
+    # page rows are encoded straight from Arrow, then spliced into the response
+    rows = rows_to_json(page.data).encode()
+    return Response(
+        content=metadata[:-1] + b',"data":' + rows + b"}",
+        media_type="application/json",
+    )
+
+
 def create_app() -> FastAPI:
     settings = Settings()  # type: ignore[call-arg]
     config = load_yaml_config(settings.laketower_config_path)
@@ -618,5 +974,15 @@ def create_app() -> FastAPI:
     )
     app.state.config = config
     app.state.templates = templates
+    app.state.paginated_results = QueryResultCache(
+        config.settings.cache.paginated_results_max_bytes
+    )
+    app.state.statistics_cache = StatisticsCache(
+        config.settings.cache.statistics_dir,
+        config.settings.cache.statistics_max_bytes,
+    )
+    app.state.query_results_cache = QueryResultCache(
+        config.settings.cache.query_results_max_bytes
+    )
 
     return app
@@ -9,6 +9,13 @@ import pandas as pd
 import pytest
 import yaml
 
+from laketower import tables
+
+
+@pytest.fixture(autouse=True)
+def clear_table_handles() -> None:
+    tables.table_handles.clear()
+
 
 @pytest.fixture()
 def delta_table_data() -> pd.DataFrame:
@@ -40,7 +47,7 @@ def delta_table(tmp_path: Path, delta_table_data: pd.DataFrame) -> deltalake.Del
 
 
 @pytest.fixture()
-def sample_config(delta_table: deltalake.DeltaTable) -> dict[str, Any]:
+def sample_config(tmp_path: Path, delta_table: deltalake.DeltaTable) -> dict[str, Any]:
     new_table_uri = str(Path(delta_table.table_uri).parent / "new_table")
     return {
         "settings": {
@@ -48,6 +55,13 @@ def sample_config(delta_table: deltalake.DeltaTable) -> dict[str, Any]:
             "web": {
                 "hide_tables": False,
             },
+            "cache": {
+                "query_results_max_bytes": 16 * 1024 * 1024,
+                "paginated_results_max_bytes": 32 * 1024 * 1024,
+                "paginated_results_ttl": 600,
+                "statistics_dir": str(tmp_path / "statistics"),
+                "statistics_max_bytes": 1024 * 1024,
+            },
         },
         "tables": [
             {"name": "delta_table", "uri": delta_table.table_uri, "format": "delta"},
@@ -73,6 +87,7 @@ def sample_config(delta_table: deltalake.DeltaTable) -> dict[str, Any]:
                 "title": "Daily average temperature with parameters",
                 "description": "Display daily average temperature values from `weather` table, with dynamic filters for start and end dates",
                 "totals_row": True,
+                "cache_ttl": 60,
                 "parameters": {
                     "start_date": {"default": "2025-01-01"},
                     "end_date": {"default": "2025-01-31"},
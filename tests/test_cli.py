@@ -1,3 +1,4 @@
+import io
 import sys
 from datetime import datetime, timezone
 from pathlib import Path
@@ -402,6 +403,166 @@ def test_tables_history(
                 assert f"{metric_key}: {metric_val}" in output
 
 
+@pytest.mark.parametrize(
+    ("extra_args", "operation"),
+    [([], "compact"), (["--zorder", "city", "--target-size", "1048576"], "z-order")],
+)
+def test_tables_optimize(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    sample_config: dict[str, Any],
+    sample_config_path: Path,
+    delta_table: deltalake.DeltaTable,
+    extra_args: list[str],
+    operation: str,
+) -> None:
+    table_name = sample_config["tables"][0]["name"]
+    deltalake.write_deltalake(
+        delta_table.table_uri, delta_table.to_pyarrow_table(), mode="append"
+    )
+
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "laketower",
+            "--config",
+            str(sample_config_path),
+            "tables",
+            "optimize",
+            table_name,
+            *extra_args,
+        ],
+    )
+
+    cli.cli()
+
+    captured = capsys.readouterr()
+    output = captured.out
+    assert output.startswith(table_name)
+    assert f"operation: {operation}" in output
+    assert "files removed: 2" in output
+    assert "files added: 1" in output
+    assert "bytes removed: " in output
+    assert "bytes added: " in output
+    assert "duration: " in output
+    assert len(deltalake.DeltaTable(delta_table.table_uri).file_uris()) == 1
+
+
+@pytest.mark.parametrize(
+    ("extra_args", "expected_output"),
+    [
+        (["--retention", "0"], "Invalid retention period"),
+        (["--retention", "0", "--force", "--dry-run"], "operation: vacuum (dry run)"),
+        (["--retention", "0", "--force"], "files removed: 1"),
+        ([], "files removed: 0"),
+    ],
+)
+def test_tables_vacuum(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    sample_config: dict[str, Any],
+    sample_config_path: Path,
+    delta_table: deltalake.DeltaTable,
+    extra_args: list[str],
+    expected_output: str,
+) -> None:
+    deltalake.write_deltalake(
+        delta_table.table_uri, delta_table.to_pyarrow_table(), mode="overwrite"
+    )
+
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "laketower",
+            "--config",
+            str(sample_config_path),
+            "tables",
+            "vacuum",
+            sample_config["tables"][0]["name"],
+            *extra_args,
+        ],
+    )
+
+    cli.cli()
+
+    captured = capsys.readouterr()
+    assert expected_output in captured.out
+
+
+def test_tables_history_paginated(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    sample_config: dict[str, Any],
+    sample_config_path: Path,
+    delta_table: deltalake.DeltaTable,
+) -> None:
+    for _ in range(2):
+        deltalake.write_deltalake(
+            delta_table.table_uri, delta_table.to_pandas(), mode="append"
+        )
+
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "laketower",
+            "--config",
+            str(sample_config_path),
+            "tables",
+            "history",
+            "--limit",
+            "2",
+            "--before-version",
+            "3",
+            sample_config["tables"][0]["name"],
+        ],
+    )
+
+    cli.cli()
+
+    output = capsys.readouterr().out
+    assert "version: 3" not in output
+    assert "version: 2" in output
+    assert "version: 1" in output
+    assert "version: 0" not in output
+    assert "Older revisions: --before-version 1" in output
+
+
+def test_tables_history_compact(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    sample_config: dict[str, Any],
+    sample_config_path: Path,
+    delta_table: deltalake.DeltaTable,
+) -> None:
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "laketower",
+            "--config",
+            str(sample_config_path),
+            "tables",
+            "history",
+            "--compact",
+            "--limit",
+            "1",
+            sample_config["tables"][0]["name"],
+        ],
+    )
+
+    cli.cli()
+
+    output = capsys.readouterr().out
+    assert "operation" in output
+    assert "WRITE" in output
+    assert "CREATE TABLE" not in output
+    assert "operation parameters" not in output
+    assert "--before-version 1" in output
+
+
 def test_tables_history_invalid_table_uri(
     monkeypatch: pytest.MonkeyPatch,
     capsys: pytest.CaptureFixture[str],
@@ -496,6 +657,112 @@ def test_tables_statistics_version(
     assert "max" in output
 
 
+def test_tables_statistics_as_of(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    sample_config: dict[str, Any],
+    sample_config_path: Path,
+    delta_table: deltalake.DeltaTable,
+) -> None:
+    as_of = datetime.fromtimestamp(
+        delta_table.history()[0]["timestamp"] / 1000, tz=timezone.utc
+    )
+    deltalake.write_deltalake(
+        delta_table.table_uri,
+        pd.DataFrame(
+            {
+                "time": [pd.Timestamp("2025-02-01T00:00:00")],
+                "city": ["Lyon"],
+                "temperature": [500.0],
+            }
+        ),
+        mode="append",
+    )
+
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "laketower",
+            "--config",
+            str(sample_config_path),
+            "tables",
+            "statistics",
+            "--as-of",
+            as_of.isoformat(),
+            sample_config["tables"][0]["name"],
+        ],
+    )
+
+    cli.cli()
+
+    output = capsys.readouterr().out
+    assert "column_name" in output
+    assert "163.0" in output
+    assert "500.0" not in output
+
+
+def test_tables_statistics_metadata(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    sample_config: dict[str, Any],
+    sample_config_path: Path,
+    delta_table: deltalake.DeltaTable,
+) -> None:
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "laketower",
+            "--config",
+            str(sample_config_path),
+            "tables",
+            "statistics",
+            "--mode",
+            "metadata",
+            "--scan-missing",
+            sample_config["tables"][0]["name"],
+        ],
+    )
+
+    cli.cli()
+
+    captured = capsys.readouterr()
+    output = captured.out
+    assert all(field.name in output for field in delta_table.schema().fields)
+    assert "null_count" in output
+    assert "source" in output
+    assert "metadata" in output
+    assert "Grenoble" in output
+
+
+def test_tables_statistics_approx(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    sample_config: dict[str, Any],
+    sample_config_path: Path,
+) -> None:
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "laketower",
+            "--config",
+            str(sample_config_path),
+            "tables",
+            "statistics",
+            "--approx",
+            sample_config["tables"][0]["name"],
+        ],
+    )
+
+    cli.cli()
+
+    captured = capsys.readouterr()
+    output = captured.out
+    assert "Estimated from a sample of 168 rows out of 168" in output
+
+
 def test_tables_statistics_invalid_table_uri(
     monkeypatch: pytest.MonkeyPatch,
     capsys: pytest.CaptureFixture[str],
@@ -711,14 +978,27 @@ def test_tables_view_sort_desc(
     assert all(str(row[col]) in output for _, row in df.iterrows() for col in row.index)
 
 
-def test_tables_view_version(
+def test_tables_view_as_of(
     monkeypatch: pytest.MonkeyPatch,
     capsys: pytest.CaptureFixture[str],
     sample_config: dict[str, Any],
     sample_config_path: Path,
     delta_table: deltalake.DeltaTable,
 ) -> None:
-    default_limit = 10
+    as_of = datetime.fromtimestamp(
+        delta_table.history()[0]["timestamp"] / 1000, tz=timezone.utc
+    )
+    deltalake.write_deltalake(
+        delta_table.table_uri,
+        pd.DataFrame(
+            {
+                "time": [pd.Timestamp("2025-02-01T00:00:00")],
+                "city": ["Lyon"],
+                "temperature": [500.0],
+            }
+        ),
+        mode="append",
+    )
 
     monkeypatch.setattr(
         sys,
@@ -729,29 +1009,35 @@ def test_tables_view_version(
             str(sample_config_path),
             "tables",
             "view",
-            "--version",
-            "0",
+            "--as-of",
+            as_of.isoformat(),
+            "--where",
+            "temperature > 200",
             sample_config["tables"][0]["name"],
         ],
     )
 
     cli.cli()
 
-    captured = capsys.readouterr()
-    output = captured.out
+    output = capsys.readouterr().out
     assert all(field.name in output for field in delta_table.schema().fields)
-
-    df = delta_table.to_pandas()[0:default_limit]
-    assert not all(
-        str(row[col]) in output for _, row in df.iterrows() for col in row.index
-    )
+    assert "Lyon" not in output
 
 
-def test_tables_view_invalid_table_uri(
+@pytest.mark.parametrize(
+    ("args", "error"),
+    [
+        (["--as-of", "yesterday"], "Invalid timestamp"),
+        (["--as-of", "2000-01-01"], "No table version as of"),
+    ],
+)
+def test_tables_view_as_of_invalid(
     monkeypatch: pytest.MonkeyPatch,
     capsys: pytest.CaptureFixture[str],
     sample_config: dict[str, Any],
     sample_config_path: Path,
+    args: list[str],
+    error: str,
 ) -> None:
     monkeypatch.setattr(
         sys,
@@ -762,27 +1048,24 @@ def test_tables_view_invalid_table_uri(
             str(sample_config_path),
             "tables",
             "view",
-            sample_config["tables"][-1]["name"],
+            *args,
+            sample_config["tables"][0]["name"],
         ],
     )
 
     cli.cli()
 
-    captured = capsys.readouterr()
-    output = captured.out
-    assert "Invalid table:" in output
+    assert error in capsys.readouterr().out
 
 
-def test_tables_query(
+def test_tables_view_version(
     monkeypatch: pytest.MonkeyPatch,
     capsys: pytest.CaptureFixture[str],
     sample_config: dict[str, Any],
     sample_config_path: Path,
     delta_table: deltalake.DeltaTable,
 ) -> None:
-    selected_column = delta_table.schema().fields[0].name
-    filtered_columns = [field.name for field in delta_table.schema().fields[1:]]
-    selected_limit = 1
+    default_limit = 10
 
     monkeypatch.setattr(
         sys,
@@ -792,8 +1075,10 @@ def test_tables_query(
             "--config",
             str(sample_config_path),
             "tables",
-            "query",
-            f"select {selected_column} from {sample_config['tables'][0]['name']} limit {selected_limit}",
+            "view",
+            "--version",
+            "0",
+            sample_config["tables"][0]["name"],
         ],
     )
 
@@ -801,26 +1086,28 @@ def test_tables_query(
 
     captured = capsys.readouterr()
     output = captured.out
-    assert f"{selected_limit} rows returned" in output
-    assert "Execution time: " in output
-    assert selected_column in output
-    assert not all(col in output for col in filtered_columns)
+    assert all(field.name in output for field in delta_table.schema().fields)
 
-    df = delta_table.to_pandas()
-    assert all(str(row) in output for row in df[selected_column][0:selected_limit])
-    assert not all(str(row) in output for row in df[selected_column][selected_limit:])
+    df = delta_table.to_pandas()[0:default_limit]
+    assert not all(
+        str(row[col]) in output for _, row in df.iterrows() for col in row.index
+    )
 
 
-def test_tables_query_max_rows_limit(
+@pytest.mark.parametrize(
+    ("where", "expected_rows", "pruned_files"),
+    [("temperature > 160", 3, 0), ("temperature > 1000", 0, 1)],
+)
+def test_tables_view_where(
     monkeypatch: pytest.MonkeyPatch,
     capsys: pytest.CaptureFixture[str],
     sample_config: dict[str, Any],
     sample_config_path: Path,
+    delta_table: deltalake.DeltaTable,
+    where: str,
+    expected_rows: int,
+    pruned_files: int,
 ) -> None:
-    max_query_rows = 3
-    sample_config["settings"]["max_query_rows"] = max_query_rows
-    sample_config_path.write_text(yaml.dump(sample_config))
-
     monkeypatch.setattr(
         sys,
         "argv",
@@ -829,8 +1116,10 @@ def test_tables_query_max_rows_limit(
             "--config",
             str(sample_config_path),
             "tables",
-            "query",
-            f"select * from {sample_config['tables'][0]['name']}",
+            "view",
+            sample_config["tables"][0]["name"],
+            "--where",
+            where,
         ],
     )
 
@@ -838,18 +1127,149 @@ def test_tables_query_max_rows_limit(
 
     captured = capsys.readouterr()
     output = captured.out
-    assert f"{max_query_rows} rows returned (truncated)" in output
-    assert "Execution time: " in output
+    assert f"{pruned_files} of 1 files pruned" in output
+    assert output.count("Grenoble") == expected_rows
 
 
-def test_tables_query_parameters(
+@pytest.mark.parametrize(
+    ("extra_args", "error"),
+    [
+        (["--where", "temperature >"], "Invalid filter"),
+        (["--where", "unknown = 1"], "Unknown filter columns: unknown"),
+        (["--partition", "city=Grenoble"], "'city' is not a partition column"),
+    ],
+)
+def test_tables_view_invalid_filters(
     monkeypatch: pytest.MonkeyPatch,
     capsys: pytest.CaptureFixture[str],
     sample_config: dict[str, Any],
     sample_config_path: Path,
-    delta_table: deltalake.DeltaTable,
+    extra_args: list[str],
+    error: str,
 ) -> None:
-    selected_column = delta_table.schema().fields[0].name
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "laketower",
+            "--config",
+            str(sample_config_path),
+            "tables",
+            "view",
+            sample_config["tables"][0]["name"],
+            *extra_args,
+        ],
+    )
+
+    cli.cli()
+
+    captured = capsys.readouterr()
+    assert error in captured.out
+
+
+def test_tables_view_invalid_table_uri(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    sample_config: dict[str, Any],
+    sample_config_path: Path,
+) -> None:
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "laketower",
+            "--config",
+            str(sample_config_path),
+            "tables",
+            "view",
+            sample_config["tables"][-1]["name"],
+        ],
+    )
+
+    cli.cli()
+
+    captured = capsys.readouterr()
+    output = captured.out
+    assert "Invalid table:" in output
+
+
+def test_tables_query(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    sample_config: dict[str, Any],
+    sample_config_path: Path,
+    delta_table: deltalake.DeltaTable,
+) -> None:
+    selected_column = delta_table.schema().fields[0].name
+    filtered_columns = [field.name for field in delta_table.schema().fields[1:]]
+    selected_limit = 1
+
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "laketower",
+            "--config",
+            str(sample_config_path),
+            "tables",
+            "query",
+            f"select {selected_column} from {sample_config['tables'][0]['name']} limit {selected_limit}",
+        ],
+    )
+
+    cli.cli()
+
+    captured = capsys.readouterr()
+    output = captured.out
+    assert f"{selected_limit} rows returned" in output
+    assert "Execution time: " in output
+    assert selected_column in output
+    assert not all(col in output for col in filtered_columns)
+
+    df = delta_table.to_pandas()
+    assert all(str(row) in output for row in df[selected_column][0:selected_limit])
+    assert not all(str(row) in output for row in df[selected_column][selected_limit:])
+
+
+def test_tables_query_max_rows_limit(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    sample_config: dict[str, Any],
+    sample_config_path: Path,
+) -> None:
+    max_query_rows = 3
+    sample_config["settings"]["max_query_rows"] = max_query_rows
+    sample_config_path.write_text(yaml.dump(sample_config))
+
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "laketower",
+            "--config",
+            str(sample_config_path),
+            "tables",
+            "query",
+            f"select * from {sample_config['tables'][0]['name']}",
+        ],
+    )
+
+    cli.cli()
+
+    captured = capsys.readouterr()
+    output = captured.out
+    assert f"{max_query_rows} rows returned (truncated)" in output
+    assert "Execution time: " in output
+
+
+def test_tables_query_parameters(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    sample_config: dict[str, Any],
+    sample_config_path: Path,
+    delta_table: deltalake.DeltaTable,
+) -> None:
+    selected_column = delta_table.schema().fields[0].name
     filtered_columns = [field.name for field in delta_table.schema().fields[1:]]
     param_column = "time"
     start_date = "2025-01-01"
@@ -939,6 +1359,108 @@ def test_tables_query_output_csv(
     assert output_csv_path.read_text() == expected_csv_path.read_text()
 
 
+@pytest.mark.parametrize(
+    ("table_index", "mode", "expected_rows"),
+    [(-1, "append", 3), (0, "append", 24 * 7 + 3), (0, "overwrite", 3)],
+)
+def test_tables_query_into(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    sample_config: dict[str, Any],
+    sample_config_path: Path,
+    delta_table: deltalake.DeltaTable,
+    table_index: int,
+    mode: str,
+    expected_rows: int,
+) -> None:
+    source_table = sample_config["tables"][0]["name"]
+    into_table = sample_config["tables"][table_index]
+
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "laketower",
+            "--config",
+            str(sample_config_path),
+            "tables",
+            "query",
+            "--into",
+            into_table["name"],
+            "--mode",
+            mode,
+            f"select * from {source_table} order by time desc limit 3",
+        ],
+    )
+
+    cli.cli()
+
+    captured = capsys.readouterr()
+    assert "Successfully wrote 3 rows" in captured.out
+    updated_table = deltalake.DeltaTable(into_table["uri"]).to_pyarrow_table()
+    assert updated_table.num_rows == expected_rows
+    assert updated_table.schema.types == delta_table.to_pyarrow_table().schema.types
+
+
+def test_tables_query_into_unknown_table(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    sample_config: dict[str, Any],
+    sample_config_path: Path,
+) -> None:
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "laketower",
+            "--config",
+            str(sample_config_path),
+            "tables",
+            "query",
+            "--into",
+            "unknown_table",
+            f"select * from {sample_config['tables'][0]['name']}",
+        ],
+    )
+
+    cli.cli()
+
+    captured = capsys.readouterr()
+    assert "Unknown table 'unknown_table'" in captured.out
+
+
+def test_tables_query_output_csv_not_truncated(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    tmp_path: Path,
+    sample_config: dict[str, Any],
+    sample_config_path: Path,
+) -> None:
+    num_rows = sample_config["settings"]["max_query_rows"] * 2
+    output_csv_path = tmp_path / "output.csv"
+
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "laketower",
+            "--config",
+            str(sample_config_path),
+            "tables",
+            "query",
+            "--output",
+            str(output_csv_path),
+            f"select range as value from range({num_rows})",
+        ],
+    )
+
+    cli.cli()
+
+    captured = capsys.readouterr()
+    assert "Query results written to:" in captured.out
+    assert pacsv.read_csv(output_csv_path).num_rows == num_rows
+
+
 @pytest.mark.parametrize(
     ["sql"],
     [
@@ -1069,6 +1591,37 @@ def test_queries_view_max_row_limit(
     assert all(col in output for col in {"day", "avg_temperature"})
 
 
+def test_queries_view_max_row_limit_totals(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    sample_config: dict[str, Any],
+    sample_config_path: Path,
+) -> None:
+    sample_config["settings"]["max_query_rows"] = 3
+    sample_config_path.write_text(yaml.dump(sample_config))
+
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "laketower",
+            "--config",
+            str(sample_config_path),
+            "queries",
+            "view",
+            sample_config["queries"][1]["name"],
+        ],
+    )
+
+    cli.cli()
+
+    captured = capsys.readouterr()
+    output = captured.out
+    assert "3 rows returned (truncated)" in output
+    # totals span the 7 days of the table, not only the 3 displayed rows
+    assert "556.0" in output
+
+
 def test_queries_view_parameters_default(
     monkeypatch: pytest.MonkeyPatch,
     capsys: pytest.CaptureFixture[str],
@@ -1227,6 +1780,308 @@ def test_tables_import_csv_append(
     assert new_city in df["city"].unique()
 
 
+def test_tables_import_auto_compaction(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    sample_config: dict[str, Any],
+    sample_config_path: Path,
+) -> None:
+    table_name = sample_config["tables"][0]["name"]
+    sample_config["tables"][0]["auto_compaction"] = {"min_small_files": 2}
+    sample_config_path.write_text(yaml.dump(sample_config))
+    csv_content = b"time,city,temperature\n2025-01-02T00:00:00+00:00,Lyon,10.5\n"
+
+    monkeypatch.setattr(
+        sys, "stdin", io.TextIOWrapper(io.BytesIO(csv_content), encoding="utf-8")
+    )
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "laketower",
+            "--config",
+            str(sample_config_path),
+            "tables",
+            "import",
+            table_name,
+            "--file",
+            "-",
+            "--mode",
+            "append",
+        ],
+    )
+
+    cli.cli()
+
+    captured = capsys.readouterr()
+    assert (
+        f"Successfully imported 1 rows into table '{table_name}' in 'append' mode"
+        in captured.out
+    )
+    assert "operation: compact" in captured.out
+    assert "files removed: 2" in captured.out
+
+
+def test_tables_import_csv_stdin(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    sample_config: dict[str, Any],
+    sample_config_path: Path,
+    delta_table: deltalake.DeltaTable,
+) -> None:
+    table_name = sample_config["tables"][0]["name"]
+    csv_content = (
+        b"time,city,temperature\n"
+        b"2025-01-02T00:00:00+00:00,Lyon,10.5\n"
+        b"2025-01-02T01:00:00+00:00,Lyon,11.0\n"
+    )
+    original_count = len(delta_table.to_pandas())
+
+    monkeypatch.setattr(
+        sys, "stdin", io.TextIOWrapper(io.BytesIO(csv_content), encoding="utf-8")
+    )
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "laketower",
+            "--config",
+            str(sample_config_path),
+            "tables",
+            "import",
+            table_name,
+            "--file",
+            "-",
+            "--mode",
+            "append",
+            "--block-size",
+            "64",
+        ],
+    )
+
+    cli.cli()
+
+    captured = capsys.readouterr()
+    assert (
+        f"Successfully imported 2 rows into table '{table_name}' in 'append' mode"
+        in captured.out
+    )
+    updated_table = deltalake.DeltaTable(delta_table.table_uri)
+    assert len(updated_table.to_pandas()) == original_count + 2
+
+
+def test_tables_import_csv_multiple_files(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    tmp_path: Path,
+    sample_config: dict[str, Any],
+    sample_config_path: Path,
+    delta_table: deltalake.DeltaTable,
+) -> None:
+    table_name = sample_config["tables"][0]["name"]
+    for day in range(2, 5):
+        (tmp_path / f"data-{day}.csv").write_text(
+            "time,city,temperature\n"
+            f"2025-01-0{day}T00:00:00+00:00,Lyon,10.5\n"
+            f"2025-01-0{day}T01:00:00+00:00,Lyon,11.0\n"
+        )
+    (tmp_path / "extra.csv").write_text(
+        "time,city,temperature\n2025-01-05T00:00:00+00:00,Paris,8.0\n"
+    )
+    original_version = delta_table.version()
+    original_count = len(delta_table.to_pandas())
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "laketower",
+            "--config",
+            str(sample_config_path),
+            "tables",
+            "import",
+            table_name,
+            "--file",
+            "data-*.csv",
+            "extra.csv",
+            "--mode",
+            "append",
+        ],
+    )
+
+    cli.cli()
+
+    captured = capsys.readouterr()
+    output = captured.out
+    assert (
+        f"Successfully imported 7 rows into table '{table_name}' in 'append' mode"
+        in output
+    )
+    assert "data-2.csv" in output
+    assert "extra.csv" in output
+    updated_table = deltalake.DeltaTable(delta_table.table_uri)
+    assert updated_table.version() == original_version + 1
+    assert len(updated_table.to_pandas()) == original_count + 7
+
+
+def test_tables_import_csv_no_matching_files(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    tmp_path: Path,
+    sample_config: dict[str, Any],
+    sample_config_path: Path,
+) -> None:
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "laketower",
+            "--config",
+            str(sample_config_path),
+            "tables",
+            "import",
+            sample_config["tables"][0]["name"],
+            "--file",
+            str(tmp_path / "missing-*.csv"),
+        ],
+    )
+
+    cli.cli()
+
+    captured = capsys.readouterr()
+    assert "No files matching" in captured.out
+
+
+def test_tables_import_ndjson_append(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    tmp_path: Path,
+    sample_config: dict[str, Any],
+    sample_config_path: Path,
+    delta_table: deltalake.DeltaTable,
+) -> None:
+    table_name = sample_config["tables"][0]["name"]
+    ndjson_path = tmp_path / "test_data.ndjson"
+    ndjson_path.write_text(
+        '{"time": "2025-01-02 00:00:00", "city": "Lyon", "temperature": 10.5}\n'
+        '{"time": "2025-01-02 01:00:00", "city": "Lyon", "temperature": 11.0}\n'
+    )
+    original_count = len(delta_table.to_pandas())
+
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "laketower",
+            "--config",
+            str(sample_config_path),
+            "tables",
+            "import",
+            table_name,
+            "--file",
+            str(ndjson_path),
+            "--mode",
+            "append",
+            "--format",
+            "ndjson",
+        ],
+    )
+
+    cli.cli()
+
+    captured = capsys.readouterr()
+    assert (
+        f"Successfully imported 2 rows into table '{table_name}' in 'append' mode"
+        in captured.out
+    )
+    updated_table = deltalake.DeltaTable(delta_table.table_uri)
+    assert len(updated_table.to_pandas()) == original_count + 2
+
+
+def test_tables_import_csv_merge(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    tmp_path: Path,
+    sample_config: dict[str, Any],
+    sample_config_path: Path,
+    delta_table: deltalake.DeltaTable,
+) -> None:
+    table_name = sample_config["tables"][0]["name"]
+    csv_path = tmp_path / "test_data.csv"
+    csv_path.write_text(
+        "time,city,temperature\n"
+        "2025-01-01 00:00:00,Grenoble,100.5\n"
+        "2025-02-01 00:00:00,Grenoble,200.5\n"
+    )
+    original_count = len(delta_table.to_pandas())
+
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "laketower",
+            "--config",
+            str(sample_config_path),
+            "tables",
+            "import",
+            table_name,
+            "--file",
+            str(csv_path),
+            "--mode",
+            "merge",
+            "--merge-keys",
+            "time",
+            "city",
+        ],
+    )
+
+    cli.cli()
+
+    captured = capsys.readouterr()
+    assert (
+        f"Successfully imported 2 rows into table '{table_name}' in 'merge' mode"
+        in captured.out
+    )
+    df = deltalake.DeltaTable(delta_table.table_uri).to_pandas()
+    assert len(df) == original_count + 1
+    assert df["temperature"].min() == -4.0
+    assert df["temperature"].max() == 200.5
+
+
+def test_tables_import_csv_merge_missing_keys(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    tmp_path: Path,
+    sample_config: dict[str, Any],
+    sample_config_path: Path,
+) -> None:
+    csv_path = tmp_path / "test_data.csv"
+    csv_path.write_text("time,city,temperature\n2025-01-01 00:00:00,Grenoble,42.0\n")
+
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "laketower",
+            "--config",
+            str(sample_config_path),
+            "tables",
+            "import",
+            sample_config["tables"][0]["name"],
+            "--file",
+            str(csv_path),
+            "--mode",
+            "merge",
+        ],
+    )
+
+    cli.cli()
+
+    captured = capsys.readouterr()
+    assert "Merge mode requires key columns" in captured.out
+
+
 def test_tables_import_csv_overwrite(
     monkeypatch: pytest.MonkeyPatch,
     capsys: pytest.CaptureFixture[str],
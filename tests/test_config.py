@@ -17,6 +17,25 @@ def test_load_yaml_config(
     assert (
         conf.settings.web.hide_tables == sample_config["settings"]["web"]["hide_tables"]
     )
+    assert (
+        conf.settings.cache.query_results_max_bytes
+        == sample_config["settings"]["cache"]["query_results_max_bytes"]
+    )
+    assert (
+        conf.settings.cache.paginated_results_max_bytes
+        == sample_config["settings"]["cache"]["paginated_results_max_bytes"]
+    )
+    assert (
+        conf.settings.cache.paginated_results_ttl
+        == sample_config["settings"]["cache"]["paginated_results_ttl"]
+    )
+    assert conf.settings.cache.statistics_dir == Path(
+        sample_config["settings"]["cache"]["statistics_dir"]
+    )
+    assert (
+        conf.settings.cache.statistics_max_bytes
+        == sample_config["settings"]["cache"]["statistics_max_bytes"]
+    )
 
     for table, expected_table in zip(conf.tables, sample_config["tables"], strict=True):
         assert table.name == expected_table["name"]
@@ -31,9 +50,33 @@ def test_load_yaml_config(
         assert query.title == expected_query["title"]
         assert query.description == expected_query.get("description")
         assert query.totals_row == expected_query.get("totals_row", False)
+        assert query.cache_ttl == expected_query.get("cache_ttl")
         assert query.sql == expected_query["sql"]
 
 
+def test_load_yaml_config_table_auto_compaction(
+    tmp_path: Path, sample_config: dict[str, Any]
+) -> None:
+    sample_config["tables"][0]["auto_compaction"] = {"min_small_files": 10}
+    sample_config["tables"][1]["auto_compaction"] = {
+        "min_small_files": 20,
+        "small_file_max_bytes": 1024,
+        "target_size": 4096,
+    }
+    config_path = tmp_path / "laketower.yml"
+    config_path.write_text(yaml.dump(sample_config))
+
+    conf = config.load_yaml_config(config_path)
+
+    assert conf.tables[0].auto_compaction == config.ConfigTableAutoCompaction(
+        min_small_files=10, small_file_max_bytes=16 * 1024 * 1024, target_size=None
+    )
+    assert conf.tables[1].auto_compaction == config.ConfigTableAutoCompaction(
+        min_small_files=20, small_file_max_bytes=1024, target_size=4096
+    )
+    assert conf.tables[2].auto_compaction is None
+
+
 def test_load_yaml_config_storage_credentials_s3(
     tmp_path: Path,
     sample_config: dict[str, Any],
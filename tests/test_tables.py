@@ -1,11 +1,25 @@
+import gzip
 import io
+import os
+import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
 from pathlib import Path
 from typing import Any
 from unittest import mock
 
+import deltalake
+import duckdb
+import numpy as np
 import openpyxl
+import orjson
 import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
 import pyarrow.dataset as padataset
+import pyarrow.parquet as pq
 import pytest
 
 from laketower import config, tables
@@ -83,6 +97,138 @@ def test_deltatable_import_data_adls(
     assert mock_write_deltalake.call_args.kwargs["mode"] == "append"
 
 
+@pytest.fixture()
+def partitioned_table_config(tmp_path: Path) -> config.ConfigTable:
+    table_uri = str(tmp_path / "partitioned_table")
+    deltalake.write_deltalake(
+        table_uri,
+        pa.table(
+            {
+                "id": [1, 2, 3, 4],
+                "day": ["2025-01-01", "2025-01-01", "2025-01-02", "2025-01-02"],
+                "value": [1.0, 2.0, 3.0, 4.0],
+            }
+        ),
+        partition_by=["day"],
+    )
+    return config.ConfigTable.model_validate(
+        {"name": "partitioned_table", "uri": table_uri, "format": "delta"}
+    )
+
+
+def test_deltatable_import_data_merge(
+    partitioned_table_config: config.ConfigTable,
+) -> None:
+    data = pa.table({"id": [2, 5], "day": ["2025-01-01"] * 2, "value": [20.0, 50.0]})
+
+    tables.DeltaTable.import_data(
+        partitioned_table_config, data, tables.ImportModeEnum.merge, ["id"]
+    )
+
+    merged = deltalake.DeltaTable(partitioned_table_config.uri)
+    assert merged.to_pyarrow_table().sort_by("id").to_pylist() == [
+        {"id": 1, "day": "2025-01-01", "value": 1.0},
+        {"id": 2, "day": "2025-01-01", "value": 20.0},
+        {"id": 3, "day": "2025-01-02", "value": 3.0},
+        {"id": 4, "day": "2025-01-02", "value": 4.0},
+        {"id": 5, "day": "2025-01-01", "value": 50.0},
+    ]
+    commit = merged.history(1)[0]
+    assert commit["operation"] == "MERGE"
+    assert commit["operationParameters"]["mergePredicate"] == "target.id = source.id"
+
+
+def test_deltatable_import_data_merge_changed_partition(
+    partitioned_table_config: config.ConfigTable,
+) -> None:
+    data = pa.table({"id": [1], "day": ["2025-01-02"], "value": [10.0]})
+
+    tables.DeltaTable.import_data(
+        partitioned_table_config, data, tables.ImportModeEnum.merge, ["id"]
+    )
+
+    merged = deltalake.DeltaTable(partitioned_table_config.uri)
+    assert merged.to_pyarrow_table().sort_by("id").to_pylist() == [
+        {"id": 1, "day": "2025-01-02", "value": 10.0},
+        {"id": 2, "day": "2025-01-01", "value": 2.0},
+        {"id": 3, "day": "2025-01-02", "value": 3.0},
+        {"id": 4, "day": "2025-01-02", "value": 4.0},
+    ]
+
+
+def test_deltatable_import_data_merge_null_partition(
+    partitioned_table_config: config.ConfigTable,
+) -> None:
+    data = pa.table({"id": [5], "day": pa.array([None], pa.string()), "value": [5.0]})
+
+    for value in (5.0, 50.0):
+        tables.DeltaTable.import_data(
+            partitioned_table_config,
+            data.set_column(2, "value", pa.array([value])),
+            tables.ImportModeEnum.merge,
+            ["id"],
+        )
+
+    merged = deltalake.DeltaTable(partitioned_table_config.uri).to_pyarrow_table()
+    assert merged.filter(pc.field("id") == 5).to_pylist() == [
+        {"id": 5, "day": None, "value": 50.0}
+    ]
+
+
+def test_deltatable_import_data_merge_nonexistent_table(tmp_path: Path) -> None:
+    table_uri = str(tmp_path / "new_table")
+    table_config = config.ConfigTable.model_validate(
+        {"name": "new_table", "uri": table_uri, "format": "delta"}
+    )
+    data = pa.table({"id": [1, 2], "value": [1.0, 2.0]})
+
+    tables.DeltaTable.import_data(
+        table_config, data, tables.ImportModeEnum.merge, ["id"]
+    )
+
+    assert deltalake.DeltaTable(table_uri).to_pyarrow_table() == data
+
+
+@pytest.mark.parametrize(
+    ("merge_keys", "error"),
+    [
+        (None, "Merge mode requires key columns"),
+        (["id", "missing"], "Merge key columns not found: missing"),
+    ],
+)
+def test_deltatable_import_data_merge_invalid_keys(
+    partitioned_table_config: config.ConfigTable,
+    merge_keys: list[str] | None,
+    error: str,
+) -> None:
+    data = pa.table({"id": [1], "day": ["2025-01-01"], "value": [1.0]})
+
+    with pytest.raises(ValueError, match=error):
+        tables.DeltaTable.import_data(
+            partitioned_table_config, data, tables.ImportModeEnum.merge, merge_keys
+        )
+
+
+def test_import_file_to_table_merge(
+    partitioned_table_config: config.ConfigTable,
+) -> None:
+    csv_content = b"id,day,value\n3,2025-01-02,30.0\n6,2025-01-03,60.0\n"
+
+    result = tables.import_file_to_table(
+        partitioned_table_config,
+        io.BytesIO(csv_content),
+        tables.ImportModeEnum.merge,
+        merge_keys=["id"],
+    )
+
+    assert result.rows == 2
+    merged = deltalake.DeltaTable(partitioned_table_config.uri).to_pyarrow_table()
+    assert merged.num_rows == 5
+    assert dict(
+        zip(merged.column("id").to_pylist(), merged.column("value").to_pylist())
+    ) == {1: 1.0, 2: 2.0, 3: 30.0, 4: 4.0, 6: 60.0}
+
+
 @mock.patch("laketower.tables.deltalake.write_deltalake")
 def test_import_file_to_table_nonexistent_table(
     mock_write_deltalake: mock.MagicMock,
@@ -92,10 +238,11 @@ def test_import_file_to_table_nonexistent_table(
         {"name": "new_table", "uri": str(tmp_path / "new_table"), "format": "delta"}
     )
     csv_content = b"col1,col2\n1,a\n2,b\n"
+    mock_write_deltalake.side_effect = lambda uri, data, **_: data.read_all()
 
-    rows = tables.import_file_to_table(table_config, io.BytesIO(csv_content))
+    result = tables.import_file_to_table(table_config, io.BytesIO(csv_content))
 
-    assert rows == 2
+    assert result.rows == 2
     assert mock_write_deltalake.call_count == 1
     assert mock_write_deltalake.call_args.args[0] == str(tmp_path / "new_table")
 
@@ -112,11 +259,221 @@ def test_import_file_to_table_csv_empty_string_not_null(
 
     tables.import_file_to_table(table_config, io.BytesIO(csv_content))
 
-    imported: pa.Table = mock_write_deltalake.call_args.args[1]
+    imported = mock_write_deltalake.call_args.args[1].read_all()
     assert imported.column("col2")[0].as_py() == ""
     assert imported.column("col2")[1].as_py() == "b"
 
 
+def test_import_file_to_table_csv_streams_blocks(tmp_path: Path) -> None:
+    table_uri = str(tmp_path / "new_table")
+    table_config = config.ConfigTable.model_validate(
+        {"name": "new_table", "uri": table_uri, "format": "delta"}
+    )
+    csv_content = b"col1,col2\n" + b"".join(
+        f"{i},value-{i}\n".encode() for i in range(10_000)
+    )
+
+    with mock.patch(
+        "laketower.tables.deltalake.write_deltalake",
+        wraps=deltalake.write_deltalake,
+    ) as mock_write_deltalake:
+        result = tables.import_file_to_table(
+            table_config, io.BytesIO(csv_content), block_size=4_096
+        )
+
+    assert result.rows == 10_000
+    assert isinstance(mock_write_deltalake.call_args.args[1], pa.RecordBatchReader)
+    imported = deltalake.DeltaTable(table_uri).to_pyarrow_table()
+    assert imported.num_rows == 10_000
+    assert imported.schema.field("col1").type == pa.int64()
+
+
+@pytest.fixture()
+def import_data() -> pa.Table:
+    return pa.table(
+        {
+            "num": pa.array([1, 2, None], pa.int32()),
+            "amount": pa.array([Decimal("1.50"), None, Decimal("-2.25")]),
+            "time": pa.array(
+                [datetime(2025, 1, 1, tzinfo=timezone.utc)] * 3,
+                pa.timestamp("us", tz="UTC"),
+            ),
+            "tags": [["a"], [], None],
+        }
+    )
+
+
+def _write_import_file(
+    data: pa.Table,
+    file_format: tables.ImportFileFormatEnum,
+    sink: Any,
+    ipc_stream: bool = False,
+) -> None:
+    if file_format == tables.ImportFileFormatEnum.parquet:
+        pq.write_table(data, sink, row_group_size=1)
+        return
+    new_writer = pa.ipc.new_stream if ipc_stream else pa.ipc.new_file
+    with new_writer(sink, data.schema) as writer:
+        writer.write_table(data, max_chunksize=1)
+
+
+@pytest.mark.parametrize(
+    ("file_format", "ipc_stream"),
+    [
+        (tables.ImportFileFormatEnum.parquet, False),
+        (tables.ImportFileFormatEnum.arrow, False),
+        (tables.ImportFileFormatEnum.arrow, True),
+    ],
+)
+def test_import_file_to_table_columnar_formats(
+    tmp_path: Path,
+    import_data: pa.Table,
+    file_format: tables.ImportFileFormatEnum,
+    ipc_stream: bool,
+) -> None:
+    table_uri = str(tmp_path / "new_table")
+    table_config = config.ConfigTable.model_validate(
+        {"name": "new_table", "uri": table_uri, "format": "delta"}
+    )
+    buffer = io.BytesIO()
+    _write_import_file(import_data, file_format, buffer, ipc_stream)
+    buffer.seek(0)
+
+    result = tables.import_file_to_table(table_config, buffer, file_format=file_format)
+
+    assert result.rows == 3
+    imported = deltalake.DeltaTable(table_uri).to_pyarrow_table()
+    assert imported.to_pylist() == import_data.to_pylist()
+
+
+def test_import_file_to_table_arrow_stream_not_seekable(
+    tmp_path: Path, import_data: pa.Table
+) -> None:
+    table_config = config.ConfigTable.model_validate(
+        {"name": "new_table", "uri": str(tmp_path / "new_table"), "format": "delta"}
+    )
+    buffer = io.BytesIO()
+    with pa.ipc.new_stream(buffer, import_data.schema) as writer:
+        writer.write_table(import_data)
+    stream = io.BufferedReader(io.BytesIO(buffer.getvalue()))
+    stream.seekable = lambda: False  # type: ignore[method-assign]
+
+    result = tables.import_file_to_table(
+        table_config, stream, file_format=tables.ImportFileFormatEnum.arrow
+    )
+
+    assert result.rows == 3
+
+
+def test_import_file_to_table_ndjson(tmp_path: Path) -> None:
+    table_uri = str(tmp_path / "new_table")
+    table_config = config.ConfigTable.model_validate(
+        {"name": "new_table", "uri": table_uri, "format": "delta"}
+    )
+    ndjson_content = b"".join(
+        orjson.dumps({"num": i, "label": f"label-{i}", "tags": [i]}) + b"\n"
+        for i in range(1_000)
+    )
+
+    result = tables.import_file_to_table(
+        table_config,
+        io.BytesIO(ndjson_content),
+        file_format=tables.ImportFileFormatEnum.ndjson,
+        block_size=1_024,
+    )
+
+    assert result.rows == 1_000
+    imported = deltalake.DeltaTable(table_uri).to_pyarrow_table()
+    assert imported.schema.field("num").type == pa.int64()
+    assert imported.schema.field("tags").type == pa.list_(pa.int64())
+
+
+@pytest.mark.parametrize(
+    "file_format",
+    [tables.ImportFileFormatEnum.parquet, tables.ImportFileFormatEnum.arrow],
+)
+def test_import_files_to_table_columnar_formats(
+    tmp_path: Path, import_data: pa.Table, file_format: tables.ImportFileFormatEnum
+) -> None:
+    table_uri = str(tmp_path / "new_table")
+    table_config = config.ConfigTable.model_validate(
+        {"name": "new_table", "uri": table_uri, "format": "delta"}
+    )
+    file_paths = [tmp_path / f"part-{i}.{file_format.value}" for i in range(3)]
+    for file_path in file_paths:
+        _write_import_file(import_data, file_format, str(file_path))
+
+    result = tables.import_files_to_table(
+        table_config, file_paths, file_format=file_format
+    )
+
+    assert result.files_rows == {str(file_path): 3 for file_path in file_paths}
+    assert deltalake.DeltaTable(table_uri).to_pyarrow_table().num_rows == 9
+
+
+def test_import_files_to_table_single_commit(tmp_path: Path) -> None:
+    table_uri = str(tmp_path / "new_table")
+    table_config = config.ConfigTable.model_validate(
+        {"name": "new_table", "uri": table_uri, "format": "delta"}
+    )
+    file_paths = []
+    for i in range(5):
+        file_path = tmp_path / f"part-{i}.csv"
+        file_path.write_text(
+            "col1,col2\n" + "".join(f"{j},{i}\n" for j in range((i + 1) * 100))
+        )
+        file_paths.append(file_path)
+
+    result = tables.import_files_to_table(
+        table_config, file_paths, block_size=256, max_workers=2
+    )
+
+    assert result.files_rows == {str(file_paths[i]): (i + 1) * 100 for i in range(5)}
+    imported = deltalake.DeltaTable(table_uri)
+    assert imported.version() == 0
+    assert imported.to_pyarrow_table().num_rows == 1_500
+
+
+def test_import_files_to_table_first_file_column_types(tmp_path: Path) -> None:
+    table_uri = str(tmp_path / "new_table")
+    table_config = config.ConfigTable.model_validate(
+        {"name": "new_table", "uri": table_uri, "format": "delta"}
+    )
+    first_path, second_path = tmp_path / "first.csv", tmp_path / "second.csv"
+    first_path.write_text("col1,col2\n1.5,a\n")
+    second_path.write_text("col1,col2\n2,b\n")
+
+    tables.import_files_to_table(table_config, [first_path, second_path])
+
+    imported = deltalake.DeltaTable(table_uri).to_pyarrow_table()
+    assert imported.schema.field("col1").type == pa.float64()
+    assert set(imported.column("col1").to_pylist()) == {1.5, 2.0}
+
+
+def test_import_files_to_table_schema_mismatch(tmp_path: Path) -> None:
+    table_uri = str(tmp_path / "new_table")
+    table_config = config.ConfigTable.model_validate(
+        {"name": "new_table", "uri": table_uri, "format": "delta"}
+    )
+    first_path, second_path = tmp_path / "first.csv", tmp_path / "second.csv"
+    first_path.write_text("col1,col2\n1,a\n")
+    second_path.write_text("col1,col3\n2,b\n")
+
+    with pytest.raises(ValueError, match="schema of file .*second.csv"):
+        tables.import_files_to_table(table_config, [first_path, second_path])
+
+    assert not deltalake.DeltaTable.is_deltatable(table_uri)
+
+
+def test_import_files_to_table_no_files(tmp_path: Path) -> None:
+    table_config = config.ConfigTable.model_validate(
+        {"name": "new_table", "uri": str(tmp_path / "new_table"), "format": "delta"}
+    )
+
+    with pytest.raises(ValueError, match="No files to import"):
+        tables.import_files_to_table(table_config, [])
+
+
 @mock.patch("laketower.tables.deltalake.write_deltalake")
 def test_import_file_to_table_xlsx(
     mock_write_deltalake: mock.MagicMock,
@@ -134,14 +491,15 @@ def test_import_file_to_table_xlsx(
     xlsx_buffer = io.BytesIO()
     wb.save(xlsx_buffer)
     xlsx_buffer.seek(0)
+    mock_write_deltalake.side_effect = lambda uri, data, **_: data.read_all()
 
-    rows = tables.import_file_to_table(
+    result = tables.import_file_to_table(
         table_config,
         xlsx_buffer,
         file_format=tables.ImportFileFormatEnum.xlsx,
     )
 
-    assert rows == 2
+    assert result.rows == 2
     assert mock_write_deltalake.call_count == 1
 
 
@@ -216,6 +574,550 @@ def test_load_table_deltatable_adls(
     }
 
 
+def test_load_table_reuses_cached_handle(sample_config: dict[str, Any]) -> None:
+    table_config = config.ConfigTable.model_validate(sample_config["tables"][0])
+
+    first = tables.load_table(table_config)
+    second = tables.load_table(table_config)
+
+    assert first is second
+
+
+def test_load_table_config_change_reloads_handle(
+    sample_config: dict[str, Any], tmp_path: Path
+) -> None:
+    table_config = config.ConfigTable.model_validate(sample_config["tables"][0])
+    first = tables.load_table(table_config)
+
+    other_uri = tmp_path / "other_table"
+    deltalake.write_deltalake(other_uri, pa.table({"col1": [1]}))
+    other_config = table_config.model_copy(update={"uri": str(other_uri)})
+    second = tables.load_table(other_config)
+
+    assert first is not second
+    assert second.schema().names == ["col1"]
+
+
+def test_load_table_refreshes_cached_handle(
+    sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    table_config = config.ConfigTable.model_validate(sample_config["tables"][0])
+    table = tables.load_table(table_config)
+    version = table.version()
+
+    deltalake.write_deltalake(
+        delta_table.table_uri, delta_table.to_pyarrow_table(), mode="append"
+    )
+    with mock.patch("laketower.tables.deltalake.DeltaTable") as mock_deltatable:
+        refreshed = tables.load_table(table_config)
+
+    assert refreshed is table
+    assert refreshed.version() == version + 1
+    assert mock_deltatable.call_count == 0
+
+
+@pytest.mark.parametrize(
+    "error",
+    [OSError("unreachable"), deltalake.exceptions.DeltaError("not a table")],
+)
+def test_load_table_refresh_error(
+    tmp_path: Path,
+    sample_config: dict[str, Any],
+    delta_table: deltalake.DeltaTable,
+    error: Exception,
+) -> None:
+    table_config = config.ConfigTable.model_validate(sample_config["tables"][0])
+    table = tables.load_table(table_config)
+    shutil.rmtree(tmp_path / "delta_table")
+
+    with mock.patch.object(table, "refresh", side_effect=error):
+        with pytest.raises(ValueError, match="Invalid table"):
+            tables.load_table(table_config)
+
+
+def test_load_table_invalid_table_not_cached(sample_config: dict[str, Any]) -> None:
+    table_config = config.ConfigTable.model_validate(sample_config["tables"][-1])
+
+    with pytest.raises(ValueError, match="Invalid table"):
+        tables.load_table(table_config)
+    deltalake.write_deltalake(table_config.uri, pa.table({"col1": [1]}))
+    table = tables.load_table(table_config)
+
+    assert table.version() == 0
+
+
+def test_deltatable_dataset_cached_per_version(
+    sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    table_config = config.ConfigTable.model_validate(sample_config["tables"][0])
+    table = tables.load_table(table_config)
+
+    first = table.dataset()
+    second = table.dataset(version=table.version())
+    deltalake.write_deltalake(
+        delta_table.table_uri, delta_table.to_pyarrow_table(), mode="append"
+    )
+    table.refresh()
+    third = table.dataset()
+
+    assert first is second
+    assert third is not first
+
+
+def test_deltatable_dataset_time_travel_keeps_latest_version(
+    sample_config: dict[str, Any],
+) -> None:
+    table_config = config.ConfigTable.model_validate(sample_config["tables"][0])
+    table = tables.load_table(table_config)
+    latest_version = table.version()
+
+    dataset = table.dataset(version=0)
+
+    assert dataset.count_rows() == 0
+    assert table.version() == latest_version
+    assert table.dataset().count_rows() > 0
+
+
+def test_deltatable_snapshot_reused(
+    sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    table_config = config.ConfigTable.model_validate(sample_config["tables"][0])
+    table = tables.load_table(table_config)
+    assert isinstance(table, tables.DeltaTable)
+    latest_version = table.version()
+
+    with mock.patch.object(
+        deltalake, "DeltaTable", wraps=deltalake.DeltaTable
+    ) as delta_table_cls:
+        first = table.dataset(version=0)
+        second = table.dataset(version=0)
+        snapshot = table.snapshot(0)
+        table.file_statistics(version=0)
+
+    assert delta_table_cls.call_count == 1
+    assert first is second
+    assert snapshot.version == 0
+    assert snapshot.dataset() is first
+    assert table.version() == latest_version
+
+
+def test_deltatable_snapshot_timestamp_version(
+    sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    table_config = config.ConfigTable.model_validate(sample_config["tables"][0])
+    table = tables.load_table(table_config)
+    assert isinstance(table, tables.DeltaTable)
+    timestamp = datetime.now(timezone.utc).isoformat()
+
+    snapshot = table.snapshot(timestamp)
+
+    assert snapshot.version == table.version()
+    assert table.snapshot(snapshot.version) is snapshot
+    assert table.snapshot(timestamp) is snapshot
+
+
+def test_deltatable_snapshot_future_timestamp_resolved_again(
+    sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    table_config = config.ConfigTable.model_validate(sample_config["tables"][0])
+    table = tables.load_table(table_config)
+    assert isinstance(table, tables.DeltaTable)
+    timestamp = (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
+    first = table.snapshot(timestamp)
+
+    deltalake.write_deltalake(
+        delta_table.table_uri, delta_table.to_pyarrow_table(), mode="append"
+    )
+    table.refresh()
+    second = table.snapshot(timestamp)
+
+    assert second.version == first.version + 1
+    assert table.snapshot(first.version) is first
+
+
+def test_deltatable_snapshot_lru_eviction(
+    sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    for _ in range(3):
+        deltalake.write_deltalake(
+            delta_table.table_uri, delta_table.to_pyarrow_table(), mode="append"
+        )
+    table_config = config.ConfigTable.model_validate(sample_config["tables"][0])
+    table = tables.load_table(table_config)
+    assert isinstance(table, tables.DeltaTable)
+
+    with mock.patch.object(tables, "DEFAULT_SNAPSHOTS_CACHE_SIZE", 2):
+        snapshots = [table.snapshot(version) for version in (0, 1, 2)]
+        assert table.snapshot(2) is snapshots[2]
+        assert table.snapshot(1) is snapshots[1]
+        assert table.snapshot(0) is not snapshots[0]
+
+
+def test_deltatable_snapshot_concurrent_versions(
+    sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    data = delta_table.to_pyarrow_table()
+    for _ in range(3):
+        deltalake.write_deltalake(delta_table.table_uri, data, mode="append")
+    table_config = config.ConfigTable.model_validate(sample_config["tables"][0])
+    table = tables.load_table(table_config)
+    versions = [0, 1, 2, 3, 4] * 4
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        counts = list(
+            executor.map(
+                lambda version: table.dataset(version=version).count_rows(), versions
+            )
+        )
+
+    assert counts == [version * data.num_rows for version in versions]
+    assert table.dataset().count_rows() == 4 * data.num_rows
+
+
+def test_deltatable_history_paginated(
+    sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    for _ in range(3):
+        deltalake.write_deltalake(
+            delta_table.table_uri, delta_table.to_pyarrow_table(), mode="append"
+        )
+    table_config = config.ConfigTable.model_validate(sample_config["tables"][0])
+    table = tables.load_table(table_config)
+
+    pages = [table.history(limit=2)]
+    while (before_version := pages[-1].next_before_version) is not None:
+        pages.append(table.history(limit=2, before_version=before_version))
+
+    assert [[rev.version for rev in page.revisions] for page in pages] == [
+        [4, 3],
+        [2, 1],
+        [0],
+    ]
+    assert [rev for page in pages for rev in page.revisions] == (
+        table.history().revisions
+    )
+    assert table.history(before_version=2).revisions == (table.history().revisions[-2:])
+    assert table.history(limit=5).next_before_version is None
+
+
+def test_deltatable_history_reads_page_commits_only(
+    sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    for _ in range(5):
+        deltalake.write_deltalake(
+            delta_table.table_uri, delta_table.to_pyarrow_table(), mode="append"
+        )
+    table_config = config.ConfigTable.model_validate(sample_config["tables"][0])
+    table = tables.load_table(table_config)
+    assert isinstance(table, tables.DeltaTable)
+
+    with mock.patch.object(
+        table, "_read_commit_info", wraps=table._read_commit_info
+    ) as mock_read:
+        history = table.history(limit=2, before_version=5)
+
+    assert [rev.version for rev in history.revisions] == [4, 3]
+    assert sorted(call.args[0] for call in mock_read.call_args_list) == [3, 4]
+
+
+def test_deltatable_history_cleaned_up_commits(
+    tmp_path: Path, sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    for _ in range(2):
+        deltalake.write_deltalake(
+            delta_table.table_uri, delta_table.to_pyarrow_table(), mode="append"
+        )
+    table_config = config.ConfigTable.model_validate(sample_config["tables"][0])
+    table = tables.load_table(table_config)
+    log_path = tmp_path / "delta_table" / "_delta_log"
+    (log_path / f"{1:020d}.json").unlink()
+
+    history = table.history(limit=3, before_version=3)
+
+    assert [rev.version for rev in history.revisions] == [2]
+    assert history.next_before_version is None
+
+
+def test_deltatable_history_commit_without_info(
+    tmp_path: Path, sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    deltalake.write_deltalake(
+        delta_table.table_uri, delta_table.to_pyarrow_table(), mode="append"
+    )
+    table_config = config.ConfigTable.model_validate(sample_config["tables"][0])
+    table = tables.load_table(table_config)
+    log_path = tmp_path / "delta_table" / "_delta_log"
+    commit_path = log_path / f"{1:020d}.json"
+    commit_path.write_text(
+        "\n".join(
+            line
+            for line in commit_path.read_text().splitlines()
+            if not line.startswith('{"commitInfo"')
+        )
+    )
+
+    history = table.history(limit=1, before_version=2)
+
+    assert history.revisions[0].version == 1
+    assert history.revisions[0].operation == "UNKNOWN"
+    assert history.revisions[0].timestamp.year >= 2025
+
+
+def test_deltatable_history_invalid_limit(
+    sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    table_config = config.ConfigTable.model_validate(sample_config["tables"][0])
+    table = tables.load_table(table_config)
+
+    with pytest.raises(ValueError, match="History limit must be a positive number"):
+        table.history(limit=0)
+
+
+def test_deltatable_version_at(
+    sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    table_config = config.ConfigTable.model_validate(sample_config["tables"][0])
+    table = tables.load_table(table_config)
+    revisions = {rev.version: rev.timestamp for rev in table.history().revisions}
+
+    assert table.version_at(revisions[0]) == 0
+    assert table.version_at(revisions[1]) == 1
+    assert table.version_at(revisions[1].replace(tzinfo=None)) == 1
+    assert table.version_at(datetime.now(timezone.utc)) == 1
+    with pytest.raises(ValueError, match="No table version as of"):
+        table.version_at(revisions[0] - timedelta(seconds=1))
+
+
+def test_deltatable_version_at_indexes_new_commits(
+    sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    table_config = config.ConfigTable.model_validate(sample_config["tables"][0])
+    table = tables.load_table(table_config)
+    assert isinstance(table, tables.DeltaTable)
+    assert table.version_at(datetime.now(timezone.utc)) == 1
+
+    for _ in range(2):
+        deltalake.write_deltalake(
+            delta_table.table_uri, delta_table.to_pyarrow_table(), mode="append"
+        )
+    table.refresh()
+    with mock.patch.object(
+        table._impl, "history", wraps=table._impl.history
+    ) as mock_history:
+        assert table.version_at(datetime.now(timezone.utc)) == 3
+        assert table.version_at(datetime.now(timezone.utc)) == 3
+
+    mock_history.assert_called_once_with(limit=2)
+
+
+def test_deltatable_version_at_clock_skew(
+    sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    table_config = config.ConfigTable.model_validate(sample_config["tables"][0])
+    table = tables.load_table(table_config)
+    assert isinstance(table, tables.DeltaTable)
+    commits = [
+        {"version": 2, "timestamp": 1_000},
+        {"version": 1, "timestamp": 3_000},
+        {"version": 0, "timestamp": 2_000},
+    ]
+
+    with (
+        mock.patch.object(table._impl, "version", return_value=2),
+        mock.patch.object(table._impl, "history", return_value=commits),
+    ):
+        versions = [
+            table.version_at(datetime.fromtimestamp(seconds, tz=timezone.utc))
+            for seconds in (2, 3, 4)
+        ]
+
+    assert versions == [0, 2, 2]
+
+
+def test_deltatable_file_statistics(
+    sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    table_config = config.ConfigTable.model_validate(sample_config["tables"][0])
+    table = tables.load_table(table_config)
+
+    file_stats = table.file_statistics()
+
+    assert pc.sum(file_stats.column("num_records")).as_py() == 24 * 7
+    assert file_stats.schema.field("null_count").type.get_field_index("city") >= 0
+    assert table.file_statistics(version=0).num_rows == 0
+
+
+@pytest.mark.parametrize(
+    ("zorder_columns", "operation"), [(None, "compact"), (["city", "time"], "z-order")]
+)
+def test_deltatable_optimize(
+    sample_config: dict[str, Any],
+    delta_table: deltalake.DeltaTable,
+    zorder_columns: list[str] | None,
+    operation: str,
+) -> None:
+    data = delta_table.to_pyarrow_table()
+    for _ in range(2):
+        deltalake.write_deltalake(delta_table.table_uri, data, mode="append")
+    table_config = config.ConfigTable.model_validate(sample_config["tables"][0])
+    table = tables.load_table(table_config)
+
+    result = table.optimize(zorder_columns)
+
+    assert result.operation == operation
+    assert result.files_removed == 3
+    assert result.files_added == 1
+    assert result.bytes_removed is not None and result.bytes_removed > 0
+    assert result.bytes_added is not None and result.bytes_added > 0
+    assert result.duration_ms > 0
+    assert table.file_statistics().num_rows == 1
+    assert table.dataset().count_rows() == 3 * data.num_rows
+
+
+def test_deltatable_vacuum(
+    tmp_path: Path, sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    deltalake.write_deltalake(
+        delta_table.table_uri, delta_table.to_pyarrow_table(), mode="overwrite"
+    )
+    table_config = config.ConfigTable.model_validate(sample_config["tables"][0])
+    table = tables.load_table(table_config)
+
+    with pytest.raises(deltalake.exceptions.DeltaError, match="retention"):
+        table.vacuum(retention_hours=0)
+
+    dry_run = table.vacuum(retention_hours=0, enforce_retention=False)
+    assert dry_run.dry_run
+    assert dry_run.files_removed == 1
+    assert table.vacuum().files_removed == 0
+
+    table_path = tmp_path / "delta_table"
+    assert len(list(table_path.glob("*.parquet"))) == 2
+    result = table.vacuum(retention_hours=0, dry_run=False, enforce_retention=False)
+    assert not result.dry_run
+    assert result.files_removed == 1
+    assert result.bytes_removed is None
+    assert len(list(table_path.glob("*.parquet"))) == 1
+    assert table.dataset().count_rows() == 24 * 7
+
+
+@pytest.mark.parametrize(("min_small_files", "expected_files"), [(3, 1), (4, 3)])
+def test_deltatable_import_data_auto_compaction(
+    sample_config: dict[str, Any],
+    delta_table: deltalake.DeltaTable,
+    min_small_files: int,
+    expected_files: int,
+) -> None:
+    table_config = config.ConfigTable.model_validate(
+        sample_config["tables"][0]
+        | {"auto_compaction": {"min_small_files": min_small_files}}
+    )
+    data = delta_table.to_pyarrow_table()
+
+    compactions = [
+        tables.DeltaTable.import_data(table_config, data, tables.ImportModeEnum.append)
+        for _ in range(2)
+    ]
+
+    updated_table = deltalake.DeltaTable(delta_table.table_uri)
+    assert compactions[0] is None
+    assert (compactions[1] is not None) == (expected_files == 1)
+    assert len(updated_table.file_uris()) == expected_files
+    assert updated_table.to_pyarrow_table().num_rows == 3 * data.num_rows
+
+
+def test_deltatable_import_data_auto_compaction_large_files(
+    sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    table_config = config.ConfigTable.model_validate(
+        sample_config["tables"][0]
+        | {"auto_compaction": {"min_small_files": 1, "small_file_max_bytes": 1}}
+    )
+
+    tables.DeltaTable.import_data(
+        table_config, delta_table.to_pyarrow_table(), tables.ImportModeEnum.append
+    )
+
+    assert len(deltalake.DeltaTable(delta_table.table_uri).file_uris()) == 2
+
+
+def test_deltatable_import_data_auto_compaction_partitions(tmp_path: Path) -> None:
+    table_config = config.ConfigTable.model_validate(
+        {
+            "name": "partitioned",
+            "uri": str(tmp_path / "partitioned"),
+            "format": "delta",
+            "auto_compaction": {"min_small_files": 2},
+        }
+    )
+    deltalake.write_deltalake(
+        table_config.uri,
+        pa.table({"part": [1, 2], "num": [1, 2]}),
+        partition_by=["part"],
+    )
+
+    # one small file in each partition, none of them can be merged
+    first = tables.DeltaTable.import_data(
+        table_config,
+        pa.table({"part": [3], "num": [3]}),
+        tables.ImportModeEnum.append,
+    )
+    second = tables.DeltaTable.import_data(
+        table_config,
+        pa.table({"part": [1], "num": [4]}),
+        tables.ImportModeEnum.append,
+    )
+
+    assert first is None
+    assert second is not None
+    assert second.files_removed == 2
+    assert second.files_added == 1
+    assert len(deltalake.DeltaTable(table_config.uri).file_uris()) == 3
+
+
+def test_deltatable_import_data_auto_compaction_error(
+    caplog: pytest.LogCaptureFixture,
+    sample_config: dict[str, Any],
+    delta_table: deltalake.DeltaTable,
+) -> None:
+    table_config = config.ConfigTable.model_validate(
+        sample_config["tables"][0] | {"auto_compaction": {"min_small_files": 1}}
+    )
+    data = delta_table.to_pyarrow_table()
+
+    with mock.patch.object(
+        tables.DeltaTable,
+        "_auto_compact",
+        side_effect=deltalake.exceptions.CommitFailedError("conflict"),
+    ):
+        compaction = tables.DeltaTable.import_data(
+            table_config, data, tables.ImportModeEnum.append
+        )
+
+    assert compaction is None
+    assert "Auto-compaction of table" in caplog.text
+    updated_table = deltalake.DeltaTable(delta_table.table_uri)
+    assert updated_table.to_pyarrow_table().num_rows == 2 * data.num_rows
+
+
+def test_import_file_to_table_auto_compaction(
+    sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    table_config = config.ConfigTable.model_validate(
+        sample_config["tables"][0] | {"auto_compaction": {"min_small_files": 2}}
+    )
+    csv_content = b"time,city,temperature\n2025-01-02T00:00:00+00:00,Lyon,10.5\n"
+
+    result = tables.import_file_to_table(
+        table_config, io.BytesIO(csv_content), tables.ImportModeEnum.append
+    )
+
+    assert result.rows == 1
+    assert result.compaction is not None
+    assert result.compaction.operation == "compact"
+    assert result.compaction.files_removed == 2
+
+
 @pytest.mark.parametrize(
     ("sql", "names"),
     [
@@ -236,12 +1138,189 @@ def test_extract_query_parameter_names_invalid_sql(sql: str) -> None:
 
 
 @pytest.mark.parametrize(
-    ["table_name", "limit", "cols", "sort_asc", "sort_desc", "expected_query"],
+    ("sql", "names"),
     [
-        ("test_table", None, None, None, None, 'SELECT * FROM "test_table" LIMIT 10'),
-        ("test_table", 5, None, None, None, 'SELECT * FROM "test_table" LIMIT 5'),
-        (
-            "test_table",
+        ("select 1", set()),
+        ("select * from t1", {"t1"}),
+        ('select * from "T1" join t2 on true', {"t1", "t2"}),
+        ("with c as (select * from t1) select * from c", {"c", "t1"}),
+        ("select * from main.t1 where col in (select col from t2)", {"t1", "t2"}),
+        ("summarize t1", {"t1"}),
+        ("describe t1; select * from t2", {"t1", "t2"}),
+        ("select * from read_parquet('file.parquet')", set()),
+    ],
+)
+def test_extract_table_names(sql: str, names: set[str]) -> None:
+    assert tables.extract_table_names(sql) == names
+
+
+@pytest.mark.parametrize("sql", ["select * from", 'select * from "t'])
+def test_extract_table_names_invalid_sql(sql: str) -> None:
+    with pytest.raises(ValueError):
+        tables.extract_table_names(sql)
+
+
+@pytest.mark.parametrize(
+    ("sql", "names"),
+    [
+        ("select * from delta_table", {"delta_table"}),
+        ('select * from "DELTA_TABLE"', {"delta_table"}),
+        (
+            'select * from "123_delta_table", delta_table',
+            {"123_delta_table", "delta_table"},
+        ),
+        ("select * from nonexistent_table", set()),
+        ("select 1", set()),
+        ("select * from", {"123_delta_table", "delta_table"}),
+    ],
+)
+def test_load_query_datasets(
+    sample_config: dict[str, Any], sql: str, names: set[str]
+) -> None:
+    table_configs = [
+        config.ConfigTable.model_validate(table_config)
+        for table_config in sample_config["tables"]
+    ]
+
+    datasets = tables.load_query_datasets(table_configs, sql)
+
+    assert set(datasets.keys()) == names
+
+
+@pytest.mark.parametrize(
+    ("as_of", "expected"),
+    [
+        ("2025-01-01", datetime(2025, 1, 1)),
+        ("2025-01-01T09:30:00", datetime(2025, 1, 1, 9, 30)),
+        (
+            "2025-01-01T09:30:00+02:00",
+            datetime(2025, 1, 1, 7, 30, tzinfo=timezone.utc),
+        ),
+    ],
+)
+def test_parse_as_of(as_of: str, expected: datetime) -> None:
+    assert tables.parse_as_of(as_of) == expected
+
+
+def test_parse_as_of_invalid() -> None:
+    with pytest.raises(ValueError, match="Invalid timestamp 'yesterday'"):
+        tables.parse_as_of("yesterday")
+
+
+def test_resolve_table_version(
+    sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    table_config = config.ConfigTable.model_validate(sample_config["tables"][0])
+    table = tables.load_table(table_config)
+    as_of = table.history().revisions[-1].timestamp.isoformat()
+
+    assert tables.resolve_table_version(table) is None
+    assert tables.resolve_table_version(table, version=1) == 1
+    assert tables.resolve_table_version(table, as_of=as_of) == 0
+    assert tables.resolve_table_version(table, as_of="") is None
+    with pytest.raises(ValueError, match="both a version and a timestamp"):
+        tables.resolve_table_version(table, version=1, as_of=as_of)
+
+
+@pytest.mark.parametrize(
+    ("sql", "time_travels"),
+    [
+        ("select * from t1", {}),
+        ("select * from t1 at (version => 3)", {"t1@v3": ("t1", 3)}),
+        (
+            "select * from T1 at (timestamp => '2025-01-01 09:00') join t2 on true",
+            {"t1@2025-01-01 09:00:00": ("t1", datetime(2025, 1, 1, 9))},
+        ),
+        (
+            "select * from t1 at (timestamp => timestamp '2025-01-01')",
+            {"t1@2025-01-01 00:00:00": ("t1", datetime(2025, 1, 1))},
+        ),
+        ("select * from", {}),
+    ],
+)
+def test_extract_time_travels(
+    sql: str, time_travels: dict[str, tuple[str, int | datetime]]
+) -> None:
+    assert tables.extract_time_travels(sql) == time_travels
+
+
+@pytest.mark.parametrize(
+    "sql",
+    [
+        "select * from t1 at (version => 'latest')",
+        "select * from t1 at (version => 1.5)",
+        "select * from t1 at (timestamp => 'yesterday')",
+        "select * from t1 at (timestamp => now())",
+    ],
+)
+def test_extract_time_travels_invalid(sql: str) -> None:
+    with pytest.raises(ValueError, match="Error: Invalid"):
+        tables.extract_time_travels(sql)
+
+
+def test_rewrite_time_travels() -> None:
+    sql = (
+        "select t1.col, t2.col from t1 at (version => 3) "
+        "join t1 at (version => 0) as t2 on t1.id = t2.id"
+    )
+
+    assert tables.rewrite_time_travels(sql) == (
+        'SELECT t1.col, t2.col FROM "t1@v3" AS t1 JOIN "t1@v0" AS t2 ON t1.id = t2.id'
+    )
+
+
+def test_load_query_datasets_time_travel(
+    sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    deltalake.write_deltalake(
+        delta_table.table_uri, delta_table.to_pyarrow_table(), mode="append"
+    )
+    table_configs = [
+        config.ConfigTable.model_validate(table_config)
+        for table_config in sample_config["tables"]
+    ]
+    table = tables.load_table(table_configs[0])
+    as_of = {rev.version: rev.timestamp for rev in table.history().revisions}[1]
+    sql = (
+        "select (select count(*) from delta_table) as latest, "
+        "(select count(*) from delta_table at (version => 0)) as version, "
+        f"(select count(*) from delta_table at (timestamp => '{as_of}')) as as_of"
+    )
+
+    datasets = tables.load_query_datasets(table_configs, sql)
+    results = tables.execute_query(datasets, sql)
+
+    assert set(datasets.keys()) == {
+        "delta_table",
+        "delta_table@v0",
+        f"delta_table@{as_of}",
+    }
+    assert results.to_pylist() == [
+        {"latest": 2 * 24 * 7, "version": 0, "as_of": 24 * 7}
+    ]
+
+
+def test_load_query_datasets_time_travel_unknown_version(
+    sample_config: dict[str, Any],
+) -> None:
+    table_configs = [
+        config.ConfigTable.model_validate(table_config)
+        for table_config in sample_config["tables"]
+    ]
+
+    with pytest.raises(ValueError, match="Error:"):
+        tables.load_query_datasets(
+            table_configs, "select * from delta_table at (version => 42)"
+        )
+
+
+@pytest.mark.parametrize(
+    ["table_name", "limit", "cols", "sort_asc", "sort_desc", "expected_query"],
+    [
+        ("test_table", None, None, None, None, 'SELECT * FROM "test_table" LIMIT 10'),
+        ("test_table", 5, None, None, None, 'SELECT * FROM "test_table" LIMIT 5'),
+        (
+            "test_table",
             5,
             ["col1", "col2"],
             "col1",
@@ -279,6 +1358,181 @@ def test_generate_table_query_success(
     assert query == expected_query
 
 
+def test_generate_table_query_where() -> None:
+    query = tables.generate_table_query(
+        "test_table", cols=["col1"], where='"col1" > 1 AND "col2" = \'a\''
+    )
+    assert query == (
+        'SELECT "col1" FROM "test_table" WHERE "col1" > 1 AND "col2" = \'a\' LIMIT 10'
+    )
+
+
+FILTER_FIELDS: list["pa.Field[Any]"] = [
+    pa.field("id", pa.int64()),
+    pa.field("day", pa.string()),
+    pa.field("value", pa.float64()),
+    pa.field("time", pa.timestamp("us")),
+    pa.field("time_tz", pa.timestamp("us", tz="Europe/Paris")),
+]
+FILTER_SCHEMA = pa.schema(FILTER_FIELDS)
+
+
+@pytest.mark.parametrize(
+    ("where", "partitions", "expected_sql"),
+    [
+        ("id > 1", None, '"id" > 1'),
+        (
+            "id > 1 or value < 2",
+            ["day=a"],
+            '("id" > 1 OR "value" < 2) AND "day" = \'a\'',
+        ),
+        (None, ["day=a=b", "day=c"], "\"day\" = 'a=b' AND \"day\" = 'c'"),
+        (None, None, None),
+    ],
+)
+def test_parse_table_filter(
+    where: str | None, partitions: list[str] | None, expected_sql: str | None
+) -> None:
+    condition = tables.parse_table_filter(FILTER_SCHEMA, where, partitions, ["day"])
+
+    assert (
+        condition.sql(dialect="duckdb", identify=True) if condition else None
+    ) == expected_sql
+
+
+@pytest.mark.parametrize(
+    ("where", "partitions", "error"),
+    [
+        ("id >", None, "Invalid filter: id >"),
+        ("id in (select 1)", None, "Filters cannot contain subqueries"),
+        ("unknown > 1 and other = 2", None, "Unknown filter columns: other, unknown"),
+        (None, ["day"], "Invalid partition filter 'day', expected key=value"),
+        (None, ["id=1"], "'id' is not a partition column"),
+    ],
+)
+def test_parse_table_filter_invalid(
+    where: str | None, partitions: list[str] | None, error: str
+) -> None:
+    with pytest.raises(ValueError, match=re.escape(error)):
+        tables.parse_table_filter(FILTER_SCHEMA, where, partitions, ["day"])
+
+
+@pytest.mark.parametrize(
+    ("where", "expected_expression"),
+    [
+        ("id = 1", "(id == 1)"),
+        ("1 < id", "(id > 1)"),
+        ("id >= -1 and (value <= 2.5)", "((id >= -1) and (value <= 2.5))"),
+        ("id != 1 or day = 'a'", '((id != 1) or (day == "a"))'),
+        ("not id is null", "invert(is_null(id, {nan_is_null=false}))"),
+        (
+            "day in ('a', 'b')",
+            'is_in(day, {value_set=string:[\n  "a",\n  "b"\n], null_matching_behavior=MATCH})',
+        ),
+        ("value between 1 and 2", "((value >= 1) and (value <= 2))"),
+        ("time >= timestamp '2025-01-01'", "(time >= 2025-01-01 00:00:00.000000)"),
+        (
+            "time_tz >= '2025-01-01 00:00:00+01:00'",
+            "(time_tz >= 2024-12-31 23:00:00.000000Z)",
+        ),
+        ("time_tz >= '2025-01-01 00:00:00'", None),
+        ("time_tz >= timestamptz '2025-01-01'", None),
+        ("id < 2 and day like 'a%'", "(id < 2)"),
+        ("id < 2.5", None),
+        ("id < 2 or day like 'a%'", None),
+        ("not (id < 2 and day like 'a%')", None),
+        ("id = value", None),
+        ("day = 10", None),
+        ("id = '1'", None),
+        ("day = cast(10 as varchar)", '(day == "10")'),
+        ("time >= date '2025-01-01'", None),
+        ("time >= time '10:00:00'", None),
+    ],
+)
+def test_filter_expression(where: str, expected_expression: str | None) -> None:
+    condition = tables.parse_table_filter(FILTER_SCHEMA, where)
+    assert condition is not None
+
+    expression = tables.filter_expression(condition, FILTER_SCHEMA)
+
+    assert (str(expression) if expression is not None else None) == expected_expression
+
+
+def test_filter_table_dataset(tmp_path: Path) -> None:
+    data = pa.table(
+        {
+            "id": list(range(100)),
+            "day": ["2025-01-01"] * 50 + ["2025-01-02"] * 50,
+        }
+    )
+    deltalake.write_deltalake(
+        tmp_path / "partitioned",
+        data,
+        partition_by=["day"],
+        writer_properties=deltalake.WriterProperties(max_row_group_size=10),
+    )
+    table = tables.load_table(
+        config.ConfigTable.model_validate(
+            {"name": "t", "uri": str(tmp_path / "partitioned"), "format": "delta"}
+        )
+    )
+
+    dataset, where_sql, pruning = tables.filter_table_dataset(
+        table, table.dataset(), "id >= 30", ["day=2025-01-01"]
+    )
+
+    assert where_sql == '"id" >= 30 AND "day" = \'2025-01-01\''
+    assert pruning == tables.DatasetPruning(
+        total_files=2, pruned_files=1, pruned_row_groups=3
+    )
+    assert dataset.to_table().num_rows == 20
+    results = tables.execute_query(
+        {"t": dataset}, f"select count(*) as count from t where {where_sql}"
+    )
+    assert results.column("count").to_pylist() == [20]
+
+
+def test_filter_table_dataset_literal_type_mismatch(tmp_path: Path) -> None:
+    for num, code in enumerate(["010", "020"], start=1):
+        deltalake.write_deltalake(
+            tmp_path / "codes", pa.table({"s": [code], "n": [num]}), mode="append"
+        )
+    table = tables.load_table(
+        config.ConfigTable.model_validate(
+            {"name": "t", "uri": str(tmp_path / "codes"), "format": "delta"}
+        )
+    )
+
+    dataset, where_sql, pruning = tables.filter_table_dataset(
+        table, table.dataset(), "s = 10 and n = 1"
+    )
+
+    assert pruning is not None
+    assert pruning.pruned_files == 1
+    results = tables.execute_query({"t": dataset}, f"select s from t where {where_sql}")
+    assert results.to_pylist() == [{"s": "010"}]
+
+
+def test_filter_table_dataset_without_pushdown(
+    sample_config: dict[str, Any],
+) -> None:
+    table = tables.load_table(
+        config.ConfigTable.model_validate(sample_config["tables"][0])
+    )
+    table_dataset = table.dataset()
+
+    assert tables.filter_table_dataset(table, table_dataset) == (
+        table_dataset,
+        None,
+        None,
+    )
+    assert tables.filter_table_dataset(table, table_dataset, "city like 'G%'") == (
+        table_dataset,
+        "\"city\" LIKE 'G%'",
+        None,
+    )
+
+
 @pytest.mark.parametrize("table_name", ["test_table", "123_table"])
 def test_generate_table_statistics_query_success(table_name: str) -> None:
     expected_query = f'SELECT "column_name", "count", "avg", "std", "min", "max" FROM (SUMMARIZE "{table_name}")'
@@ -286,6 +1540,699 @@ def test_generate_table_statistics_query_success(table_name: str) -> None:
     assert query == expected_query
 
 
+def test_generate_columns_statistics_query() -> None:
+    query = tables.generate_columns_statistics_query("test_table", ["col1", "Col 2"])
+
+    assert query == (
+        'SELECT COUNT(*) AS "count", '
+        'COUNT("col1") AS "count_0", CAST(MIN("col1") AS TEXT) AS "min_0", '
+        'CAST(MAX("col1") AS TEXT) AS "max_0", '
+        'COUNT("Col 2") AS "count_1", CAST(MIN("Col 2") AS TEXT) AS "min_1", '
+        'CAST(MAX("Col 2") AS TEXT) AS "max_1" '
+        'FROM "test_table"'
+    )
+
+
+def test_aggregate_file_statistics() -> None:
+    fields: list[pa.Field[Any]] = [
+        pa.field("num", pa.int64()),
+        pa.field("name", pa.string()),
+        pa.field("tags", pa.list_(pa.string())),
+    ]
+    schema = pa.schema(fields)
+    file_stats = pa.table(
+        {
+            "num_records": [3, 2],
+            "null_count": [
+                {"num": 1, "name": 0, "tags": None},
+                {"num": 0, "name": 2, "tags": None},
+            ],
+            "min": [{"num": 5, "name": "b"}, {"num": 1, "name": None}],
+            "max": [{"num": 8, "name": "c"}, {"num": 2, "name": None}],
+        }
+    )
+
+    statistics = tables.aggregate_file_statistics(schema, file_stats)
+
+    assert statistics.schema == tables.STATISTICS_SCHEMA
+    assert statistics.to_pylist() == [
+        {
+            "column_name": "num",
+            "count": 5,
+            "null_count": 1,
+            "min": "1",
+            "max": "8",
+            "source": "metadata",
+        },
+        {
+            "column_name": "name",
+            "count": 5,
+            "null_count": 2,
+            "min": "b",
+            "max": "c",
+            "source": "metadata",
+        },
+        {
+            "column_name": "tags",
+            "count": None,
+            "null_count": None,
+            "min": None,
+            "max": None,
+            "source": "missing",
+        },
+    ]
+
+
+def test_aggregate_file_statistics_partition_columns() -> None:
+    fields: list[pa.Field[Any]] = [
+        pa.field("day", pa.date32()),
+        pa.field("num", pa.int64()),
+    ]
+    schema = pa.schema(fields)
+    file_stats = pa.table(
+        {
+            "num_records": [3, 2, 4],
+            "null_count": [{"num": 0}, {"num": 1}, {"num": 0}],
+            "min": [{"num": 5}, {"num": 1}, {"num": 2}],
+            "max": [{"num": 8}, {"num": 2}, {"num": 3}],
+            "partition": pa.array(
+                [
+                    {"day": date(2024, 1, 2)},
+                    {"day": None},
+                    {"day": date(2024, 1, 1)},
+                ],
+                pa.struct([pa.field("day", pa.date32())]),
+            ),
+        }
+    )
+
+    statistics = tables.aggregate_file_statistics(schema, file_stats)
+
+    assert statistics.to_pylist()[0] == {
+        "column_name": "day",
+        "count": 9,
+        "null_count": 2,
+        "min": "2024-01-01",
+        "max": "2024-01-02",
+        "source": "metadata",
+    }
+
+
+def test_aggregate_file_statistics_without_stats() -> None:
+    schema = pa.schema([("num", pa.int64())])
+    file_stats = pa.table({"num_records": pa.array([None, 2], pa.int64())})
+
+    statistics = tables.aggregate_file_statistics(schema, file_stats)
+
+    assert statistics.column("source").to_pylist() == ["missing"]
+
+
+def test_aggregate_file_statistics_empty_table() -> None:
+    schema = pa.schema([("num", pa.int64())])
+    file_stats = pa.table({"num_records": pa.array([], pa.int64())})
+
+    statistics = tables.aggregate_file_statistics(schema, file_stats)
+
+    assert statistics.to_pylist() == [
+        {
+            "column_name": "num",
+            "count": 0,
+            "null_count": 0,
+            "min": None,
+            "max": None,
+            "source": "metadata",
+        }
+    ]
+
+
+@pytest.fixture()
+def delta_table_list_column(tmp_path: Path) -> config.ConfigTable:
+    table_uri = str(tmp_path / "list_table")
+    deltalake.write_deltalake(
+        table_uri,
+        pa.table({"num": [1, None, 3], "tags": [["a"], ["b", "c"], None]}),
+    )
+    return config.ConfigTable.model_validate(
+        {"name": "list_table", "uri": table_uri, "format": "delta"}
+    )
+
+
+def test_compute_table_statistics_metadata_partition_columns(
+    tmp_path: Path,
+) -> None:
+    table_uri = str(tmp_path / "partitioned_table")
+    deltalake.write_deltalake(
+        table_uri,
+        pa.table({"part": [1, 2, None], "num": [1.0, 2.0, 3.0]}),
+        partition_by=["part"],
+    )
+    table = tables.load_table(
+        config.ConfigTable.model_validate(
+            {"name": "partitioned_table", "uri": table_uri, "format": "delta"}
+        )
+    )
+
+    with mock.patch.object(tables, "scan_columns_statistics") as scan:
+        statistics = tables.compute_table_statistics(
+            "partitioned_table",
+            table,
+            mode=tables.StatisticsModeEnum.metadata,
+            scan_missing=True,
+        )
+
+    scan.assert_not_called()
+    assert statistics.to_pylist()[0] == {
+        "column_name": "part",
+        "count": 3,
+        "null_count": 1,
+        "min": "1",
+        "max": "2",
+        "source": "metadata",
+    }
+
+
+def test_compute_table_statistics_exact(
+    delta_table_list_column: config.ConfigTable,
+) -> None:
+    table = tables.load_table(delta_table_list_column)
+
+    statistics = tables.compute_table_statistics("list_table", table)
+
+    assert statistics.column_names == [
+        "column_name",
+        "count",
+        "avg",
+        "std",
+        "min",
+        "max",
+    ]
+
+
+def test_compute_table_statistics_metadata(
+    delta_table_list_column: config.ConfigTable,
+) -> None:
+    table = tables.load_table(delta_table_list_column)
+
+    statistics = tables.compute_table_statistics(
+        "list_table", table, mode=tables.StatisticsModeEnum.metadata
+    )
+
+    assert statistics.to_pylist() == [
+        {
+            "column_name": "num",
+            "count": 3,
+            "null_count": 1,
+            "min": "1",
+            "max": "3",
+            "source": "metadata",
+        },
+        {
+            "column_name": "tags",
+            "count": None,
+            "null_count": None,
+            "min": None,
+            "max": None,
+            "source": "missing",
+        },
+    ]
+
+
+def test_compute_table_statistics_metadata_scan_missing(
+    delta_table_list_column: config.ConfigTable,
+) -> None:
+    table = tables.load_table(delta_table_list_column)
+
+    statistics = tables.compute_table_statistics(
+        "list_table",
+        table,
+        mode=tables.StatisticsModeEnum.metadata,
+        scan_missing=True,
+    )
+
+    assert statistics.to_pylist()[1] == {
+        "column_name": "tags",
+        "count": 3,
+        "null_count": 1,
+        "min": "[a]",
+        "max": "[b, c]",
+        "source": "scan",
+    }
+
+
+def test_statistics_cache_key() -> None:
+    key = tables.StatisticsCache.key("table-id", 3, tables.StatisticsModeEnum.exact)
+    scan_key = tables.StatisticsCache.key(
+        "table-id", 3, tables.StatisticsModeEnum.metadata, scan_missing=True
+    )
+
+    assert key == "table-id-v3-exact"
+    assert scan_key == "table-id-v3-metadata-scan"
+
+
+def test_statistics_cache_get_put(tmp_path: Path) -> None:
+    cache = tables.StatisticsCache(tmp_path / "statistics", max_bytes=1024 * 1024)
+    statistics = pa.table({"column_name": ["a"], "count": [1]})
+
+    assert cache.get("key") is None
+    assert cache.put("key", statistics)
+    assert cache.get("key") == statistics
+    assert [path.name for path in (tmp_path / "statistics").iterdir()] == ["key.arrow"]
+
+
+def test_statistics_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    statistics = pa.table({"column_name": ["a"] * 100})
+    cache = tables.StatisticsCache(tmp_path, max_bytes=1024 * 1024)
+    cache.put("probe", statistics)
+    entry_size = (tmp_path / "probe.arrow").stat().st_size
+    (tmp_path / "probe.arrow").unlink()
+    cache.max_bytes = 2 * entry_size
+
+    cache.put("key1", statistics)
+    cache.put("key2", statistics)
+    os.utime(tmp_path / "key1.arrow", (0, 0))
+    os.utime(tmp_path / "key2.arrow", (1, 1))
+    cache.get("key1")
+    cache.put("key3", statistics)
+
+    assert cache.get("key1") is not None
+    assert cache.get("key2") is None
+    assert cache.get("key3") is not None
+
+
+def test_statistics_cache_evicts_profiles(tmp_path: Path) -> None:
+    statistics = pa.table({"column_name": ["a"] * 100})
+    cache = tables.StatisticsCache(tmp_path, max_bytes=1024 * 1024)
+    cache.put("key1", statistics)
+    entry_size = (tmp_path / "key1.arrow").stat().st_size
+    profile_path = tmp_path / "table-id.profile.json"
+    profile_path.write_bytes(b"{}" * entry_size)
+    os.utime(profile_path, (0, 0))
+    cache.max_bytes = 2 * entry_size
+
+    cache.put("key2", statistics)
+
+    assert not profile_path.exists()
+    assert cache.get("key1") is not None
+    assert cache.get("key2") is not None
+
+
+def test_statistics_cache_skips_entries_above_budget(tmp_path: Path) -> None:
+    cache = tables.StatisticsCache(tmp_path, max_bytes=16)
+
+    assert not cache.put("key", pa.table({"column_name": ["a"]}))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_statistics_cache_zero_budget_disables_caching(tmp_path: Path) -> None:
+    cache = tables.StatisticsCache(tmp_path / "statistics", max_bytes=0)
+
+    assert not cache.put("key", pa.table({"column_name": ["a"]}))
+    assert not (tmp_path / "statistics").exists()
+
+
+def test_statistics_cache_corrupted_entry(tmp_path: Path) -> None:
+    cache = tables.StatisticsCache(tmp_path, max_bytes=1024 * 1024)
+    (tmp_path / "key.arrow").write_bytes(b"corrupted")
+
+    assert cache.get("key") is None
+
+
+def test_compute_table_statistics_cached(
+    tmp_path: Path, delta_table_list_column: config.ConfigTable
+) -> None:
+    table = tables.load_table(delta_table_list_column)
+    cache = tables.StatisticsCache(tmp_path / "statistics", max_bytes=1024 * 1024)
+
+    statistics = tables.compute_table_statistics("list_table", table, cache=cache)
+    with mock.patch("laketower.tables._compute_table_statistics") as mock_compute:
+        cached = tables.compute_table_statistics(
+            "list_table", table, version=table.version(), cache=cache
+        )
+
+    mock_compute.assert_not_called()
+    assert cached == statistics
+    table_id = table.metadata().id
+    assert (tmp_path / "statistics" / f"{table_id}-v0-exact.arrow").exists()
+
+
+def test_compute_table_statistics_cached_per_version(
+    tmp_path: Path, delta_table_list_column: config.ConfigTable
+) -> None:
+    table = tables.load_table(delta_table_list_column)
+    cache = tables.StatisticsCache(tmp_path / "statistics", max_bytes=1024 * 1024)
+
+    first = tables.compute_table_statistics("list_table", table, cache=cache)
+    deltalake.write_deltalake(
+        delta_table_list_column.uri,
+        pa.table({"num": [4], "tags": [["d"]]}),
+        mode="append",
+    )
+    table.refresh()
+    second = tables.compute_table_statistics("list_table", table, cache=cache)
+
+    assert first.column("count").to_pylist()[0] == 3
+    assert second.column("count").to_pylist()[0] == 4
+
+
+@pytest.fixture()
+def row_groups_dataset(tmp_path: Path) -> padataset.Dataset:
+    table = pa.table(
+        {
+            "num": pa.array([None if i % 10 == 0 else i for i in range(10_000)]),
+            "label": pa.array([f"label-{i % 7}" for i in range(10_000)]),
+        }
+    )
+    pq.write_table(table, tmp_path / "data.parquet", row_group_size=100)
+    return padataset.dataset(tmp_path / "data.parquet", format="parquet")
+
+
+def test_sample_dataset_row_groups(row_groups_dataset: padataset.Dataset) -> None:
+    sampled, sample_rows = tables.sample_dataset(
+        row_groups_dataset, 10_000, fraction=0.05, min_rows=0
+    )
+
+    assert sample_rows == 500
+    assert sampled.to_table().num_rows == 500
+    assert len(list(sampled.get_fragments())) == 5
+
+
+def test_sample_dataset_files(tmp_path: Path) -> None:
+    for i in range(40):
+        pq.write_table(pa.table({"num": [i] * 10}), tmp_path / f"part-{i}.parquet")
+    table_dataset = padataset.dataset(tmp_path, format="parquet")
+
+    sampled, sample_rows = tables.sample_dataset(
+        table_dataset, 400, fraction=0.5, min_rows=0
+    )
+
+    assert sample_rows == 200
+    assert isinstance(sampled, padataset.FileSystemDataset)
+    assert len(sampled.files) == 20
+    assert set(sampled.files) < set(table_dataset.files)
+
+
+def test_sample_dataset_deterministic(row_groups_dataset: padataset.Dataset) -> None:
+    first, _ = tables.sample_dataset(row_groups_dataset, 10_000, min_rows=0, seed=1)
+    second, _ = tables.sample_dataset(row_groups_dataset, 10_000, min_rows=0, seed=1)
+
+    assert first.to_table() == second.to_table()
+
+
+def test_sample_dataset_below_min_rows(row_groups_dataset: padataset.Dataset) -> None:
+    sampled, sample_rows = tables.sample_dataset(row_groups_dataset, 10_000)
+
+    assert sampled is row_groups_dataset
+    assert sample_rows == 10_000
+
+
+def test_generate_approx_statistics_query() -> None:
+    fields: list[pa.Field[Any]] = [
+        pa.field("num", pa.int64()),
+        pa.field("tags", pa.list_(pa.string())),
+    ]
+
+    sql_query = tables.generate_approx_statistics_query("test_table", pa.schema(fields))
+
+    assert 'APPROX_COUNT_DISTINCT("num") AS "distinct_0"' in sql_query
+    assert 'STDDEV_SAMP("num") AS "std_0"' in sql_query
+    assert 'CAST(APPROX_QUANTILE("num", 0.5) AS TEXT) AS "p50_0"' in sql_query
+    assert 'COUNT("tags") AS "count_1"' in sql_query
+    assert '"distinct_1"' not in sql_query
+
+
+def test_approx_columns_statistics(row_groups_dataset: padataset.Dataset) -> None:
+    statistics = tables.approx_columns_statistics(
+        "test_table", row_groups_dataset, 1_000_000, fraction=0.01
+    )
+
+    num, label = statistics.to_pylist()
+    assert num["count"] == 1_000_000
+    assert num["null_count"] == 100_000
+    assert num["avg"] == pytest.approx(5_000, rel=0.05)
+    assert num["avg_ci95"] == pytest.approx(56.6, rel=0.05)
+    assert num["p50"] is not None
+    assert label["distinct_count"] == pytest.approx(7, abs=1)
+    assert label["avg"] is None
+    assert tables.statistics_sample(statistics) == {
+        "sample_rows": 10_000,
+        "total_rows": 1_000_000,
+        "sampled_files": 1,
+        "total_files": 1,
+    }
+
+
+def test_compute_table_statistics_approx(
+    delta_table_list_column: config.ConfigTable,
+) -> None:
+    table = tables.load_table(delta_table_list_column)
+
+    statistics = tables.compute_table_statistics(
+        "list_table", table, mode=tables.StatisticsModeEnum.approx
+    )
+
+    assert statistics.to_pylist()[0] == {
+        "column_name": "num",
+        "count": 3,
+        "null_count": 1,
+        "distinct_count": 2,
+        "avg": 2.0,
+        "avg_ci95": 0.0,
+        "std": pytest.approx(1.4142135),
+        "min": "1",
+        "p25": "1",
+        "p50": "2",
+        "p75": "3",
+        "max": "3",
+    }
+    assert statistics.to_pylist()[1]["count"] == 3
+    assert tables.statistics_sample(statistics) == {
+        "sample_rows": 3,
+        "total_rows": 3,
+        "sampled_files": 1,
+        "total_files": 1,
+    }
+
+
+def test_statistics_sample_exact_statistics() -> None:
+    assert tables.statistics_sample(pa.table({"column_name": ["num"]})) is None
+
+
+def test_column_profile_update() -> None:
+    values = pa.array([1.5, None, -3.0, 0.0, 1.5])
+    profile = tables.ColumnProfile()
+
+    profile.update(values, pa.array(range(len(values)), pa.uint64()))
+
+    assert profile.count == 4
+    assert profile.null_count == 1
+    assert profile.mean() == 0.0
+    assert profile.std() == pytest.approx(2.1213203)
+    assert (profile.min, profile.max) == (-3.0, 1.5)
+    assert profile.top_values == {"1.5": 2, "-3": 1, "0": 1}
+    assert sorted(tables._histogram_bucket_label(key) for key in profile.histogram) == [
+        "(-4, -2]",
+        "0",
+        "[1, 2)",
+    ]
+
+
+def test_column_profile_merge() -> None:
+    left, right = tables.ColumnProfile(), tables.ColumnProfile()
+    left.update(pa.array(["a", "b"]), pa.array([1 << 60, 2 << 60], pa.uint64()))
+    right.update(pa.array(["b", None]), pa.array([2 << 60, 3 << 60], pa.uint64()))
+
+    left.merge(right)
+
+    assert (left.count, left.null_count) == (3, 1)
+    assert (left.min, left.max) == ("a", "b")
+    assert left.top_values == {"a": 1, "b": 2}
+    assert left.distinct_count() == 2
+
+
+def test_column_profile_std_large_offset() -> None:
+    offset = 1_700_000_000_000  # epoch milliseconds
+    values = np.array([offset + i % 10 for i in range(200_000)], dtype=np.int64)
+    hashes = pa.array(range(len(values)), pa.uint64())
+    profile, other = tables.ColumnProfile(), tables.ColumnProfile()
+
+    profile.update(pa.array(values[:50_000]), hashes[:50_000])
+    profile.update(pa.array(values[50_000:100_000]), hashes[50_000:100_000])
+    other.update(pa.array(values[100_000:]), hashes[100_000:])
+    profile.merge(other)
+
+    assert profile.count == 200_000
+    assert profile.mean() == pytest.approx(values.mean(), abs=1e-3)
+    assert profile.std() == pytest.approx(values.std(ddof=1), rel=1e-6)
+    restored = tables.ColumnProfile.from_dict(profile.to_dict(pa.int64()), pa.int64())
+    assert restored.std() == profile.std()
+
+
+def test_column_profile_distinct_count_estimate() -> None:
+    values = pa.array(range(50_000))
+    hashes = duckdb.sql("select hash(range) as h from range(50000)").to_arrow_table()
+    profile = tables.ColumnProfile()
+
+    profile.update(values, hashes.column("h").combine_chunks())
+
+    assert profile.distinct_count() == pytest.approx(50_000, rel=0.05)
+
+
+def test_column_profile_top_values_capacity() -> None:
+    profile = tables.ColumnProfile()
+
+    profile.update(
+        pa.array(range(tables.PROFILE_TOP_K_CAPACITY + 10)),
+        pa.array(range(tables.PROFILE_TOP_K_CAPACITY + 10), pa.uint64()),
+    )
+
+    assert len(profile.top_values) == tables.PROFILE_TOP_K_CAPACITY
+
+
+def test_table_profile_json_roundtrip() -> None:
+    fields: list[pa.Field[Any]] = [
+        pa.field("time", pa.timestamp("us", tz="UTC")),
+        pa.field("amount", pa.decimal128(10, 2)),
+    ]
+    schema = pa.schema(fields)
+    batch = pa.table(
+        {
+            "time": [datetime(2025, 1, 1, tzinfo=timezone.utc), None],
+            "amount": [Decimal("1.25"), Decimal("-2.50")],
+        },
+        schema=schema,
+    )
+    profile = tables.TableProfile(
+        table_id="table-id",
+        version=2,
+        schema=schema,
+        files={"part-0.parquet"},
+        columns={name: tables.ColumnProfile() for name in schema.names},
+    )
+    for i, name in enumerate(schema.names):
+        profile.columns[name].update(
+            batch.column(name).combine_chunks(), pa.array([i, i + 1], pa.uint64())
+        )
+
+    loaded = tables.TableProfile.from_json(profile.to_json())
+
+    assert loaded.schema == schema
+    assert loaded.files == {"part-0.parquet"}
+    assert loaded.columns["time"].min == datetime(2025, 1, 1, tzinfo=timezone.utc)
+    assert loaded.columns["amount"].min == Decimal("-2.50")
+    assert loaded.columns["amount"].histogram == profile.columns["amount"].histogram
+    assert (
+        loaded.columns["amount"].registers == profile.columns["amount"].registers
+    ).all()
+
+
+def test_compute_table_statistics_profile(
+    delta_table_list_column: config.ConfigTable,
+) -> None:
+    table = tables.load_table(delta_table_list_column)
+
+    statistics = tables.compute_table_statistics(
+        "list_table", table, mode=tables.StatisticsModeEnum.profile
+    )
+
+    assert statistics.to_pylist() == [
+        {
+            "column_name": "num",
+            "count": 3,
+            "null_count": 1,
+            "distinct_count": 2,
+            "mean": 2.0,
+            "std": pytest.approx(1.4142135),
+            "min": "1",
+            "max": "3",
+            "top_values": "1 (1), 3 (1)",
+            "histogram": "[1, 2): 1, [2, 4): 1",
+        },
+        {
+            "column_name": "tags",
+            "count": 3,
+            "null_count": 1,
+            "distinct_count": 2,
+            "mean": None,
+            "std": None,
+            "min": None,
+            "max": None,
+            "top_values": None,
+            "histogram": None,
+        },
+    ]
+
+
+def test_profile_table_scans_only_added_files(
+    tmp_path: Path, delta_table_list_column: config.ConfigTable
+) -> None:
+    table = tables.load_table(delta_table_list_column)
+    cache = tables.StatisticsCache(tmp_path / "statistics", max_bytes=1024 * 1024)
+    tables.profile_table("list_table", table, cache=cache)
+    deltalake.write_deltalake(
+        delta_table_list_column.uri,
+        pa.table({"num": [4], "tags": [["d"]]}),
+        mode="append",
+    )
+    table.refresh()
+
+    with mock.patch(
+        "laketower.tables._profile_dataset", wraps=tables._profile_dataset
+    ) as mock_profile:
+        profile = tables.profile_table("list_table", table, cache=cache)
+
+    scanned_dataset = mock_profile.call_args.args[2]
+    assert len(list(scanned_dataset.get_fragments())) == 1
+    assert profile.version == 1
+    assert len(profile.files) == 2
+    assert profile.columns["num"].count == 3
+    assert profile.columns["num"].max == 4
+    stored = cache.get_profile(table.metadata().id)
+    assert stored is not None
+    assert stored.version == 1
+
+
+def test_profile_table_rebuilds_after_removed_files(
+    tmp_path: Path, delta_table_list_column: config.ConfigTable
+) -> None:
+    table = tables.load_table(delta_table_list_column)
+    cache = tables.StatisticsCache(tmp_path / "statistics", max_bytes=1024 * 1024)
+    tables.profile_table("list_table", table, cache=cache)
+    deltalake.write_deltalake(
+        delta_table_list_column.uri,
+        pa.table({"num": [10, 20], "tags": [["x"], ["y"]]}),
+        mode="overwrite",
+    )
+    table.refresh()
+
+    profile = tables.profile_table("list_table", table, cache=cache)
+
+    assert profile.columns["num"].count == 2
+    assert profile.columns["num"].null_count == 0
+    assert (profile.columns["num"].min, profile.columns["num"].max) == (10, 20)
+
+
+def test_profile_table_older_version_keeps_latest_profile(
+    tmp_path: Path, delta_table_list_column: config.ConfigTable
+) -> None:
+    table = tables.load_table(delta_table_list_column)
+    cache = tables.StatisticsCache(tmp_path / "statistics", max_bytes=1024 * 1024)
+    deltalake.write_deltalake(
+        delta_table_list_column.uri,
+        pa.table({"num": [4], "tags": [["d"]]}),
+        mode="append",
+    )
+    table.refresh()
+    tables.profile_table("list_table", table, cache=cache)
+
+    profile = tables.profile_table("list_table", table, version=0, cache=cache)
+
+    assert profile.columns["num"].count == 2
+    stored = cache.get_profile(table.metadata().id)
+    assert stored is not None
+    assert stored.version == 1
+    assert stored.columns["num"].count == 3
+
+
 @pytest.mark.parametrize(
     ("sql_query", "max_limit", "expected"),
     [
@@ -373,10 +2320,320 @@ def test_compute_totals() -> None:
     assert totals["col2"][0].as_py() == 6
 
 
+def test_totals_query() -> None:
+    fields: list[pa.Field[Any]] = [
+        pa.field("a", pa.int64()),
+        pa.field("b", pa.string()),
+        pa.field("a", pa.float64()),
+    ]
+    schema = pa.schema(fields)
+
+    totals_sql = tables.totals_query("SELECT 1 AS a, 'x' AS b, 2.0 AS a", schema)
+
+    assert totals_sql == (
+        'SELECT SUM("c0") AS "c0", SUM("c2") AS "c2" '
+        'FROM (SELECT 1 AS "a", \'x\' AS "b", 2.0 AS "a") AS "results"("c0", "c1", "c2")'
+    )
+
+
+def test_totals_query_set_operation() -> None:
+    schema = pa.schema([pa.field("a", pa.int64())])
+
+    totals_sql = tables.totals_query("SELECT 1 AS a UNION ALL SELECT 2", schema)
+
+    assert totals_sql == (
+        'SELECT SUM("c0") AS "c0" '
+        'FROM (SELECT 1 AS "a" UNION ALL SELECT 2) AS "results"("c0")'
+    )
+
+
+@pytest.mark.parametrize(
+    ("sql", "schema"),
+    [
+        ("SELECT 'x' AS b", pa.schema([("b", pa.string())])),
+        ("SHOW TABLES", pa.schema([("name", pa.string())])),
+    ],
+)
+def test_totals_query_nothing_to_sum(sql: str, schema: pa.Schema) -> None:
+    assert tables.totals_query(sql, schema) is None
+
+
 def _make_datasets(data: pa.Table, name: str = "t") -> dict[str, padataset.Dataset]:
     return {name: padataset.dataset(data)}
 
 
+def test_connection_pool_reuses_connection() -> None:
+    pool = tables.ConnectionPool(max_size=1)
+
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+
+    assert first is second
+    pool.close()
+
+
+def test_connection_pool_closes_connections_above_max_size() -> None:
+    pool = tables.ConnectionPool(max_size=1)
+
+    with pool.connection() as first:
+        with pool.connection() as second:
+            pass
+
+    assert first is not second
+    with pool.connection() as third:
+        assert third is second
+    with pytest.raises(Exception):
+        first.conn.execute("select 1")
+    pool.close()
+
+
+def test_pooled_connection_register_dataset_once() -> None:
+    pool = tables.ConnectionPool()
+    dataset = padataset.dataset(pa.table({"col1": [1, 2, 3]}))
+
+    with pool.connection() as pooled:
+        with mock.patch.object(pooled, "conn", wraps=pooled.conn) as conn_spy:
+            pooled.register_dataset("t", dataset)
+            pooled.register_dataset("t", dataset)
+
+            assert conn_spy.register.call_count == 1
+            assert conn_spy.execute.call_count == 1
+    pool.close()
+
+
+def test_execute_query_replaces_registered_dataset() -> None:
+    pool = tables.ConnectionPool(max_size=1)
+
+    with mock.patch.object(tables, "connection_pool", pool):
+        first = tables.execute_query(
+            _make_datasets(pa.table({"col1": [1]})), "SELECT * FROM t"
+        )
+        second = tables.execute_query(
+            _make_datasets(pa.table({"col1": [2], "col2": ["a"]})), "SELECT * FROM t"
+        )
+
+    assert first.to_pylist() == [{"col1": 1}]
+    assert second.to_pylist() == [{"col1": 2, "col2": "a"}]
+    pool.close()
+
+
+def test_execute_query_unregisters_unrequested_datasets() -> None:
+    pool = tables.ConnectionPool(max_size=1)
+    dataset = padataset.dataset(pa.table({"col1": [1]}))
+
+    with mock.patch.object(tables, "connection_pool", pool):
+        tables.execute_query({"t1": dataset, "t2": dataset}, "SELECT * FROM t1")
+        result = tables.execute_query({"t2": dataset}, "SELECT * FROM t2")
+        with pytest.raises(ValueError, match="t1"):
+            tables.execute_query({"t2": dataset}, "SELECT * FROM t1")
+
+    assert result.to_pylist() == [{"col1": 1}]
+    with pool.connection() as pooled:
+        assert set(pooled.views) == {"t2"}
+    pool.close()
+
+
+def test_execute_query_unregisters_time_travel_datasets() -> None:
+    pool = tables.ConnectionPool(max_size=1)
+    dataset = padataset.dataset(pa.table({"col1": [1]}))
+
+    with mock.patch.object(tables, "connection_pool", pool):
+        result = tables.execute_query(
+            {"t": dataset, "t@v0": dataset},
+            "SELECT * FROM t UNION ALL SELECT * FROM t AT (VERSION => 0)",
+        )
+        reader = tables.execute_query_stream(
+            {"t": dataset, "t@v0": dataset}, "SELECT * FROM t AT (VERSION => 0)"
+        )
+        streamed = reader.read_all()
+
+    assert result.to_pylist() == [{"col1": 1}, {"col1": 1}]
+    assert streamed.to_pylist() == [{"col1": 1}]
+    with pool.connection() as pooled:
+        assert set(pooled.views) == {"t"}
+    pool.close()
+
+
+def test_execute_query_does_not_reuse_connection_after_ddl() -> None:
+    pool = tables.ConnectionPool(max_size=1)
+    datasets = _make_datasets(pa.table({"col1": [1]}))
+
+    with mock.patch.object(tables, "connection_pool", pool):
+        tables.execute_query(datasets, "CREATE TABLE other AS SELECT 1 AS col1")
+        with pytest.raises(ValueError, match="other"):
+            tables.execute_query(datasets, "SELECT * FROM other")
+        result = tables.execute_query(datasets, "SELECT * FROM t")
+
+    assert result.to_pylist() == [{"col1": 1}]
+    pool.close()
+
+
+def test_execute_query_stream_batches() -> None:
+    pool = tables.ConnectionPool(max_size=1)
+    datasets = _make_datasets(pa.table({"col1": list(range(10))}))
+
+    with mock.patch.object(tables, "connection_pool", pool):
+        reader = tables.execute_query_stream(
+            datasets, "SELECT * FROM t ORDER BY col1", batch_size=4
+        )
+        assert pool._idle.qsize() == 0
+        batches = list(reader)
+
+    assert [batch.num_rows for batch in batches] == [4, 4, 2]
+    assert pa.Table.from_batches(batches).column("col1").to_pylist() == list(range(10))
+    assert pool._idle.qsize() == 1
+    pool.close()
+
+
+def test_execute_query_stream_releases_connection_on_release() -> None:
+    pool = tables.ConnectionPool(max_size=1)
+    datasets = _make_datasets(pa.table({"col1": list(range(10))}))
+
+    with mock.patch.object(tables, "connection_pool", pool):
+        reader = tables.execute_query_stream(datasets, "SELECT * FROM t", batch_size=4)
+        reader.read_next_batch()
+        del reader
+
+    assert pool._idle.qsize() == 1
+    pool.close()
+
+
+@pytest.mark.parametrize("sql", ["", "SELECT * FROM unknown_table", "SELECT"])
+def test_execute_query_stream_invalid_sql(sql: str) -> None:
+    pool = tables.ConnectionPool(max_size=1)
+
+    with mock.patch.object(tables, "connection_pool", pool):
+        with pytest.raises(ValueError, match="Error"):
+            tables.execute_query_stream(_make_datasets(pa.table({"col1": [1]})), sql)
+
+    assert pool._idle.qsize() == (1 if sql else 0)
+    pool.close()
+
+
+def test_write_query_to_table(tmp_path: Path) -> None:
+    pool = tables.ConnectionPool(max_size=1)
+    datasets = _make_datasets(pa.table({"col1": list(range(10))}))
+    table_config = config.ConfigTable.model_validate(
+        {"name": "new_table", "uri": str(tmp_path / "new_table"), "format": "delta"}
+    )
+
+    with mock.patch.object(tables, "connection_pool", pool):
+        result = tables.write_query_to_table(
+            table_config, datasets, "SELECT col1 * 2 AS col2 FROM t WHERE col1 < 5"
+        )
+
+    assert result.rows == 5
+    written_table = deltalake.DeltaTable(table_config.uri).to_pyarrow_table()
+    assert written_table.sort_by("col2").column("col2").to_pylist() == [0, 2, 4, 6, 8]
+    assert pool._idle.qsize() == 1
+    pool.close()
+
+
+def test_write_query_to_table_error(tmp_path: Path) -> None:
+    pool = tables.ConnectionPool(max_size=1)
+    datasets = _make_datasets(pa.table({"col1": list(range(10))}))
+    table_config = config.ConfigTable.model_validate(
+        {"name": "new_table", "uri": str(tmp_path / "new_table"), "format": "delta"}
+    )
+
+    with mock.patch.object(tables, "connection_pool", pool):
+        with pytest.raises(ValueError, match="Error: Invalid Input Error: boom"):
+            tables.write_query_to_table(
+                table_config,
+                datasets,
+                "SELECT CASE WHEN col1 > 5 THEN error('boom') ELSE col1 END FROM t",
+            )
+
+    assert not tables.DeltaTable.is_valid(table_config)
+    assert pool._idle.qsize() == 1
+    pool.close()
+
+
+def test_write_csv(tmp_path: Path) -> None:
+    data = pa.table({"col1": [1, 2, 3], "col2": ["a", "b", "c"]})
+    output_path = tmp_path / "output.csv"
+
+    num_rows = tables.write_csv(
+        pa.RecordBatchReader.from_batches(data.schema, data.to_batches(2)),
+        output_path,
+    )
+
+    assert num_rows == 3
+    assert output_path.read_text() == '"col1","col2"\n1,"a"\n2,"b"\n3,"c"\n'
+
+
+def test_iter_export_csv() -> None:
+    data = pa.table({"col1": [1, 2, 3]})
+
+    chunks = list(
+        tables.iter_export(
+            pa.RecordBatchReader.from_batches(data.schema, data.to_batches(2))
+        )
+    )
+
+    assert chunks == [b'"col1"\n1\n2\n', b"3\n"]
+
+
+def test_iter_export_csv_empty() -> None:
+    schema = pa.schema([("col1", pa.int64())])
+
+    chunks = list(tables.iter_export(pa.RecordBatchReader.from_batches(schema, [])))
+
+    assert chunks == [b'"col1"\n']
+
+
+def _read_export(export_format: tables.ExportFormatEnum, content: bytes) -> pa.Table:
+    if export_format == tables.ExportFormatEnum.csv:
+        return pacsv.read_csv(io.BytesIO(content))
+    if export_format == tables.ExportFormatEnum.parquet:
+        return pq.read_table(io.BytesIO(content))
+    if export_format == tables.ExportFormatEnum.arrow:
+        return pa.ipc.open_stream(content).read_all()
+    return pa.Table.from_pylist([orjson.loads(line) for line in content.splitlines()])
+
+
+@pytest.mark.parametrize("export_format", list(tables.ExportFormatEnum))
+@pytest.mark.parametrize("compression", [None, tables.ExportCompressionEnum.gzip])
+def test_iter_export(
+    export_format: tables.ExportFormatEnum,
+    compression: tables.ExportCompressionEnum | None,
+) -> None:
+    data = pa.table({"col1": [1, 2, 3], "col2": ["a", "b", "c"]})
+
+    chunks = list(
+        tables.iter_export(
+            pa.RecordBatchReader.from_batches(data.schema, data.to_batches(2)),
+            export_format,
+            compression,
+        )
+    )
+
+    assert len(chunks) > 1
+    content = b"".join(chunks)
+    if compression is not None:
+        content = gzip.decompress(content)
+    assert _read_export(export_format, content).to_pylist() == data.to_pylist()
+
+
+def test_load_datasets_reuses_dataset_for_same_version(
+    sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    table_config = config.ConfigTable.model_validate(sample_config["tables"][0])
+
+    first = tables.load_datasets([table_config])
+    second = tables.load_datasets([table_config])
+    deltalake.write_deltalake(
+        delta_table.table_uri, delta_table.to_pyarrow_table(), mode="append"
+    )
+    third = tables.load_datasets([table_config])
+
+    assert first["delta_table"] is second["delta_table"]
+    assert third["delta_table"] is not second["delta_table"]
+    assert third["delta_table"].count_rows() == 2 * first["delta_table"].count_rows()
+
+
 def test_run_query_basic() -> None:
     data = pa.table({"col1": [1, 2, 3], "col2": ["a", "b", "c"]})
 
@@ -417,6 +2674,144 @@ def test_run_query_empty_sql_raises() -> None:
         tables.run_query(_make_datasets(data), "", max_rows=10)
 
 
+@pytest.mark.parametrize(
+    ("sql_query", "expected"),
+    [
+        ("select * from t", 'SELECT * FROM "t"'),
+        ("SELECT *\n  FROM   t", 'SELECT * FROM "t"'),
+        ("select * from", "select * from"),
+    ],
+)
+def test_normalize_query(sql_query: str, expected: str) -> None:
+    assert tables.normalize_query(sql_query) == expected
+
+
+def _make_query_result(num_rows: int) -> tables.QueryResult:
+    data = pa.table({"col1": pa.array(range(num_rows), type=pa.int64())})
+    return tables.QueryResult(data=data, execution_time_ms=1.0, truncated=False)
+
+
+def test_query_result_cache_key() -> None:
+    key = tables.QueryResultCache.key(
+        "select * from t", {"b": "2", "a": "1"}, {"t": 1}, 10
+    )
+
+    assert key == tables.QueryResultCache.key(
+        "SELECT * FROM t", {"a": "1", "b": "2"}, {"t": 1}, 10
+    )
+    assert key != tables.QueryResultCache.key(
+        "select * from t", {"a": "1", "b": "2"}, {"t": 2}, 10
+    )
+    assert key != tables.QueryResultCache.key(
+        "select * from t", {"a": "1", "b": "3"}, {"t": 1}, 10
+    )
+    assert key != tables.QueryResultCache.key(
+        "select * from t", {"a": "1", "b": "2"}, {"t": 1}, 20
+    )
+
+
+def test_query_result_cache_get_put() -> None:
+    cache = tables.QueryResultCache(max_bytes=1024)
+    key = cache.key("select * from t", {}, {"t": 1}, 10)
+    result = _make_query_result(10)
+
+    assert cache.get(key) is None
+    cache.put(key, result)
+
+    assert cache.get(key) is result
+    assert cache.nbytes == result.data.nbytes
+
+
+def test_query_result_cache_evicts_least_recently_used() -> None:
+    cache = tables.QueryResultCache(max_bytes=200)
+    keys = [cache.key(f"select {i}", {}, {}, 10) for i in range(3)]
+    for key in keys[:2]:
+        cache.put(key, _make_query_result(10))
+
+    cache.get(keys[0])
+    cache.put(keys[2], _make_query_result(10))
+
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[2]) is not None
+    assert cache.nbytes <= cache.max_bytes
+
+
+def test_query_result_cache_skips_entries_above_budget() -> None:
+    cache = tables.QueryResultCache(max_bytes=10)
+    key = cache.key("select * from t", {}, {"t": 1}, 10)
+
+    cache.put(key, _make_query_result(10))
+
+    assert cache.get(key) is None
+    assert len(cache) == 0
+
+
+def test_query_result_cache_ttl() -> None:
+    cache = tables.QueryResultCache(max_bytes=1024)
+    key = cache.key("select * from t", {}, {"t": 1}, 10)
+
+    with mock.patch("laketower.tables.time.monotonic", return_value=100.0):
+        cache.put(key, _make_query_result(10), ttl=60)
+    with mock.patch("laketower.tables.time.monotonic", return_value=159.0):
+        assert cache.get(key) is not None
+    with mock.patch("laketower.tables.time.monotonic", return_value=160.0):
+        assert cache.get(key) is None
+    assert cache.nbytes == 0
+
+
+def test_query_result_cache_zero_ttl_disables_caching() -> None:
+    cache = tables.QueryResultCache(max_bytes=1024)
+    key = cache.key("select * from t", {}, {"t": 1}, 10)
+
+    cache.put(key, _make_query_result(10), ttl=0)
+
+    assert cache.get(key) is None
+
+
+def test_run_query_cached() -> None:
+    data = pa.table({"col1": [1, 2, 3]})
+    cache = tables.QueryResultCache(max_bytes=1024)
+
+    with mock.patch(
+        "laketower.tables.execute_query", wraps=tables.execute_query
+    ) as execute_spy:
+        first = tables.run_query(
+            _make_datasets(data),
+            "SELECT * FROM t",
+            max_rows=10,
+            cache=cache,
+            table_versions={"t": 1},
+        )
+        second = tables.run_query(
+            _make_datasets(data),
+            "select * from t",
+            max_rows=10,
+            cache=cache,
+            table_versions={"t": 1},
+        )
+        third = tables.run_query(
+            _make_datasets(data),
+            "SELECT * FROM t",
+            max_rows=10,
+            cache=cache,
+            table_versions={"t": 2},
+        )
+
+    assert second is first
+    assert third is not first
+    assert execute_spy.call_count == 2
+
+
+def test_run_query_without_table_versions_not_cached() -> None:
+    data = pa.table({"col1": [1, 2, 3]})
+    cache = tables.QueryResultCache(max_bytes=1024)
+
+    tables.run_query(_make_datasets(data), "SELECT * FROM t", max_rows=10, cache=cache)
+
+    assert len(cache) == 0
+
+
 def test_query_result_column_cardinalities() -> None:
     data = pa.table({"col1": [1, 2, 2, 3], "col2": ["a", "a", "b", "b"]})
 
@@ -464,6 +2859,51 @@ def test_query_result_column_uniques_cached() -> None:
     assert result.column_uniques is result.column_uniques
 
 
+def test_query_result_column_uniques_skips_high_cardinality() -> None:
+    data = pa.table({"low": ["a", "b"] * 100, "high": list(range(200))})
+
+    result = tables.run_query(_make_datasets(data), "SELECT * FROM t", max_rows=1000)
+
+    assert result.column_uniques == {"low": ["a", "b"]}
+    assert result.column_cardinalities == {
+        "low": 2,
+        "high": tables.SEARCHLIST_MAX_CARDINALITY,
+    }
+
+
+def test_query_result_column_uniques_skips_unhashable_types() -> None:
+    data = pa.table({"col1": ["a", "b"], "col2": [[1, 2], [3]]})
+
+    result = tables.run_query(_make_datasets(data), "SELECT * FROM t", max_rows=10)
+
+    assert result.column_uniques == {"col1": ["a", "b"]}
+
+
+def test_bounded_uniques() -> None:
+    column = pa.chunked_array([["b", "a", None], ["a", "c"]])
+
+    uniques = tables.bounded_uniques(column)
+
+    assert uniques is not None
+    assert set(uniques.to_pylist()) == {"a", "b", "c"}
+
+
+@mock.patch("laketower.tables.UNIQUES_SCAN_BATCH_SIZE", 2)
+def test_bounded_uniques_across_batches() -> None:
+    column = pa.chunked_array([[1, 2, 1, 3, 2, 3, 4]])
+
+    uniques = tables.bounded_uniques(column, max_cardinality=5)
+
+    assert uniques is not None
+    assert set(uniques.to_pylist()) == {1, 2, 3, 4}
+
+
+def test_bounded_uniques_max_cardinality() -> None:
+    column = pa.chunked_array([[1, 2, 3]])
+
+    assert tables.bounded_uniques(column, max_cardinality=3) is None
+
+
 def test_query_result_totals() -> None:
     data = pa.table({"col1": ["cat1", "cat2", "cat3"], "col2": [1, 2, 3]})
 
@@ -474,6 +2914,66 @@ def test_query_result_totals() -> None:
     assert result.totals["col2"][0].as_py() == 6
 
 
+def test_query_result_totals_truncated() -> None:
+    data = pa.table({"col1": ["a", "b", "c", "d"], "col2": [1, 2, 3, 4]})
+
+    result = tables.run_query(
+        _make_datasets(data), "SELECT * FROM t", max_rows=2, totals=True
+    )
+
+    assert result.truncated
+    assert result.totals.schema == result.schema
+    assert result.totals["col1"][0].as_py() is None
+    assert result.totals["col2"][0].as_py() == 10
+
+
+def test_query_result_totals_truncated_union() -> None:
+    data = pa.table({"col1": [1, 2, 3]})
+
+    result = tables.run_query(
+        _make_datasets(data),
+        "SELECT col1 FROM t UNION ALL SELECT col1 * 10 FROM t",
+        max_rows=2,
+        totals=True,
+    )
+
+    assert result.truncated
+    assert result.totals["col1"][0].as_py() == 66
+
+
+@pytest.mark.parametrize("max_rows", [1, 10])
+def test_query_result_totals_int32_overflow(max_rows: int) -> None:
+    data = pa.table({"col1": pa.array([2**31 - 1, 2**31 - 1], type=pa.int32())})
+
+    result = tables.run_query(
+        _make_datasets(data), "SELECT * FROM t", max_rows=max_rows, totals=True
+    )
+
+    assert result.schema.field("col1").type == pa.int32()
+    assert result.totals.schema.field("col1").type == pa.int64()
+    assert result.totals["col1"][0].as_py() == 2 * (2**31 - 1)
+
+
+def test_query_result_totals_truncated_without_sql_totals() -> None:
+    data = pa.table({"col1": [1, 2, 3, 4]})
+
+    result = tables.run_query(_make_datasets(data), "SELECT * FROM t", max_rows=2)
+
+    assert result.sql_totals is None
+    assert result.totals["col1"][0].as_py() == 3
+
+
+def test_query_result_totals_not_truncated_computed_from_data() -> None:
+    data = pa.table({"col1": [1, 2, 3]})
+
+    result = tables.run_query(
+        _make_datasets(data), "SELECT * FROM t", max_rows=10, totals=True
+    )
+
+    assert result.sql_totals is None
+    assert result.totals["col1"][0].as_py() == 6
+
+
 def test_query_result_totals_cached() -> None:
     data = pa.table({"col1": [1, 2, 3]})
     result = tables.run_query(_make_datasets(data), "SELECT * FROM t", max_rows=10)
@@ -521,3 +3021,191 @@ def test_query_result_columns_cached() -> None:
     result = tables.run_query(_make_datasets(data), "SELECT * FROM t", max_rows=10)
 
     assert result.columns is result.columns
+
+
+@pytest.fixture()
+def json_table() -> pa.Table:
+    return pa.table(
+        {
+            "float": [1.5, None, float("nan")],
+            "int": [1, None, 3],
+            "int_not_null": [1, 2, 3],
+            "bool": [True, None, False],
+            "decimal": pa.array([Decimal("1.20"), None, Decimal("3")]),
+            "string": ['a"b\\c\n', "</script>&'", None],
+            "control": ["\x01", None, "x"],
+            "timestamp": [
+                datetime(2025, 1, 5),
+                datetime(2025, 1, 5, 1, 2, 3, 500),
+                None,
+            ],
+            "timestamp_tz": [
+                datetime(2025, 1, 5, tzinfo=timezone.utc),
+                None,
+                datetime(2025, 1, 5, 3, tzinfo=timezone.utc),
+            ],
+            "date": [date(2025, 1, 5), None, date(2025, 2, 1)],
+            "time": [time(1, 2, 3), None, time(4, 5, 6, 7)],
+            "list": [[1, 2], None, []],
+            "duration": [timedelta(days=1), None, timedelta(days=2)],
+        }
+    )
+
+
+def test_columns_to_json(json_table: pa.Table) -> None:
+    json_columns = tables.columns_to_json(json_table)
+
+    expected = orjson.loads(orjson.dumps(json_table.to_pydict(), default=str))
+    assert orjson.loads(json_columns) == expected
+    assert "<" not in json_columns
+
+
+def test_columns_to_json_empty(json_table: pa.Table) -> None:
+    json_columns = tables.columns_to_json(json_table.slice(0, 0))
+
+    assert orjson.loads(json_columns) == {name: [] for name in json_table.column_names}
+
+
+def test_rows_to_json(json_table: pa.Table) -> None:
+    json_rows = tables.rows_to_json(json_table)
+
+    expected = orjson.loads(orjson.dumps(json_table.to_pylist(), default=str))
+    assert orjson.loads(json_rows) == [list(row.values()) for row in expected]
+    assert "<" not in json_rows
+
+
+def test_query_result_columns_json() -> None:
+    data = pa.table({"col1": [1, 2], "col2": ["a", "b"]})
+    result = tables.run_query(_make_datasets(data), "SELECT * FROM t", max_rows=10)
+
+    assert orjson.loads(result.columns_json) == result.columns
+    assert result.columns_json is result.columns_json
+
+
+@pytest.fixture()
+def paginated_result() -> tables.QueryResult:
+    data = pa.table(
+        {
+            "id": [1, 2, 3, 4, 5],
+            "city": ["Grenoble", "Lyon", None, "Paris", "Lyon"],
+            "time": pa.array(
+                [datetime(2025, 1, day) for day in range(1, 6)], pa.timestamp("us")
+            ),
+            "tags": [["a"], ["b"], [], ["c"], ["d"]],
+        }
+    )
+    return tables.QueryResult(data=data, execution_time_ms=1.0, truncated=False)
+
+
+def test_page_query_result(paginated_result: tables.QueryResult) -> None:
+    page = tables.page_query_result(paginated_result, start=1, length=2)
+
+    assert page.records_total == 5
+    assert page.records_filtered == 5
+    assert page.data.column("id").to_pylist() == [2, 3]
+    assert page.totals is not None
+    assert page.totals.column("id").to_pylist() == [15]
+
+
+def test_page_query_result_all_rows(paginated_result: tables.QueryResult) -> None:
+    page = tables.page_query_result(paginated_result, start=2, length=-1)
+
+    assert page.data.column("id").to_pylist() == [3, 4, 5]
+
+
+def test_page_query_result_order(paginated_result: tables.QueryResult) -> None:
+    page = tables.page_query_result(
+        paginated_result,
+        length=5,
+        order=[("city", "desc"), ("id", "asc"), ("unknown", "asc")],
+    )
+
+    assert page.data.column("id").to_pylist() == [4, 2, 5, 1, 3]
+
+
+def test_page_query_result_search(paginated_result: tables.QueryResult) -> None:
+    page = tables.page_query_result(paginated_result, search="LY")
+
+    assert page.records_total == 5
+    assert page.records_filtered == 2
+    assert page.data.column("id").to_pylist() == [2, 5]
+    assert page.totals is not None
+    assert page.totals.column("id").to_pylist() == [7]
+
+
+@pytest.mark.parametrize(
+    ["column_search", "expected_ids"],
+    [
+        (tables.ColumnSearch("city", "on"), [2, 5]),
+        (tables.ColumnSearch("city", "on", "notContains"), [1, 3, 4]),
+        (tables.ColumnSearch("city", "lyon", "equal"), [2, 5]),
+        (tables.ColumnSearch("city", "lyon", "notEqual"), [1, 3, 4]),
+        (tables.ColumnSearch("city", "gre", "starts"), [1]),
+        (tables.ColumnSearch("city", "IS", "ends"), [4]),
+        (tables.ColumnSearch("city", "", "empty"), [3]),
+        (tables.ColumnSearch("city", "", "notEmpty"), [1, 2, 4, 5]),
+        (tables.ColumnSearch("city", values=["Lyon", "Paris"]), [2, 4, 5]),
+        (tables.ColumnSearch("city", values=[]), [1, 2, 3, 4, 5]),
+        (tables.ColumnSearch("city", ""), [1, 2, 3, 4, 5]),
+        (tables.ColumnSearch("id", "3", "equal"), [3]),
+        (tables.ColumnSearch("id", "3", "notEqual"), [1, 2, 4, 5]),
+        (tables.ColumnSearch("id", "3", "greater"), [4, 5]),
+        (tables.ColumnSearch("id", "3", "greaterOrEqual"), [3, 4, 5]),
+        (tables.ColumnSearch("id", "3", "less"), [1, 2]),
+        (tables.ColumnSearch("id", "3", "lessOrEqual"), [1, 2, 3]),
+        (tables.ColumnSearch("id", "abc", "greater"), [1, 2, 3, 4, 5]),
+        (tables.ColumnSearch("time", "2025-01-02", "equal"), [2]),
+        (tables.ColumnSearch("time", "2025-01-02T00:00:00.000Z", "greater"), [3, 4, 5]),
+        (tables.ColumnSearch("time", "2025-01-02", "less"), [1]),
+        (tables.ColumnSearch("tags", "a"), [1, 2, 3, 4, 5]),
+        (tables.ColumnSearch("unknown", "a"), [1, 2, 3, 4, 5]),
+    ],
+)
+def test_page_query_result_column_search(
+    paginated_result: tables.QueryResult,
+    column_search: tables.ColumnSearch,
+    expected_ids: list[int],
+) -> None:
+    page = tables.page_query_result(
+        paginated_result, length=-1, column_searches=[column_search]
+    )
+
+    assert page.data.column("id").to_pylist() == expected_ids
+
+
+def test_page_query_result_sql_totals() -> None:
+    data = pa.table({"col1": ["a", "b", "c", "d"], "col2": [1, 2, 3, 4]})
+    result = tables.run_query(
+        _make_datasets(data), "SELECT * FROM t", max_rows=3, totals=True
+    )
+
+    totals = tables.page_query_result(result).totals
+    assert totals is not None
+    assert totals["col2"][0].as_py() == 10
+    # the held rows are truncated, so filtered totals would not cover all results
+    assert tables.page_query_result(result, search="a").totals is None
+
+
+def test_query_result_totals_json() -> None:
+    data = pa.table({"col1": ["a", "b", "c", "d"], "col2": [1, 2, 3, 4]})
+    result = tables.run_query(
+        _make_datasets(data), "SELECT * FROM t", max_rows=3, totals=True
+    )
+
+    assert result.totals_json == "[[null,10]]"
+
+
+def test_hold_query_result(paginated_result: tables.QueryResult) -> None:
+    store = tables.QueryResultCache(max_bytes=1024 * 1024)
+
+    token = tables.hold_query_result(store, paginated_result)
+
+    assert token is not None
+    assert store.get(token) is paginated_result
+    assert tables.hold_query_result(store, paginated_result) != token
+
+
+def test_hold_query_result_too_large(paginated_result: tables.QueryResult) -> None:
+    store = tables.QueryResultCache(max_bytes=1)
+
+    assert tables.hold_query_result(store, paginated_result) is None
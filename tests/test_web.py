@@ -1,3 +1,6 @@
+import gzip
+import io
+import re
 import urllib.parse
 from datetime import datetime, timezone
 from http import HTTPStatus
@@ -6,15 +9,18 @@ from typing import Any
 from unittest.mock import patch
 
 import deltalake
+import orjson
 import pandas as pd
 import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 import pytest
 import yaml
 from bs4 import BeautifulSoup
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
-from laketower import __about__, web
+from laketower import __about__, tables, web
 
 
 @pytest.fixture()
@@ -255,6 +261,40 @@ def test_table_history(
                 assert f"{metric_key}: {metric_val}" in html
 
 
+def test_table_history_paginated(
+    client: TestClient, sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    table = sample_config["tables"][0]
+
+    response = client.get(f"/tables/{table['name']}/history", params={"limit": 1})
+    assert response.status_code == HTTPStatus.OK
+
+    soup = BeautifulSoup(response.content.decode(), "html.parser")
+    versions = [
+        button.get_text().strip()
+        for button in soup.find_all("button", class_="accordion-button")
+    ]
+    assert versions == ["version: 1"]
+    load_more = soup.select_one("#history-load-more a")
+    assert load_more is not None
+    assert load_more.get("hx-get") == (
+        f"/tables/{table['name']}/history?limit=1&before_version=1"
+    )
+
+    response = client.get(str(load_more.get("hx-get")), headers={"HX-Request": "true"})
+    assert response.status_code == HTTPStatus.OK
+
+    html = response.content.decode()
+    soup = BeautifulSoup(html, "html.parser")
+    assert "<html" not in html
+    versions = [
+        button.get_text().strip()
+        for button in soup.find_all("button", class_="accordion-button")
+    ]
+    assert versions == ["version: 0"]
+    assert soup.select_one("#history-load-more") is None
+
+
 def test_table_history_invalid_table_uri(
     client: TestClient, sample_config: dict[str, Any]
 ) -> None:
@@ -285,6 +325,23 @@ def test_tables_statistics(
     assert "max" in html
 
 
+def test_tables_statistics_cached(
+    client: TestClient, sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    table = sample_config["tables"][0]
+    statistics_dir = Path(sample_config["settings"]["cache"]["statistics_dir"])
+
+    first = client.get(f"/tables/{table['name']}/statistics")
+    with patch("laketower.tables._compute_table_statistics") as mock_compute:
+        second = client.get(f"/tables/{table['name']}/statistics")
+
+    mock_compute.assert_not_called()
+    assert second.content == first.content
+    table_id = delta_table.metadata().id
+    version = delta_table.version()
+    assert (statistics_dir / f"{table_id}-v{version}-exact.arrow").exists()
+
+
 def test_tables_statistics_version(
     client: TestClient, sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
 ) -> None:
@@ -303,6 +360,137 @@ def test_tables_statistics_version(
     assert "max" in html
 
 
+def test_tables_statistics_as_of(
+    client: TestClient, sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    table = sample_config["tables"][0]
+    as_of = datetime.fromtimestamp(
+        delta_table.history()[-1]["timestamp"] / 1000, tz=timezone.utc
+    )
+
+    response = client.get(
+        f"/tables/{table['name']}/statistics", params={"as_of": as_of.isoformat()}
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    soup = BeautifulSoup(response.content.decode(), "html.parser")
+    version_input = soup.find("input", id="version-input")
+    assert version_input is not None and version_input.get("value") == "0"
+    as_of_input = soup.find("input", id="as-of-input")
+    assert as_of_input is not None and as_of_input.get("value") == as_of.isoformat()
+
+
+def test_tables_statistics_metadata(
+    client: TestClient, sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    table = sample_config["tables"][0]
+
+    response = client.get(
+        f"/tables/{table['name']}/statistics", params={"mode": "metadata"}
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    html = response.content.decode()
+    assert all(field.name in html for field in delta_table.schema().fields)
+    assert "null_count" in html
+    assert "source" in html
+    assert "Grenoble" in html
+    assert "Scan missing columns" not in html
+
+    soup = BeautifulSoup(html, "html.parser")
+    modes = soup.find("div", attrs={"aria-label": "Statistics mode"})
+    assert modes
+    active_mode = modes.find("a", class_="active")
+    assert active_mode
+    assert active_mode.get_text(strip=True) == "Metadata"
+
+
+def test_tables_statistics_profile(
+    client: TestClient, sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    table = sample_config["tables"][0]
+
+    response = client.get(
+        f"/tables/{table['name']}/statistics", params={"mode": "profile"}
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    html = response.content.decode()
+    assert all(field.name in html for field in delta_table.schema().fields)
+    assert "distinct_count" in html
+    assert "top_values" in html
+    assert "histogram" in html
+    assert "Grenoble (168)" in html
+
+    soup = BeautifulSoup(html, "html.parser")
+    modes = soup.find("div", attrs={"aria-label": "Statistics mode"})
+    assert modes
+    active_mode = modes.find("a", class_="active")
+    assert active_mode
+    assert active_mode.get_text(strip=True) == "Profile"
+
+
+def test_tables_statistics_approx(
+    client: TestClient, sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    table = sample_config["tables"][0]
+
+    response = client.get(
+        f"/tables/{table['name']}/statistics", params={"mode": "approx"}
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    html = response.content.decode()
+    assert all(field.name in html for field in delta_table.schema().fields)
+    assert "avg_ci95" in html
+    assert "Estimated from a sample of 168 rows out of 168, in 1 of 1 files" in html
+
+
+def test_tables_statistics_exact_without_sample(
+    client: TestClient, sample_config: dict[str, Any]
+) -> None:
+    table = sample_config["tables"][0]
+
+    response = client.get(f"/tables/{table['name']}/statistics")
+    assert response.status_code == HTTPStatus.OK
+    assert "Estimated from a sample" not in response.content.decode()
+
+
+def test_tables_statistics_metadata_missing_columns(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    sample_config: dict[str, Any],
+    sample_config_path: Path,
+) -> None:
+    table_uri = str(tmp_path / "list_table")
+    deltalake.write_deltalake(
+        table_uri, pa.table({"num": [1, 2], "tags": [["a"], ["b", "c"]]})
+    )
+    sample_config["tables"].append(
+        {"name": "list_table", "uri": table_uri, "format": "delta"}
+    )
+    sample_config_path.write_text(yaml.dump(sample_config))
+    monkeypatch.setenv("LAKETOWER_CONFIG_PATH", str(sample_config_path.absolute()))
+    client = TestClient(web.create_app())
+
+    response = client.get("/tables/list_table/statistics", params={"mode": "metadata"})
+    assert response.status_code == HTTPStatus.OK
+
+    html = response.content.decode()
+    assert "No metadata statistics for columns: tags" in html
+    assert "Scan missing columns" in html
+
+    response = client.get(
+        "/tables/list_table/statistics",
+        params={"mode": "metadata", "scan_missing": "true"},
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    html = response.content.decode()
+    assert "No metadata statistics" not in html
+    assert "[b, c]" in html
+
+
 def test_table_statistics_invalid_table_uri(
     client: TestClient, sample_config: dict[str, Any]
 ) -> None:
@@ -461,6 +649,83 @@ def test_tables_view_version(
     )
 
 
+def test_tables_view_as_of(
+    client: TestClient, sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    table = sample_config["tables"][0]
+    as_of = datetime.fromtimestamp(
+        delta_table.history()[-1]["timestamp"] / 1000, tz=timezone.utc
+    )
+
+    response = client.get(
+        f"/tables/{table['name']}/view", params={"as_of": as_of.isoformat()}
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    soup = BeautifulSoup(response.content.decode(), "html.parser")
+    assert not soup.find_all("td")
+    version_input = soup.find("input", id="version-input")
+    assert version_input is not None and version_input.get("value") == "0"
+
+
+@pytest.mark.parametrize(
+    ("params", "error"),
+    [
+        ({"as_of": "yesterday"}, "Invalid timestamp"),
+        ({"as_of": "2000-01-01"}, "No table version as of"),
+        ({"as_of": "2100-01-01", "version": 0}, "both a version and a timestamp"),
+    ],
+)
+def test_tables_view_as_of_invalid(
+    client: TestClient,
+    sample_config: dict[str, Any],
+    params: dict[str, Any],
+    error: str,
+) -> None:
+    table = sample_config["tables"][0]
+
+    response = client.get(f"/tables/{table['name']}/view", params=params)
+    assert response.status_code == HTTPStatus.OK
+    assert error in response.content.decode()
+
+
+def test_tables_view_where(
+    client: TestClient, sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    table = sample_config["tables"][0]
+
+    response = client.get(
+        f"/tables/{table['name']}/view", params={"where": "temperature > 160"}
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    html = response.content.decode()
+    soup = BeautifulSoup(html, "html.parser")
+    where_input = soup.find("input", attrs={"id": "where-input"})
+    assert where_input is not None
+    assert where_input["value"] == "temperature > 160"
+    assert "0 of 1 files pruned by filters" in html
+    assert len(soup.select("tbody tr")) == 3
+    sql_link = soup.find("a", href=re.compile(r"^/tables/query\?sql="))
+    assert sql_link is not None
+    assert "WHERE" in urllib.parse.unquote(str(sql_link["href"]))
+
+
+def test_tables_view_where_invalid(
+    client: TestClient, sample_config: dict[str, Any]
+) -> None:
+    table = sample_config["tables"][0]
+
+    response = client.get(
+        f"/tables/{table['name']}/view",
+        params={"where": "temperature >", "partition": ["city=Grenoble"]},
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    html = response.content.decode()
+    assert "Invalid filter: temperature &gt;" in html
+
+
 def test_table_view_invalid_table_uri(
     client: TestClient, sample_config: dict[str, Any]
 ) -> None:
@@ -587,6 +852,24 @@ def test_tables_query_run(
     assert not all(str(row) in all_td for row in df[selected_column][selected_limit:])
 
 
+def test_tables_query_run_time_travel(
+    client: TestClient, sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    table_name = sample_config["tables"][0]["name"]
+    sql_query = (
+        f"select count(*) as num_rows from {table_name} at (version => 0) "
+        f"union all select count(*) from {table_name} at (timestamp => '2100-01-01')"
+    )
+
+    response = client.get("/tables/query/run", params={"sql": sql_query})
+    assert response.status_code == HTTPStatus.OK
+
+    soup = BeautifulSoup(response.content.decode(), "html.parser")
+    all_td = [td.get_text().strip() for td in soup.find_all("td")]
+    assert "0" in all_td
+    assert str(len(delta_table.to_pandas())) in all_td
+
+
 def test_tables_query_run_max_rows_limit(
     monkeypatch: pytest.MonkeyPatch,
     sample_config: dict[str, Any],
@@ -663,6 +946,65 @@ def test_tables_query_run_htmx(
     assert selected_column in all_th
 
 
+def test_tables_query_into(
+    client: TestClient, sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    source_table = sample_config["tables"][0]
+    into_table = sample_config["tables"][-1]
+    sql_query = (
+        f"select * from {source_table['name']} where time >= $start_date::timestamp"
+    )
+
+    response = client.post(
+        "/tables/query/into",
+        data={
+            "sql": sql_query,
+            "into_table": into_table["name"],
+            "into_mode": "overwrite",
+            "start_date": "2025-01-07",
+        },
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    html = response.content.decode()
+    soup = BeautifulSoup(html, "html.parser")
+    alert = soup.find("div", attrs={"class": "alert-success"})
+    assert alert is not None
+    assert (
+        f"Successfully wrote 24 rows into table '{into_table['name']}' in 'overwrite' mode"
+        in alert.get_text()
+    )
+    into_option = soup.find("option", attrs={"value": into_table["name"]})
+    assert into_option is not None
+    assert into_option.has_attr("selected")
+
+    written_table = deltalake.DeltaTable(into_table["uri"]).to_pyarrow_table()
+    assert written_table.num_rows == 24
+
+
+def test_tables_query_into_htmx_invalid(
+    client: TestClient, sample_config: dict[str, Any]
+) -> None:
+    response = client.post(
+        "/tables/query/into",
+        data={
+            "sql": "select * from unknown_table",
+            "into_table": sample_config["tables"][-1]["name"],
+        },
+        headers={"HX-Request": "true"},
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert "HX-Push-Url" in response.headers
+
+    html = response.content.decode()
+    soup = BeautifulSoup(html, "html.parser")
+    assert soup.find("html") is None
+    alert = soup.find("div", attrs={"class": "alert-danger"})
+    assert alert is not None
+    assert "Error" in alert.get_text()
+    assert not Path(sample_config["tables"][-1]["uri"]).exists()
+
+
 @pytest.mark.parametrize(
     ("start_date", "end_date"),
     [("", ""), ("2025-01-01", ""), ("", "2025-01-31"), ("2025-01-01", "2025-01-31")],
@@ -753,10 +1095,13 @@ def test_tables_import(client: TestClient, sample_config: dict[str, Any]) -> Non
 
     file_input = soup.find("input", {"type": "file", "name": "input_file"})
     assert file_input is not None
-    assert file_input.get("accept") == ".csv,.xlsx"
+    assert (
+        file_input.get("accept")
+        == ".csv,.xlsx,.parquet,.arrow,.arrows,.ipc,.feather,.ndjson,.jsonl"
+    )
     assert file_input.has_attr("required")
 
-    expected_mode_inputs = [("append", False), ("overwrite", True)]
+    expected_mode_inputs = [("append", False), ("overwrite", True), ("merge", False)]
     mode_inputs = soup.find_all("input", {"name": "mode"})
     for mode_input, expected_mode_input in zip(
         mode_inputs, expected_mode_inputs, strict=True
@@ -764,7 +1109,13 @@ def test_tables_import(client: TestClient, sample_config: dict[str, Any]) -> Non
         assert mode_input.get("value") == expected_mode_input[0]
         assert mode_input.has_attr("checked") == expected_mode_input[1]
 
-    expected_file_formats_options = [("csv", True), ("xlsx", False)]
+    expected_file_formats_options = [
+        ("csv", True),
+        ("xlsx", False),
+        ("parquet", False),
+        ("arrow", False),
+        ("ndjson", False),
+    ]
     file_format_select = soup.find("select", {"name": "file_format"})
     assert file_format_select is not None
     file_format_options = file_format_select.find_all("option", recursive=False)
@@ -835,6 +1186,7 @@ def test_tables_import_post_nonexistent_table(
 ) -> None:
     table = sample_config["tables"][-1]
     url = f"/tables/{table['name']}/import"
+    mock_write_deltalake.side_effect = lambda uri, data, **_: data.read_all()
 
     csv_data = pd.DataFrame(
         {"time": ["2025-01-02T00:00:00+00:00"], "city": ["Lyon"], "temperature": [10.5]}
@@ -1013,6 +1365,94 @@ def test_tables_import_post_xlsx_append(
     assert new_count == original_count + new_data_count
 
 
+def test_tables_import_post_parquet_append(
+    client: TestClient,
+    sample_config: dict[str, Any],
+    delta_table: deltalake.DeltaTable,
+) -> None:
+    table = sample_config["tables"][0]
+    original_count = len(delta_table.to_pandas())
+    parquet_buffer = io.BytesIO()
+    pq.write_table(delta_table.to_pyarrow_table().slice(0, 2), parquet_buffer)
+
+    response = client.post(
+        f"/tables/{table['name']}/import",
+        files={
+            "input_file": (
+                "test_data.parquet",
+                parquet_buffer.getvalue(),
+                "application/vnd.apache.parquet",
+            )
+        },
+        data={"mode": "append", "file_format": "parquet"},
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    html = response.content.decode()
+    assert "Successfully imported 2 rows" in html
+
+    updated_table = deltalake.DeltaTable(table["uri"])
+    assert len(updated_table.to_pandas()) == original_count + 2
+
+
+def test_tables_import_post_auto_compaction(
+    monkeypatch: pytest.MonkeyPatch,
+    sample_config: dict[str, Any],
+    sample_config_path: Path,
+) -> None:
+    table = sample_config["tables"][0]
+    table["auto_compaction"] = {"min_small_files": 2}
+    sample_config_path.write_text(yaml.dump(sample_config))
+    monkeypatch.setenv("LAKETOWER_CONFIG_PATH", str(sample_config_path.absolute()))
+    client = TestClient(web.create_app())
+    csv_content = b"time,city,temperature\n2025-01-01 00:00:00,Grenoble,100.5\n"
+
+    response = client.post(
+        f"/tables/{table['name']}/import",
+        files={"input_file": ("test_data.csv", csv_content, "text/csv")},
+        data={"mode": "append", "file_format": "csv"},
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    html = response.content.decode()
+    assert "Successfully imported 1 rows, then compacted 2 small files into 1" in html
+
+
+def test_tables_import_post_csv_merge(
+    client: TestClient,
+    sample_config: dict[str, Any],
+    delta_table: deltalake.DeltaTable,
+) -> None:
+    table = sample_config["tables"][0]
+    original_count = len(delta_table.to_pandas())
+    csv_content = (
+        b"time,city,temperature\n"
+        b"2025-01-01 00:00:00,Grenoble,100.5\n"
+        b"2025-02-01 00:00:00,Grenoble,200.5\n"
+    )
+
+    response = client.post(
+        f"/tables/{table['name']}/import",
+        files={"input_file": ("test_data.csv", csv_content, "text/csv")},
+        data={
+            "mode": "merge",
+            "file_format": "csv",
+            "delimiter": ",",
+            "encoding": "utf-8",
+            "merge_keys": "time, city",
+        },
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    html = response.content.decode()
+    assert "Successfully imported 2 rows" in html
+
+    updated_table = deltalake.DeltaTable(table["uri"]).to_pandas()
+    assert len(updated_table) == original_count + 1
+    assert updated_table["temperature"].min() == -4.0
+    assert updated_table["temperature"].max() == 200.5
+
+
 def test_queries_view(client: TestClient, sample_config: dict[str, Any]) -> None:
     query = sample_config["queries"][0]
 
@@ -1204,6 +1644,270 @@ def test_queries_run_htmx(client: TestClient, sample_config: dict[str, Any]) ->
     assert all(col in all_th for col in {"day", "avg_temperature"})
 
 
+def _results_url(html: str) -> str:
+    match = re.search(r"const resultsUrl = \"([^\"]+)\"", html)
+    assert match is not None
+    return match.group(1)
+
+
+def test_queries_run_htmx_paginated_results(
+    client: TestClient, sample_config: dict[str, Any]
+) -> None:
+    query = sample_config["queries"][0]
+
+    response = client.get(
+        f"/queries/{query['name']}/run", headers={"HX-Request": "true"}
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    html = response.content.decode()
+    assert "columnarToArrays" not in html
+    assert "/tables/query/csv?sql=" in html
+    results_url = _results_url(html)
+    assert results_url.startswith("/results/")
+
+    response = client.post(
+        results_url,
+        json={
+            "draw": 3,
+            "start": 2,
+            "length": 3,
+            "search": {"value": ""},
+            "order": [{"column": 1, "dir": "desc"}],
+            "columns": [
+                {"data": None, "name": "", "searchable": False},
+                {"data": 0, "name": "day"},
+                {"data": 1, "name": "avg_temperature"},
+            ],
+        },
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    content = response.json()
+    assert content["draw"] == 3
+    assert content["recordsTotal"] == 7
+    assert content["recordsFiltered"] == 7
+    assert [row[0] for row in content["data"]] == [
+        "2025-01-05T00:00:00",
+        "2025-01-04T00:00:00",
+        "2025-01-03T00:00:00",
+    ]
+    assert content["totals"][0] is None
+    assert content["totals"][1] is not None
+
+
+def test_tables_query_run_htmx_paginated_results_search(
+    client: TestClient, sample_config: dict[str, Any]
+) -> None:
+    sql_query = f"select * from {sample_config['tables'][0]['name']}"
+
+    response = client.get(
+        "/tables/query/run", params={"sql": sql_query}, headers={"HX-Request": "true"}
+    )
+    results_url = _results_url(response.content.decode())
+
+    response = client.post(
+        results_url,
+        json={
+            "draw": 1,
+            "start": 0,
+            "length": 10,
+            "columns": [
+                {"data": 0, "name": "time"},
+                {"data": 1, "name": "city", "columnControl": {"list": {"0": "Lyon"}}},
+                {
+                    "data": 2,
+                    "name": "temperature",
+                    "columnControl": {
+                        "search": {"value": "10", "logic": "less", "type": "num"}
+                    },
+                },
+            ],
+        },
+    )
+    content = response.json()
+    assert content["recordsTotal"] == 24 * 7
+    assert content["recordsFiltered"] == 0
+    assert content["data"] == []
+
+    response = client.post(
+        results_url,
+        json={
+            "draw": 2,
+            "start": 0,
+            "length": 10,
+            "columns": [
+                {"data": 0, "name": "time"},
+                {"data": 1, "name": "city"},
+                {
+                    "data": 2,
+                    "name": "temperature",
+                    "columnControl": {
+                        "search": {"value": "10", "logic": "less", "type": "num"}
+                    },
+                },
+            ],
+        },
+    )
+    content = response.json()
+    assert content["recordsFiltered"] == 15
+    assert len(content["data"]) == 10
+    assert all(row[2] < 10 for row in content["data"])
+
+
+def test_results_page_expired(client: TestClient) -> None:
+    response = client.post("/results/unknown", json={"draw": 1})
+    assert response.status_code == HTTPStatus.OK
+
+    content = response.json()
+    assert content["draw"] == 1
+    assert content["data"] == []
+    assert "expired" in content["error"]
+
+
+def test_queries_run_htmx_results_not_held(
+    monkeypatch: pytest.MonkeyPatch,
+    sample_config: dict[str, Any],
+    sample_config_path: Path,
+) -> None:
+    sample_config["settings"]["cache"]["paginated_results_max_bytes"] = 0
+    sample_config_path.write_text(yaml.dump(sample_config))
+    monkeypatch.setenv("LAKETOWER_CONFIG_PATH", str(sample_config_path.absolute()))
+    client = TestClient(web.create_app())
+    query = sample_config["queries"][0]
+
+    response = client.get(
+        f"/queries/{query['name']}/run", headers={"HX-Request": "true"}
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    html = response.content.decode()
+    assert "const resultsUrl = null" in html
+    assert "columnarToArrays" in html
+
+
+def test_queries_run_htmx_truncated_results_totals(
+    monkeypatch: pytest.MonkeyPatch,
+    sample_config: dict[str, Any],
+    sample_config_path: Path,
+) -> None:
+    sample_config["settings"]["max_query_rows"] = 3
+    sample_config_path.write_text(yaml.dump(sample_config))
+    monkeypatch.setenv("LAKETOWER_CONFIG_PATH", str(sample_config_path.absolute()))
+    client = TestClient(web.create_app())
+    query = sample_config["queries"][1]
+
+    response = client.get(
+        f"/queries/{query['name']}/run",
+        params={k: v["default"] for k, v in query["parameters"].items()},
+        headers={"HX-Request": "true"},
+    )
+    results_url = _results_url(response.content.decode())
+
+    columns = [{"data": 0, "name": "day"}, {"data": 1, "name": "avg_temperature"}]
+    response = client.post(
+        results_url, json={"draw": 1, "search": {"value": ""}, "columns": columns}
+    )
+    assert response.json()["totals"][1] is not None
+
+    # the held rows are truncated: their filtered totals would not be the
+    # totals of all the matching results
+    response = client.post(
+        results_url, json={"draw": 2, "search": {"value": "01"}, "columns": columns}
+    )
+    assert response.json()["totals"] is None
+
+
+def test_queries_run_htmx_results_not_held_totals(
+    monkeypatch: pytest.MonkeyPatch,
+    sample_config: dict[str, Any],
+    sample_config_path: Path,
+) -> None:
+    sample_config["settings"]["max_query_rows"] = 3
+    sample_config["settings"]["cache"]["paginated_results_max_bytes"] = 0
+    sample_config_path.write_text(yaml.dump(sample_config))
+    monkeypatch.setenv("LAKETOWER_CONFIG_PATH", str(sample_config_path.absolute()))
+    client = TestClient(web.create_app())
+    query = sample_config["queries"][1]
+
+    response = client.get(
+        f"/queries/{query['name']}/run",
+        params={k: v["default"] for k, v in query["parameters"].items()},
+        headers={"HX-Request": "true"},
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    html = response.content.decode()
+    assert "const resultsUrl = null" in html
+    # the client-side grid is given the totals of the full results
+    match = re.search(r"const totals = (\[\[.*\]\])\[0\]", html)
+    assert match is not None
+    assert orjson.loads(match.group(1))[0][1] is not None
+    assert "truncated: true" in html
+
+
+def test_queries_run_cached_results(
+    client: TestClient, sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    query = sample_config["queries"][0]
+
+    with patch(
+        "laketower.tables.execute_query", wraps=tables.execute_query
+    ) as execute_spy:
+        first = client.get(f"/queries/{query['name']}/run")
+        second = client.get(f"/queries/{query['name']}/run")
+        assert execute_spy.call_count == 1
+
+        deltalake.write_deltalake(
+            delta_table.table_uri, delta_table.to_pyarrow_table(), mode="append"
+        )
+        third = client.get(f"/queries/{query['name']}/run")
+        assert execute_spy.call_count == 2
+
+    assert first.status_code == HTTPStatus.OK
+    assert second.status_code == HTTPStatus.OK
+    assert third.status_code == HTTPStatus.OK
+    assert second.content == first.content
+
+
+def test_queries_run_time_travel(
+    monkeypatch: pytest.MonkeyPatch,
+    sample_config: dict[str, Any],
+    sample_config_path: Path,
+    delta_table: deltalake.DeltaTable,
+) -> None:
+    table_name = sample_config["tables"][0]["name"]
+    query = sample_config["queries"][0]
+    query["sql"] = (
+        f"select count(*) as num_rows from {table_name} at (version => 0) "
+        f"union all select count(*) from {table_name} at (timestamp => '2100-01-01')"
+    )
+    sample_config_path.write_text(yaml.dump(sample_config))
+    monkeypatch.setenv("LAKETOWER_CONFIG_PATH", str(sample_config_path.absolute()))
+    client = TestClient(web.create_app())
+    num_rows = len(delta_table.to_pandas())
+
+    first = client.get(f"/queries/{query['name']}/run")
+    deltalake.write_deltalake(
+        delta_table.table_uri, delta_table.to_pyarrow_table(), mode="append"
+    )
+    second = client.get(f"/queries/{query['name']}/run")
+
+    assert first.status_code == HTTPStatus.OK
+    first_td = [
+        td.get_text().strip()
+        for td in BeautifulSoup(first.content.decode(), "html.parser").find_all("td")
+    ]
+    assert "0" in first_td
+    assert str(num_rows) in first_td
+    # the timestamp resolves to the new version, the cached result is not reused
+    second_td = [
+        td.get_text().strip()
+        for td in BeautifulSoup(second.content.decode(), "html.parser").find_all("td")
+    ]
+    assert str(2 * num_rows) in second_td
+
+
 def test_queries_run_max_row_limit(
     monkeypatch: pytest.MonkeyPatch,
     sample_config: dict[str, Any],
@@ -1368,6 +2072,78 @@ def test_tables_query_export_csv(
     assert len(lines) == selected_limit + 1
 
 
+@pytest.mark.parametrize(
+    ["export_format", "media_type"],
+    [
+        ("csv", "text/csv; charset=utf-8"),
+        ("parquet", "application/vnd.apache.parquet"),
+        ("arrow", "application/vnd.apache.arrow.stream"),
+        ("ndjson", "application/x-ndjson"),
+    ],
+)
+def test_tables_query_export(
+    client: TestClient,
+    sample_config: dict[str, Any],
+    delta_table: deltalake.DeltaTable,
+    export_format: str,
+    media_type: str,
+) -> None:
+    sql_query = f"select * from {sample_config['tables'][0]['name']}"
+
+    response = client.get(
+        "/tables/query/export",
+        params={"sql": sql_query, "format": export_format, "filename": "Weather"},
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["content-type"] == media_type
+    assert (
+        f"attachment; filename=weather.{export_format}"
+        == response.headers["content-disposition"]
+    )
+
+    content = io.BytesIO(response.content)
+    if export_format == "csv":
+        results = pacsv.read_csv(content)
+    elif export_format == "parquet":
+        results = pq.read_table(content)
+    elif export_format == "arrow":
+        results = pa.ipc.open_stream(content).read_all()
+    else:
+        results = pa.Table.from_pylist(
+            [orjson.loads(line) for line in content.getvalue().splitlines()]
+        )
+    assert results.num_rows == delta_table.count()
+    assert results.column_names == delta_table.schema().to_arrow().names
+
+
+def test_tables_query_export_gzip(
+    client: TestClient, sample_config: dict[str, Any], delta_table: deltalake.DeltaTable
+) -> None:
+    sql_query = f"select * from {sample_config['tables'][0]['name']}"
+
+    response = client.get(
+        "/tables/query/export",
+        params={"sql": sql_query, "format": "csv", "compression": "gzip"},
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["content-type"] == "application/gzip"
+    assert "query_results.csv.gz" in response.headers["content-disposition"]
+
+    results = pacsv.read_csv(io.BytesIO(gzip.decompress(response.content)))
+    assert results.num_rows == delta_table.count()
+
+
+def test_tables_query_export_invalid_format(
+    client: TestClient, sample_config: dict[str, Any]
+) -> None:
+    sql_query = f"select * from {sample_config['tables'][0]['name']}"
+
+    response = client.get(
+        "/tables/query/export", params={"sql": sql_query, "format": "xml"}
+    )
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
 def test_queries_view_export_csv(
     client: TestClient, sample_config: dict[str, Any]
 ) -> None: